@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+    Micro-benchmark: routing of notifications into "in diff" / "not in diff" with the linear scan over
+    all changed lines (previous line_is_in_diff) vs. the bisect lookup of ChangedLineIndex. Building the index
+    (once per file) and the lookups are timed separately.
+
+    Usage: python benchmarks/bench_changed_lines.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from changed_lines import ChangedLineIndex  # noqa: E402
+
+
+def line_is_in_diff_linear(line, changedlines):
+    line_in_diff = False
+    for changedline in changedlines:
+        if changedline - 2 <= line <= changedline + 2:
+            line_in_diff = True
+    return line_in_diff
+
+
+def main():
+    random.seed(0)
+    print(f'{"added lines":>12} {"hits":>6} {"linear [ms]":>12} {"build [ms]":>11} {"lookup [ms]":>12} '
+          f'{"speedup":>8}')
+    for nr_of_changed_lines, nr_of_hits in ((100, 10), (1000, 100), (5000, 500), (20000, 1000)):
+        file_length = nr_of_changed_lines * 3
+        changed_lines = sorted(random.sample(range(1, file_length), nr_of_changed_lines))
+        hits = [random.randint(1, file_length) for _ in range(nr_of_hits)]
+
+        linear = timeit.timeit(lambda: [line_is_in_diff_linear(h, changed_lines) for h in hits], number=3) / 3
+
+        build = timeit.timeit(lambda: ChangedLineIndex(changed_lines), number=3) / 3
+        index = ChangedLineIndex(changed_lines)
+
+        def index_lookup():
+            return [h in index for h in hits]
+
+        lookup = timeit.timeit(index_lookup, number=3) / 3
+        assert index_lookup() == [line_is_in_diff_linear(h, changed_lines) for h in hits]
+        print(f'{nr_of_changed_lines:>12} {nr_of_hits:>6} {linear * 1000:>12.2f} {build * 1000:>11.2f} '
+              f'{lookup * 1000:>12.2f} {linear / lookup:>7.0f}x')
+
+if __name__ == "__main__":
+    main()
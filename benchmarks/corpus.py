@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+    Generates a synthetic semester of a lecture repo: <semester>/UEnn/Aufgabe/Angabe.tex and
+    <semester>/UEnn/Unterricht/Lernziele.tex including a shared prelude, plus the CI config
+    (.lecture-build-ci.json) the scripts expect.
+
+    Usage: python benchmarks/corpus.py <target dir> [--exercises 12] [--paragraphs 40]
+"""
+import argparse
+import json
+import os
+import random
+
+WORDS = ('die der das und ist nicht ein eine Funktion Klasse Methode Objekt Schleife Variable Rückgabewert '
+         'Parameter Beispiel Aufgabe implementieren schreiben testen liefert berechnet gegeben folgende '
+         'Liste Element Index Wert Schnittstelle Vererbung rekursiv iterativ Laufzeit Speicher').split()
+PRELUDE = ('\\usepackage[ngerman]{babel}\n\\usepackage{listings}\n\\usepackage{amsmath}\n'
+           '\\newcommand{\\code}[1]{\\texttt{#1}}\n')
+
+
+def sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    text = ' '.join(words)
+    if rng.random() < 0.2:
+        text = f'{text} \\code{{{rng.choice(WORDS)}}}'
+    return f'{text[0].upper()}{text[1:]}.'
+
+
+def paragraph(rng):
+    kind = rng.random()
+    if kind < 0.15:
+        items = '\n'.join(f'\\item {sentence(rng)}' for _ in range(rng.randint(2, 5)))
+        return f'\\begin{{itemize}}\n{items}\n\\end{{itemize}}'
+    if kind < 0.25:
+        code = '\n'.join(f'    int {rng.choice(WORDS).lower()} = {rng.randint(0, 99)};' for _ in range(4))
+        return f'\\begin{{lstlisting}}[language=Java]\n{code}\n\\end{{lstlisting}}'
+    if kind < 0.3:
+        return f'\\subsection{{{sentence(rng)[:-1]}}}'
+    # Prose, one sentence per line as in the lecture repos
+    return '\n'.join(sentence(rng) for _ in range(rng.randint(2, 6)))
+
+
+def tex_document(rng, title, nr_of_paragraphs):
+    body = '\n\n'.join(paragraph(rng) for _ in range(nr_of_paragraphs))
+    return (f'\\documentclass{{article}}\n\\input{{../../prelude}}\n\\begin{{document}}\n'
+            f'\\section{{{title}}}\n\n{body}\n\n\\end{{document}}\n')
+
+
+def generate_semester(base_dir, semester='24SS', nr_of_exercises=12, nr_of_paragraphs=40, seed=0):
+    """
+        Returns:
+            str: abs. path of the CI config (.lecture-build-ci.json).
+            List(str): rel. paths of the generated tex files.
+    """
+    rng = random.Random(seed)
+    exercises = [f'UE{i:02d}' for i in range(1, nr_of_exercises + 1)]
+    tex_file_paths = []
+    os.makedirs(os.path.join(base_dir, semester), exist_ok=True)
+    with open(os.path.join(base_dir, semester, 'prelude.tex'), 'w', encoding='utf-8') as file:
+        file.write(PRELUDE)
+    for exercise in exercises:
+        for directory, file_name, title in (('Aufgabe', 'Angabe.tex', 'Angabe'),
+                                            ('Unterricht', 'Lernziele.tex', 'Lernziele')):
+            path = f'{semester}/{exercise}/{directory}/{file_name}'
+            os.makedirs(os.path.join(base_dir, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(base_dir, path), 'w', encoding='utf-8') as file:
+                file.write(tex_document(rng, f'{title} {exercise}', nr_of_paragraphs))
+            tex_file_paths.append(path)
+
+    config_path = os.path.join(base_dir, '.lecture-build-ci.json')
+    with open(config_path, 'w', encoding='utf-8') as file:
+        json.dump({'activeSemester': semester, 'exercises': exercises,
+                   'entryPoints': {'exercise': 'Angabe.tex', 'lesson': 'Lernziele.tex'}}, file, indent=2)
+    return config_path, tex_file_paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('target_dir')
+    parser.add_argument('--semester', default='24SS')
+    parser.add_argument('--exercises', type=int, default=12)
+    parser.add_argument('--paragraphs', type=int, default=40, help="Paragraphs per tex file.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    _, tex_file_paths = generate_semester(args.target_dir, args.semester, args.exercises, args.paragraphs, args.seed)
+    print(f'Generated {len(tex_file_paths)} tex files in {args.target_dir}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+    Shared part of the stand-in chktex/ltex-cli-plus executables: notifications recorded from real chktex and
+    ltex-cli-plus runs are replayed for a deterministic selection of lines of the given tex files.
+
+    Env-variables:
+        FAKE_TOOL_LATENCY (float): seconds to sleep per invocation (e.g. JVM start-up of ltex-cli-plus), default 0.
+        FAKE_TOOL_DENSITY (float): expected number of notifications per non-blank line, default 0.05.
+"""
+import hashlib
+import os
+import time
+
+# (kind, number, message) as printed by chktex 1.7.9
+RECORDED_CHKTEX_NOTIFICATIONS = [
+    ('Warning', 26, 'You ought to remove spaces in front of punctuation.'),
+    ('Warning', 11, 'You should use \\ldots to achieve an ellipsis.'),
+    ('Warning', 18, "Use either `` or '' as an alternative to `\"'."),
+    ('Warning', 37, 'You should avoid spaces after parenthesis.'),
+    ('Warning', 8, 'Wrong length of dash may have been used.'),
+    ('Message', 3, 'You should enclose the previous parenthesis with `{}\'.'),
+]
+
+# (type, message, suggestions) as printed by ltex-cli-plus 18.5.1 (de-AT)
+RECORDED_LTEX_NOTIFICATIONS = [
+    ('info', 'Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]', ['Beispiel', 'Beispiele']),
+    ('warning', 'Möglicherweise fehlt ein Komma. [KOMMA_ZWISCHEN_HAUPT_UND_NEBENSATZ]', ['dass, ']),
+    ('info', 'Zwei aufeinanderfolgende Leerzeichen. [WHITESPACE_RULE]', [' ']),
+    ('warning', 'Dieser Satz fängt nicht mit einem großgeschriebenen Wort an. [UPPERCASE_SENTENCE_START]', ['Die']),
+]
+
+
+def sleep_latency():
+    time.sleep(float(os.getenv('FAKE_TOOL_LATENCY', '0')))
+
+
+def selected_lines(tex_file_path):
+    """
+        Yields:
+            Tuple(int, str, int): line nr., line content and index into the recorded notifications,
+                                  for every line of the tex file that gets a notification.
+    """
+    density = float(os.getenv('FAKE_TOOL_DENSITY', '0.05'))
+    with open(tex_file_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            digest = int(hashlib.sha256(f'{line_number}\0{line}'.encode()).hexdigest()[:8], 16)
+            if (digest % 10000) < density * 10000:
+                yield line_number, line, digest // 10000
+
+
+def column_of(line, digest):
+    words = [i for i, c in enumerate(line) if c != ' ' and (i == 0 or line[i - 1] == ' ')] or [0]
+    return words[digest % len(words)] + 1
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+    Benchmark suite: generates a synthetic semester (see corpus.py), runs the stand-in chktex/ltex-cli-plus
+    executables (see fake_tools/) and times parsing, routing and report rendering of both scripts.
+    Results are written as JSON, to be compared between commits offline.
+
+    Usage: python benchmarks/run_benchmarks.py [--exercises 12] [--paragraphs 40] [--density 0.05]
+                                               [--latency 0] [--repeat 5] [--output benchmark_results.json]
+"""
+import argparse
+import contextlib
+import html
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+FAKE_TOOLS_DIR = os.path.join(BENCHMARKS_DIR, 'fake_tools')
+sys.path.insert(0, os.path.join(REPO_DIR, 'scripts'))
+
+from corpus import generate_semester  # noqa: E402
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(results, name, function, repeat, setup=None):
+    """
+        Times function (repeat times, setup is not timed) and stores min/median/mean in results,
+        items is the size of the result (e.g. nr. of notifications, bytes of a report).
+
+        Returns:
+            value returned by the last call of function.
+    """
+    timings = []
+    value = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = function()
+            timings.append(time.perf_counter() - start)
+    results[name] = {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.mean(timings),
+        'repeat': repeat,
+        'items': len(value) if hasattr(value, '__len__') else value
+    }
+    print(f'{name:<40} {results[name]["median_s"] * 1000:>10.2f} ms  ({results[name]["items"]} items)')
+    return value
+
+
+def diff_for(tex_file_paths, base_dir, changed_line_ratio):
+    """
+        Returns:
+            dict: changed files information in the format of GrantBirki/git-diff-action,
+                  every n-th line of every tex file counted as AddedLine.
+    """
+    step = max(int(1 / changed_line_ratio), 1) if changed_line_ratio > 0 else 0
+    files = []
+    for path in tex_file_paths:
+        with open(os.path.join(base_dir, path), 'r', encoding='utf-8') as file:
+            nr_of_lines = sum(1 for _ in file)
+        changes = [{'type': 'AddedLine', 'lineAfter': line} for line in range(1, nr_of_lines + 1, step)] if step else []
+        changes += [{'type': 'UnchangedLine', 'lineAfter': line, 'lineBefore': line}
+                    for line in range(2, nr_of_lines + 1, 7)]
+        files.append({'path': path, 'chunks': [{'changes': changes}]})
+    return {'type': 'json', 'files': files}
+
+
+def write_html_report(path, console_output):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f'<html><body><pre class="ansi2html-content">{html.escape(console_output)}</pre></body></html>')
+
+
+def run(args):
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='latex-validation-bench-')
+    try:
+        base_dir = os.path.join(work_dir, 'repo')
+        action_dir = os.path.join(work_dir, 'action')
+        os.makedirs(os.path.join(action_dir, 'chktex'))
+        shutil.copy(os.path.join(REPO_DIR, 'chktexrc.in'), action_dir)
+        shutil.copy(os.path.join(REPO_DIR, 'ltex_config.txt'), action_dir)
+        chktex_path = os.path.join(FAKE_TOOLS_DIR, 'chktex')
+        ltex_path = os.path.join(FAKE_TOOLS_DIR, 'ltex-cli-plus')
+        os.symlink(chktex_path, os.path.join(action_dir, 'chktex', 'chktex'))
+        os.environ.update(GITHUB_WORKSPACE=base_dir, GITHUB_ACTION_PATH=action_dir, LTEX_PLUS_DIR=ltex_path,
+                          FAKE_TOOL_LATENCY=str(args.latency), FAKE_TOOL_DENSITY=str(args.density))
+
+        _, tex_file_paths = generate_semester(base_dir, nr_of_exercises=args.exercises,
+                                              nr_of_paragraphs=args.paragraphs, seed=args.seed)
+        tex_file_abs_paths = [os.path.join(base_dir, path) for path in tex_file_paths]
+        nr_of_lines = 0
+        for path in tex_file_abs_paths:
+            with open(path, 'r', encoding='utf-8') as file:
+                nr_of_lines += sum(1 for _ in file)
+
+        changed_lines = importlib.import_module('changed_lines')
+        lint_texs = importlib.import_module('lint_texs')
+        spell_check_texs = importlib.import_module('spell-check_texs')
+        summary_md_file = importlib.import_module('summary_md_file')
+        tex_checks_utils = importlib.import_module('tex_checks_utils')
+        config_file_abs_path = os.path.join(action_dir, lint_texs.CHKTEX_CONFIG_FILE_REL_PATH)
+
+        # Tools are run once to record their output for the parsing-only benchmarks
+        chktex_commands = [[chktex_path, '-g', '-l', config_file_abs_path, f'-V{lint_texs.CHKTEX_RECORD_OUTPUT_FORMAT}',
+                            '-s', lint_texs.CHKTEX_RECORD_FIELD_SEPARATOR, path] for path in tex_file_abs_paths]
+        chktex_records = [subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                                         check=False).stdout for command in chktex_commands]
+        chktex_console = [subprocess.run([chktex_path, '-g', '-l', config_file_abs_path, path], stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, text=True, check=False).stdout
+                          for path in tex_file_abs_paths]
+        ltex_commands = [f'{ltex_path} --client-configuration={os.path.join(action_dir, "ltex_config.txt")} {path}'
+                         for path in tex_file_abs_paths]
+        ltex_console = [subprocess.run(command, shell=True, stdout=subprocess.PIPE, text=True, check=False).stdout
+                        for command in ltex_commands]
+
+        report_dir = os.path.join(base_dir, 'reports')
+        os.makedirs(report_dir)
+        for i, (lint_output, ltex_output) in enumerate(zip(chktex_console, ltex_console)):
+            write_html_report(os.path.join(report_dir, f'{i}_lint-report.html'), lint_output)
+            write_html_report(os.path.join(report_dir, f'{i}_report.html'), ltex_output)
+
+        def all_lint_notifications(parse):
+            notifications = []
+            for output in chktex_records:
+                notifications.extend(parse(output, base_dir)[0])
+            return notifications
+
+        def spell_analize_report():
+            spell_check_run = spell_check_texs.SpellCheckRun()
+            notifications = []
+            for command in ltex_commands:
+                notifications.extend(spell_check_run.mark_checked(spell_check_texs.analize_report(base_dir, command)))
+            return notifications
+
+        measure(results, 'lint.analize_report',
+                lambda: [n for command in chktex_commands for n in lint_texs.analize_report(base_dir, command)[0]],
+                args.repeat)
+        measure(results, 'lint.parse_chktex_records', lambda: all_lint_notifications(lint_texs.parse_chktex_records),
+                args.repeat)
+        measure(results, 'lint.parse_chktex_output',
+                lambda: [n for output in chktex_console for n in lint_texs.parse_chktex_output(output, base_dir)[0]],
+                args.repeat)
+        spelling_notifications = measure(results, 'spell.analize_report', spell_analize_report, args.repeat)
+        measure(results, 'spell.parse_ltex_output',
+                lambda: [n for output in ltex_console for n in spell_check_texs.parse_ltex_output(output, base_dir)],
+                args.repeat)
+        measure(results, 'count_total_warnings.chktex',
+                lambda: sum(tex_checks_utils.count_total_warnings(base_dir, 'reports', f'{i}_lint-report.html',
+                                                                  lint_texs.CHKTEX_NOTIFICATION_PATTERN)
+                            for i in range(len(tex_file_paths))), args.repeat)
+        measure(results, 'count_total_warnings.ltex',
+                lambda: sum(tex_checks_utils.count_total_warnings(base_dir, 'reports', f'{i}_report.html',
+                                                                  spell_check_texs.LTEX_NOTIFICATION_PATTERN, True)
+                            for i in range(len(tex_file_paths))), args.repeat)
+
+        diff = diff_for(tex_file_paths, base_dir, args.changed_lines)
+        changed_files = measure(results, 'spell.clean_up_data',
+                                lambda: spell_check_texs.clean_up_data(diff, tex_file_paths), args.repeat)
+        # The index of the changed lines is built once per file (changed_lines_of), the lookups reuse it
+        changed_lines_per_file = measure(results, 'spell.ChangedLineIndex',
+                                         lambda: {changed_file['path']: changed_lines.ChangedLineIndex(
+                                             changed_file['changed_lines']) for changed_file in changed_files},
+                                         args.repeat)
+        measure(results, 'spell.split_notifications_by_diff',
+                lambda: spell_check_texs.split_notifications_by_diff(spelling_notifications,
+                                                                     changed_lines_per_file)[0], args.repeat)
+        measure(results, 'spell.line_is_in_diff',
+                lambda: [n for n in spelling_notifications
+                         if spell_check_texs.line_is_in_diff(n.line, changed_lines_per_file[n.file])], args.repeat)
+
+        def render_summary(name, notifications_per_file):
+            summary_file = summary_md_file.SummaryMdFile(name, len(notifications_per_file))
+            for path, notifications in notifications_per_file.items():
+                summary_file.add_overview_line(path, 0, len(notifications), 0)
+                for notification in notifications:
+                    summary_file.add_notification_entry(notification)
+            summary_file.add_details_summary_end()
+            return os.path.getsize(summary_file.file_name)
+
+        spelling_per_file = {}
+        for notification in spelling_notifications:
+            spelling_per_file.setdefault(notification.file, []).append(notification)
+        lint_per_file = {path: lint_texs.parse_chktex_records(output, base_dir)[0]
+                         for path, output in zip(tex_file_paths, chktex_records)}
+        measure(results, 'SummaryMdFile.spell_check_report', lambda: render_summary('spell_check_report.md',
+                                                                                     spelling_per_file), args.repeat)
+        measure(results, 'SummaryMdFile.lint_summary', lambda: render_summary('lint_summary.md', lint_per_file),
+                args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {**vars(args), 'nr_of_tex_files': len(tex_file_paths), 'nr_of_lines': nr_of_lines},
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exercises', type=int, default=12, help="Number of exercises (2 tex files each).")
+    parser.add_argument('--paragraphs', type=int, default=40, help="Paragraphs per tex file.")
+    parser.add_argument('--density', type=float, default=0.05, help="Notifications per non-blank line.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per fake tool invocation.")
+    parser.add_argument('--changed_lines', type=float, default=0.1, help="Share of lines in diff.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    report = run(args)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,90 @@
 #!/usr/bin/env python
 
 """
-Main entry point.
+Main entry point: runs the lint (chktex) and the spell-check (LTeX) pipeline in one process.
+
+The config is parsed and the changed tex files are filtered once, then both pipelines run
+concurrently, chktex lints while the JVM of LTeX starts. The scripts (scripts/) are imported
+on demand, a lint-only run e.g. never imports the spell-check dependencies.
+
+Usage: python -m latex_validation_action [--lint true] [--spell_check true] --changedfiles '[...]'
+           --config .lecture-build-ci.json --workdir . [options of the scripts lint_texs.py
+           and spell-check_texs.py]
 """
 
+import argparse
+import importlib
+import logging as log
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / 'scripts'
+TIMING_REPORT_NAME = 'latex-validation'
+
+
+def load_script(name: str) -> ModuleType:
+    """Imports a module of scripts/ (they import each other by their bare names)."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser,
+                           str_to_bool: Callable[[str], bool]) -> None:
+    """Adds the options selecting the pipelines to be run."""
+    parser.add_argument('--lint', type=str_to_bool, nargs='?', const=True, default=True,
+                        help="Lint the tex files with chktex (see scripts/lint_texs.py).")
+    parser.add_argument('--spell_check', type=str_to_bool, nargs='?', const=True, default=True,
+                        help="Spell-check the tex files with LTeX "
+                             "(see scripts/spell-check_texs.py).")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Parses the arguments, loads the config once and runs the selected pipelines concurrently.
+
+    Args:
+        argv (list[str] | None) : The CLI arguments, None for sys.argv.
+    """
+    log.basicConfig(format='%(levelname)s: %(message)s', level=log.DEBUG)
+    log.info("Start check.")
+    tex_checks_utils = load_script('tex_checks_utils')
+
+    # Only the selected pipelines are imported, their options are added afterwards
+    selection_parser = argparse.ArgumentParser(add_help=False)
+    add_pipeline_arguments(selection_parser, tex_checks_utils.str_to_bool)
+    selection, _ = selection_parser.parse_known_args(argv)
+    pipelines = []
+    if selection.spell_check:
+        # Started first, the JVM of LTeX starts up while chktex is linting
+        pipelines.append(load_script('spell-check_texs'))
+    if selection.lint:
+        pipelines.append(load_script('lint_texs'))
+
+    parser = argparse.ArgumentParser(prog='latex_validation_action')
+    add_pipeline_arguments(parser, tex_checks_utils.str_to_bool)
+    tex_checks_utils.add_common_arguments(parser)
+    for pipeline in pipelines:
+        pipeline.add_arguments(parser)
+    args = tex_checks_utils.parse_common_arguments(parser, argv)
+    for pipeline in pipelines:
+        if hasattr(pipeline, 'check_arguments'):
+            pipeline.check_arguments(parser, args)
+
+    config_file = load_script('config').Config(args)
+    filtered_paths = tex_checks_utils.select_tex_files(args, config_file)
+    with ThreadPoolExecutor(max_workers=max(len(pipelines), 1)) as executor:
+        futures = [executor.submit(pipeline.run, args, config_file, list(filtered_paths))
+                   for pipeline in pipelines]
+        for future in futures:
+            future.result()
+
+    base_dir, _ = tex_checks_utils.get_repo_and_action_path_env_variables()
+    load_script('stage_timer').TIMER.write_report(TIMING_REPORT_NAME, base_dir)
+
+
 if __name__ == "__main__":
-    print("Hello World!")
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging as log
+import os
+import threading
+
+from review_comments import RULE_ID_PATTERN
+
+BASELINE_VERSION = 1
+# The lint and the spell-check pipeline may write their sections of one baseline file concurrently (one process)
+SAVE_LOCK = threading.Lock()
+
+
+def normalize_context(text):
+    """
+        Returns:
+            str: text with collapsed whitespace, e.g. re-indentation or re-wrapping keeps a notification known.
+    """
+    return ' '.join(text.split())
+
+
+def baseline_fingerprint(file, rule, context):
+    """
+        Identifies an accepted notification independently of its line nr.
+
+        Args:
+            file (str): rel. path of the tex file (a leading '/' as in LintNotification.file is ignored).
+            rule (str): rule of the notification, e.g. 'Warning 24' (chktex) or 'MORFOLOGIK_RULE_DE_AT' (LTeX).
+            context (str): source context of the notification (see normalize_context).
+
+        Returns:
+            str: fingerprint of file, rule and normalized context.
+    """
+    digest = hashlib.sha256()
+    for part in (file.lstrip('/'), rule, normalize_context(context)):
+        digest.update(f'{part}\0'.encode())
+    return digest.hexdigest()[:32]
+
+
+def lint_fingerprint(notification):
+    """
+        Fingerprint of a LintNotification: its chktex warning and the line of code (without underline).
+    """
+    return baseline_fingerprint(notification.file, notification.type, notification.code_snippet.split('\n')[0])
+
+
+def spelling_fingerprint(notification):
+    """
+        Fingerprint of a SpellingNotification: its LanguageTool rules (or type) and the code snippet incl. the
+        flagged text.
+    """
+    rule = ','.join(RULE_ID_PATTERN.findall(notification.message)) or notification.type
+    return baseline_fingerprint(notification.file, rule, notification.code_snippet)
+
+
+class Baseline:
+    def __init__(self, fingerprints=(), update=False):
+        """
+            Accepted notifications (e.g. the warnings of legacy semesters), only new notifications are reported.
+
+            Args:
+                fingerprints (Iterable(str)): fingerprints of the accepted notifications.
+                update (bool): record the fingerprints of all notifications instead of filtering them,
+                               to regenerate the baseline file (see save).
+        """
+        self.fingerprints = set(fingerprints)
+        self.update = update
+        self.recorded = set()
+        self.nr_of_suppressed = 0
+
+    @classmethod
+    def load(cls, path, tool, update=False):
+        """
+            Loads the section of a tool from the baseline file, a missing file is an empty baseline.
+
+            Args:
+                path (str): path of the baseline file (JSON).
+                tool (str): section of the baseline file, e.g. 'chktex' or 'ltex'.
+                update (bool): see __init__, the baseline file is not read then.
+        """
+        if update:
+            return cls(update=True)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            log.warning(f'Baseline file {path} not found, all notifications are reported.')
+            return cls()
+        fingerprints = data.get(tool, [])
+        log.info(f'Loaded {len(fingerprints)} accepted {tool} notifications from {path}.')
+        return cls(fingerprints)
+
+    def new_notifications(self, notifications, fingerprint_of):
+        """
+            Args:
+                notifications (List(LintNotification or SpellingNotification)): notifications of a run.
+                fingerprint_of (function): fingerprint of a notification (e.g. lint_fingerprint).
+
+            Returns:
+                List: the notifications not in the baseline (all of them while updating the baseline).
+        """
+        if self.update:
+            self.recorded.update(fingerprint_of(notification) for notification in notifications)
+            return list(notifications)
+        new = [notification for notification in notifications if fingerprint_of(notification) not in self.fingerprints]
+        self.nr_of_suppressed += len(notifications) - len(new)
+        return new
+
+    def save(self, path, tool):
+        """
+            Replaces the section of a tool in the baseline file with the recorded fingerprints (sorted, so that the
+            committed file only changes with the notifications).
+        """
+        with SAVE_LOCK:
+            data = {'version': BASELINE_VERSION}
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as file:
+                    data.update(json.load(file))
+            data[tool] = sorted(self.recorded)
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=2)
+                file.write('\n')
+        log.info(f'Wrote {len(self.recorded)} accepted {tool} notifications to baseline file {path}.')
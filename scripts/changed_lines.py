@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+import logging as log
+import re
+import subprocess
+from bisect import bisect_right
+
+# A notification is commented in code if it is at most this many lines away from an added line
+DIFF_CONTEXT_LINES = 2
+# Hunk header of a diff without context lines, e.g. "@@ -12,0 +13,2 @@", the count defaults to 1
+GIT_HUNK_HEADER_PATTERN = re.compile(r'^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@')
+
+
+class ChangedLineIndex:
+    def __init__(self, changed_lines, context=DIFF_CONTEXT_LINES):
+        """
+            Sorted, merged line ranges [changed line - context, changed line + context] of one file,
+            a line is looked up with bisect instead of scanning all changed lines.
+
+            Args:
+                changed_lines (List(int)): line nr. of AddedLines in diff (any order, duplicates allowed).
+                context (int): number of lines around a changed line that count as in diff.
+        """
+        self.starts = []
+        self.ends = []
+        for line in sorted(set(changed_lines)):
+            start, end = line - context, line + context
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, line):
+        i = bisect_right(self.starts, line) - 1
+        return i >= 0 and line <= self.ends[i]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f'ChangedLineIndex({list(zip(self.starts, self.ends))})'
+
+
+def parse_git_diff(lines):
+    """
+        Collects the added lines per file from the output of `git diff -U0`, only the file and hunk headers
+        are evaluated.
+
+        Args:
+            lines (Iterable(str)): lines of the diff (with prefixes a/ and b/, without line breaks).
+
+        Returns:
+            dict: rel. path of file -> set of line nr. of AddedLines (empty if only lines were deleted).
+    """
+    changed_lines_per_file = {}
+    changed_lines = None
+    in_file_header = False
+    for line in lines:
+        if line.startswith('diff --git '):
+            in_file_header = True
+        elif in_file_header and line.startswith('+++ b/'):
+            # git appends a tab to paths containing spaces
+            changed_lines = changed_lines_per_file.setdefault(line[len('+++ b/'):].rstrip('\t'), set())
+        elif line.startswith('@@'):
+            in_file_header = False
+            match = GIT_HUNK_HEADER_PATTERN.match(line)
+            if match and changed_lines is not None:
+                start = int(match.group('start'))
+                count = int(match.group('count') or 1)
+                changed_lines.update(range(start, start + count))
+    return changed_lines_per_file
+
+
+def git_changed_lines(repo_dir, paths, diff_base):
+    """
+        Determines the added lines of the given files with `git diff` against the merge base of diff_base and HEAD,
+        instead of the diff-JSON of action GrantBirki/git-diff-action. The diff is streamed, without context lines
+        and only for added or modified files.
+
+        Args:
+            repo_dir (str): path of the git repository.
+            paths (List(str)): rel. paths of the files of interest (e.g. the changed tex files).
+            diff_base (str): git revision the changes are based on, e.g. origin/main.
+
+        Returns:
+            dict: rel. path of file -> set of line nr. of AddedLines, only for files in the diff.
+
+        Raises:
+            subprocess.CalledProcessError: if git fails, e.g. without merge base in a shallow clone.
+    """
+    if not paths:
+        return {}
+    command = ['git', '-C', repo_dir, '-c', 'core.quotepath=false', 'diff', '-U0', '--diff-filter=AM',
+               '--no-renames', '--no-color', '--no-ext-diff', '--src-prefix=a/', '--dst-prefix=b/',
+               f'{diff_base}...HEAD', '--', *paths]
+    log.info(f'command: {" ".join(command)}')
+    with subprocess.Popen(command, stdout=subprocess.PIPE, encoding='utf-8', errors='replace') as process:
+        changed_lines_per_file = parse_git_diff(line.rstrip('\n') for line in process.stdout)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return changed_lines_per_file
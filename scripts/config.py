@@ -40,6 +40,29 @@ class Config():
             self.lesson_entry_point: str = json_config['entryPoints']['lesson']
             self.options = options
 
+    def entry_documents(self) -> list[str]:
+        """
+        Determines the entry documents of the active semester: the exercise and the
+        lesson entry point of every exercise.
+
+        Returns:
+            (list[str]) The paths of the entry documents, relative to the working directory.
+        """
+        documents = []
+        for exercise in self.exercises:
+            documents.append(f'{self.active_semester}/{exercise}/{EXERCISE_DIR_NAME}/{self.exercises_entry_point}')
+            documents.append(f'{self.active_semester}/{exercise}/{LESSON_DIR_NAME}/{self.lesson_entry_point}')
+        return documents
+
+    def semester_tex_files(self) -> list[str]:
+        """
+        Discovers all tex files of the active semester (for a full-semester scan).
+
+        Returns:
+            (list[str]) The sorted paths of the tex files, relative to the working directory.
+        """
+        return sorted(path.relative_to(self.options.workdir).as_posix() for path in self.workdir.rglob('*.tex'))
+
     def determine_semester(self) -> int:
         """
         Extracts the semester number from the `self.active_semester` string.
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+import logging as log
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_API_URL = 'https://api.github.com'
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Requests that may have taken effect despite a server error are only retried if repeating them is harmless,
+# e.g. a retried POST of a review could post the review twice
+IDEMPOTENT_METHODS = {'GET', 'DELETE', 'PATCH'}
+
+# GitHub does not document a limit for comments per review, large reviews are split to stay below request limits
+MAX_COMMENTS_PER_REVIEW = 50
+PER_PAGE = 100
+
+
+class GitHubApiError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PullRequestClient:
+    def __init__(self, token, repository, pr_number, api_url=None, max_workers=DEFAULT_MAX_WORKERS,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_seconds=DEFAULT_BACKOFF_SECONDS):
+        """
+            Client for the review comments of one pull request. All requests go through one pooled HTTP session,
+            rate limits (429, secondary rate limits 403 + Retry-After) are retried with backoff, server and
+            connection errors only for IDEMPOTENT_METHODS.
+
+            Args:
+                token (str): GitHub token, e.g. env-variable GITHUB_TOKEN.
+                repository (str): owner/repo, e.g. env-variable GITHUB_REPOSITORY.
+                pr_number (int): number of the pull request.
+                api_url (str): base URL of the REST API, e.g. env-variable GITHUB_API_URL (GitHub Enterprise).
+                max_workers (int): maximum number of concurrent requests.
+                max_retries (int): maximum number of retries per request.
+                backoff_seconds (float): initial backoff, doubled for every retry (unless the response says otherwise).
+        """
+        self.api_url = (api_url or DEFAULT_API_URL).rstrip('/')
+        self.repository = repository
+        self.pr_number = pr_number
+        self.max_workers = max(max_workers, 1)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._head_sha = None
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28'
+        })
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+            Creates the client from the env-variables of a GitHub workflow run on a pull request
+            (GITHUB_REF is refs/pull/<number>/merge).
+        """
+        pr_number = int(os.getenv('GITHUB_REF').split('/')[-2])
+        return cls(os.getenv('GITHUB_TOKEN'), os.getenv('GITHUB_REPOSITORY'), pr_number,
+                   api_url=os.getenv('GITHUB_API_URL'), **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def pull_path(self):
+        return f'/repos/{self.repository}/pulls/{self.pr_number}'
+
+    def head_sha(self):
+        """
+            Returns:
+                str: SHA of the latest commit of the pull request (fetched once).
+        """
+        if self._head_sha is None:
+            self._head_sha = self.request('GET', self.pull_path).json()['head']['sha']
+        return self._head_sha
+
+    def authenticated_login(self):
+        """
+            Returns:
+                str: login of the user of the token, None if the token may not read it (e.g. the GITHUB_TOKEN
+                     of a workflow, whose comments are posted by github-actions[bot] like those of other workflows).
+        """
+        try:
+            return self.request('GET', '/user').json()['login']
+        except GitHubApiError as e:
+            log.info(f'Login of the token is unknown: {e}')
+            return None
+
+    def get_review_comments(self):
+        """
+            Returns:
+                List(dict): all review comments of the pull request (see REST API "List review comments").
+        """
+        return self.paginate(f'{self.pull_path}/comments')
+
+    def create_review(self, comments, body=''):
+        """
+            Posts review comments as few pull request reviews (MAX_COMMENTS_PER_REVIEW comments each)
+            instead of one request per comment. If GitHub rejects a review (422, e.g. a line is not part of the
+            diff), its comments are posted one by one, so that only the invalid comments get lost.
+
+            Args:
+                comments (List(dict)): comments with keys path, line and body.
+                body (str): body of the review itself.
+
+            Returns:
+                int: number of posted comments.
+        """
+        nr_of_posted_comments = 0
+        for start in range(0, len(comments), MAX_COMMENTS_PER_REVIEW):
+            chunk = [{'path': c['path'], 'line': c['line'], 'side': 'RIGHT', 'body': c['body']}
+                     for c in comments[start:start + MAX_COMMENTS_PER_REVIEW]]
+            try:
+                self.request('POST', f'{self.pull_path}/reviews',
+                             json={'commit_id': self.head_sha(), 'event': 'COMMENT', 'body': body,
+                                   'comments': chunk})
+                nr_of_posted_comments += len(chunk)
+            except GitHubApiError as e:
+                if e.status_code != 422:
+                    raise
+                log.warning(f'Review with {len(chunk)} comments rejected, posting them one by one: {e}')
+                nr_of_posted_comments += sum(self._map(self._create_review_comment, chunk))
+        return nr_of_posted_comments
+
+    def _create_review_comment(self, comment):
+        try:
+            self.request('POST', f'{self.pull_path}/comments', json={'commit_id': self.head_sha(), **comment})
+            return 1
+        except GitHubApiError as e:
+            if e.status_code != 422:
+                raise
+            log.warning(f'Review comment {comment["path"]}:{comment["line"]} rejected: {e}')
+            return 0
+
+    def delete_review_comments(self, comment_ids):
+        """
+            Deletes review comments concurrently (at most max_workers requests at once),
+            comments that do not exist anymore are ignored.
+
+            Returns:
+                int: number of deleted comments.
+        """
+        return sum(self._map(self._delete_review_comment, comment_ids))
+
+    def _delete_review_comment(self, comment_id):
+        try:
+            self.request('DELETE', f'/repos/{self.repository}/pulls/comments/{comment_id}')
+            return 1
+        except GitHubApiError as e:
+            if e.status_code != 404:
+                raise
+            return 0
+
+    def _map(self, function, items):
+        items = list(items)
+        if len(items) <= 1 or self.max_workers == 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(function, items))
+
+    def paginate(self, path):
+        """
+            Returns:
+                List(dict): items of all pages of a list endpoint (following the Link header).
+        """
+        items = []
+        url = f'{self.api_url}{path}'
+        params = {'per_page': PER_PAGE}
+        while url:
+            response = self.request('GET', url, params=params)
+            items.extend(response.json())
+            url = response.links.get('next', {}).get('url')
+            params = None
+        return items
+
+    def request(self, method, path_or_url, **kwargs):
+        """
+            Sends a request, retries on rate limits and, for IDEMPOTENT_METHODS, on server and connection errors
+            (a rate limited request was not processed, a failed one possibly was).
+
+            Returns:
+                requests.Response: successful response.
+
+            Raises:
+                GitHubApiError: the request failed (finally).
+        """
+        url = path_or_url if path_or_url.startswith(('http://', 'https://')) else f'{self.api_url}{path_or_url}'
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            except requests.RequestException as e:
+                if attempt == self.max_retries or method not in IDEMPOTENT_METHODS:
+                    raise GitHubApiError(f'{method} {url} failed: {e}') from e
+                self._sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code < 400:
+                return response
+            delay = self._retry_delay(method, response, attempt)
+            if delay is None or attempt == self.max_retries:
+                raise GitHubApiError(f'{method} {url} failed: {response.status_code} {response.text}',
+                                     response.status_code)
+            log.info(f'{method} {url}: {response.status_code}, retrying in {delay:.1f}s')
+            self._sleep(delay)
+        raise GitHubApiError(f'{method} {url} failed')
+
+    def _retry_delay(self, method, response, attempt):
+        """
+            Returns:
+                float: seconds to wait before the request is retried, None if it must not be retried.
+        """
+        retry_after = response.headers.get('Retry-After')
+        rate_limit_exceeded = response.headers.get('X-RateLimit-Remaining') == '0'
+        rate_limited = response.status_code == 429 or (
+            response.status_code == 403 and (retry_after or rate_limit_exceeded))
+        if not rate_limited and (response.status_code not in RETRY_STATUS_CODES or method not in IDEMPOTENT_METHODS):
+            return None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        reset = response.headers.get('X-RateLimit-Reset')
+        if rate_limit_exceeded and reset and reset.isdigit():
+            return min(max(float(reset) - time.time(), 0.0), MAX_BACKOFF_SECONDS)
+        return self._backoff(attempt)
+
+    def _backoff(self, attempt):
+        return min(self.backoff_seconds * 2 ** attempt, MAX_BACKOFF_SECONDS)
+
+    @staticmethod
+    def _sleep(seconds):
+        time.sleep(seconds)
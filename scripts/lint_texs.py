@@ -1,23 +1,40 @@
 #!/usr/bin/env python
-import ast
 import re
 import argparse
 import logging as log
 import subprocess
 import os
+import tempfile
 
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
+from baseline import Baseline, lint_fingerprint
 from config import Config
+from source_overlay import PRELUDE_INPUT_NAME, SourceOverlay
+from result_cache import ResultCache, executable_fingerprint
+from stage_timer import TIMER, stage
 from summary_md_file import SummaryMdFile
-from tex_checks_utils import count_total_warnings, get_repo_and_action_path_env_variables
-
-already_checked_files = set()
-nr_of_total_warnings_for_zip = 0
-nr_of_total_warnings_for_md_file = 0
+from tex_dependencies import ReverseDependencyIndex, TexDependencyGraph
+from tex_checks_utils import (add_common_arguments, capture_console_report, get_repo_and_action_path_env_variables,
+                              parse_common_arguments, select_tex_files, split_lines, str_to_bool, worker_process_pool)
 
 CHKTEX_EXEC_REL_PATH = 'chktex/chktex'
 CHKTEX_CONFIG_FILE_REL_PATH = 'chktexrc.in'
+DEPENDENCY_INDEX_FILE_NAME = 'tex_dependencies.json'
+
+# Matches lines like: "24SS/UE01/Aufgabe/file.tex, Warning 21, 43, This command might not be intended."
+CHKTEX_NOTIFICATION_PATTERN = re.compile("(.+), (Warning|Error|Message) (\\d+), (\\d+), (.+)")
+
+# Entry of OutFormat in chktexrc.in: file, kind, number, line, column, message, code line, underline
+CHKTEX_RECORD_OUTPUT_FORMAT = 7
+CHKTEX_RECORD_FIELD_SEPARATOR = '\x1f'
+CHKTEX_RECORD_NR_OF_FIELDS = 8
+# A message may span several lines (!n in a message of chktexrc.in), it is the 6th field of a record
+CHKTEX_RECORD_MESSAGE_FIELD_NR = 6
+# Matches the underline below the code line of a notification (empty if chktex reports no position)
+CHKTEX_UNDERLINE_PATTERN = re.compile('[ \t^]*\r?')
+# Section of the chktex notifications in the baseline file
+BASELINE_SECTION = 'chktex'
 
 
 class LintNotification:
@@ -33,130 +50,347 @@ class LintNotification:
                f"type={self.type}, line={self.line}, message={self.message}, code_snippet={self.code_snippet})"
 
 
-def find_line_number(filename, target_string):
-    with open(filename, 'r') as file:
-        for line_number, line in enumerate(file, start=1):
-            if target_string in line:
-                return line_number
-    return None
+class LintResult:
+    def __init__(self, tex_file_path: str, notifications: list, files: set, nr_of_warnings_for_zip: int,
+                 html_report_path: str):
+        """
+            Outcome of linting one tex file, not yet merged into the run (see LintRun.merge).
+
+            Args:
+                tex_file_path (str): rel. path to linted tex file.
+                notifications (List(LintNotification)): all parsed notifications (incl. nested tex files).
+                files (set): abs. paths of all tex files chktex reported on.
+                nr_of_warnings_for_zip (int): number of notifications counted in the captured html report.
+                html_report_path (str): path of the captured html report, None if not created.
+        """
+        self.tex_file_path = tex_file_path
+        self.notifications = notifications
+        self.files = files
+        self.nr_of_warnings_for_zip = nr_of_warnings_for_zip
+        self.html_report_path = html_report_path
+        # Stage timings (see StageTimer.records) if linted in a worker process, to be added to the TIMER of the run
+        self.timings = []
+
+
+class LintRun:
+    def __init__(self, create_zipped_report: bool, create_md_summary: bool, summary_file: SummaryMdFile,
+                 result_cache: ResultCache = None, hide_prelude: bool = False, baseline: Baseline = None):
+        """
+            State of one lint run: the results of the individual tex files are merged in input order,
+            so that the report does not depend on the order in which chktex processes finish.
+
+            Args:
+                create_zipped_report (bool): Option to capture chktex's console output into a html file.
+                create_md_summary (bool): Option to transform chktex's notifications to a md-report file.
+                summary_file (SummaryMdFile): summary file object where are notifications are written (md-file)
+                result_cache (ResultCache): cache of parsed notifications, None to always run chktex.
+                hide_prelude (bool): Option to lint the tex files without their prelude import.
+                baseline (Baseline): accepted notifications, not reported; None to report all.
+        """
+        self.create_zipped_report = create_zipped_report
+        self.create_md_summary = create_md_summary
+        self.summary_file = summary_file
+        self.result_cache = result_cache
+        self.hide_prelude = hide_prelude
+        self.baseline = baseline
+        self.already_checked_files = set()
+        self.nr_of_total_warnings_for_zip = 0
+        self.nr_of_total_warnings_for_md_file = 0
+
+    def merge(self, result: LintResult):
+        """
+            Counts the notifications of a linted tex file and writes them to the report (md-file).
+            Notifications of tex files already checked (e.g. nested via an earlier tex file) and the ones
+            in the baseline are skipped.
+        """
+        TIMER.add_records(result.timings)
+        self.nr_of_total_warnings_for_zip += result.nr_of_warnings_for_zip
+        if not self.create_md_summary:
+            return
+        if not self.summary_file:
+            log.error("Summary file is none, writing report not feasible.")
+            return
+
+        nr_of_notifications = {
+            'Error': 0,
+            'Warning': 0,
+            'Message': 0
+        }
+        notifications = [n for n in result.notifications if n.file not in self.already_checked_files]
+        if self.baseline:
+            notifications = self.baseline.new_notifications(notifications, lint_fingerprint)
+        for notification in notifications:
+            kind = notification.type.split()[0]
+            nr_of_notifications.update({kind: (nr_of_notifications.get(kind) + 1)})
+        self.nr_of_total_warnings_for_md_file += len(notifications)
+
+        if notifications:
+            # Write report to summary md file
+            self.summary_file.add_overview_line(result.tex_file_path,
+                                                nr_of_notifications.get('Error'),
+                                                nr_of_notifications.get('Warning'),
+                                                nr_of_notifications.get('Message'))
 
+            for notification in notifications:
+                self.summary_file.add_notification_entry(notification)
+        else:
+            log.info(f'After chktex-run notifications are: {notifications}')
 
-def uncomment_prelude_import(tex_file_abs_path, target_line, do_uncomment):
-    if do_uncomment:
-        replacement = "%\\input{../../prelude}\n"
-    else:
-        replacement = "\\input{../../prelude}\n"
-
-    with open(tex_file_abs_path, 'r') as file:
-        lines = file.readlines()
-        with open(tex_file_abs_path, 'w') as updated_file:
-            if target_line <= len(lines):
-                lines[target_line - 1] = replacement
-                # file.seek(0)
-                updated_file.writelines(lines)
-            else:
-                print(f"Line {target_line} does not exist in the file.")
+        # Update checked files
+        self.already_checked_files.update(result.files)
 
 
-def analize_report(base_dir, command, target_file_path, summary_file: SummaryMdFile):
+def analize_report(base_dir, command):
     """
-        Performs linting (with chktex) on specified tex file,
-        collects the chktex-warnings/errors/messages (notifications) and writes them to a report file (md-file).
+        Performs linting (with chktex) on specified tex file and
+        collects the chktex-warnings/errors/messages (notifications).
+        chktex is run without a TTY, its records (see CHKTEX_RECORD_OUTPUT_FORMAT) are parsed.
 
         Args:
             base_dir (str): Path of repo base directory.
-            command (str): chktex command to perform linting on a specific chktex file, considering a chktex-config file
-            target_file_path(str): relative path to tex file to be linted
-            summary_file (SummaryMdFile): summary file object where are notifications are written (md-file)
+            command (List(str)): chktex command to perform linting on a specific chktex file,
+                                 considering a chktex-config file
 
         Returns:
-            List(LintNotifications): Collection of remaining notifications
+            List(LintNotifications): Collection of notifications, in order of appearance
+            set: abs. paths of all tex files chktex reported on
     """
-
+    log.info(f'command: {command}')
+    files = set()
     try:
-        log.info(f'command: {command}')
-        output = subprocess.check_output(command, shell=True, encoding='utf-8', errors='replace')
-        # log.info(output)
-        lines = output.split("\n")
-
-        # Run over lines of raw chktex-report and parse warnings/errors/messages into objects LintNotification
-        i = 0
-        files = set()
-        notifications = []
-        nr_of_notifications = {
-            'Error': 0,
-            'Warning': 0,
-            'Message': 0
-        }
-        while i < len(lines):
-            first_line = lines[i]
-            second_line = lines[i + 1] if i + 1 < len(lines) else ""
-            third_line = lines[i + 2] if i + 2 < len(lines) else ""
-            step = 3
-
-            # Match lines like: "Warning 21, 43, This command might not be intended."
-            pattern = "(.+), (Warning|Error|Message) (\\d+), (\\d+), (.+)"
-            match = re.match(pattern, first_line)
-            if match:
-                file = match.group(1).removeprefix(base_dir)
-                file = os.path.abspath(file)
-                files.add(file)
-
-                # Avoid checking tex files twice
-                if file not in already_checked_files:
-                    global nr_of_total_warnings_for_md_file
-                    nr_of_total_warnings_for_md_file += 1
-                    type = f'{match.group(2)} {match.group(3)}'
-                    line = int(match.group(4))
-                    message = match.group(5)
-                    code_snippet = f'{second_line}\n{third_line}'
-                    nr_of_notifications.update({type.split()[0]: (nr_of_notifications.get(type.split()[0]) + 1)})
-
-                    # A message may span across multiple lines
-                    while (i + step) < len(lines) and not re.match(pattern, lines[i + step]):
-                        message = f'{message}\n{lines[i + step]}'
-                        step = step + 1
-
-                    notifications.append(LintNotification(file, type, line, message, code_snippet))
+        # chktex exits with 2 if warnings were printed, therefore the return code is not checked;
+        # its records are parsed while chktex is running
+        with tempfile.TemporaryFile('w+', encoding='utf-8', errors='replace') as stderr_file, \
+                subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file,
+                                 encoding='utf-8', errors='replace') as process:
+            notifications = list(iter_chktex_records(split_lines(process.stdout), base_dir, files))
+            process.wait()
+            if process.returncode not in (0, 2) and not notifications:
+                stderr_file.seek(0)
+                print(stderr_file.read())
+    except OSError as e:
+        print(e)
+        return [], set()
+    return notifications, files
+
+
+def repo_file(file_path, base_dir):
+    """
+        Representation of a tex file in LintNotification.file: its path relative to the repo base directory with a
+        leading '/' (e.g. '/24SS/prelude.tex' for '<base_dir>/24SS/UE01/../prelude.tex'), independent of where the
+        repo is checked out (see baseline.lint_fingerprint).
+
+        Args:
+            file_path (str): path of a tex file as reported by chktex (relative to the working directory if
+                             base_dir is not set).
+            base_dir (str): Path of repo base directory.
+    """
+    return f'/{os.path.relpath(file_path, base_dir or os.curdir)}'
+
+
+def iter_chktex_records(lines, base_dir, files):
+    """
+        Parses the records of chktex (one per line, fields separated by CHKTEX_RECORD_FIELD_SEPARATOR)
+        into LintNotifications, one line at a time. The lines of a multi-line message are joined into one record.
+
+        Args:
+            lines (Iterable(str)): lines of the console output of chktex with format CHKTEX_RECORD_OUTPUT_FORMAT.
+            base_dir (str): Path of repo base directory.
+            files (set): abs. paths of all tex files chktex reported on are added.
+
+        Yields:
+            LintNotification: notifications, in order of appearance.
+    """
+    record = None
+    for output_line in lines:
+        record = output_line if record is None else f'{record}\n{output_line}'
+        fields = record.split(CHKTEX_RECORD_FIELD_SEPARATOR)
+        if len(fields) == CHKTEX_RECORD_MESSAGE_FIELD_NR:
+            # The message continues on the next line
+            continue
+        record = None
+        if len(fields) != CHKTEX_RECORD_NR_OF_FIELDS:
+            continue
+        file, kind, number, line, _, message, code_line, underline = fields
+        file = repo_file(file, base_dir)
+        files.add(file)
+        yield LintNotification(file, f'{kind} {number}', int(line), message, f'{code_line}\n{underline}')
+
+
+def parse_chktex_records(output, base_dir):
+    """
+        Parses the records of chktex (see iter_chktex_records).
+
+        Returns:
+            List(LintNotifications): Collection of notifications, in order of appearance
+            set: abs. paths of all tex files chktex reported on
+    """
+    files = set()
+    return list(iter_chktex_records(output.split('\n'), base_dir, files)), files
+
+
+def chktex_output_notification(match, following_lines, base_dir, files):
+    """
+        Creates the LintNotification of a notification in the (TTY) console output of chktex.
+
+        Args:
+            match (re.Match): match of CHKTEX_NOTIFICATION_PATTERN.
+            following_lines (List(str)): lines after the matched line, up to and including the underline:
+                                         further lines of the message, the code line and the underline.
+            base_dir (str): Path of repo base directory.
+            files (set): abs. path of the tex file is added.
+    """
+    *message_lines, code_line, underline = following_lines + [''] * (2 - len(following_lines))
+    file = repo_file(match.group(1), base_dir)
+    files.add(file)
+    return LintNotification(file, f'{match.group(2)} {match.group(3)}', int(match.group(4)),
+                            '\n'.join([match.group(5), *message_lines]), f'{code_line}\n{underline}')
+
+
+def iter_chktex_output(lines, base_dir, files):
+    """
+        Parses the (TTY) console output of chktex into LintNotifications, one line at a time,
+        used if the console output is captured for the html report anyway.
+
+        Args:
+            lines (Iterable(str)): lines of the console output of chktex.
+            base_dir (str): Path of repo base directory.
+            files (set): abs. paths of all tex files chktex reported on are added.
+
+        Yields:
+            LintNotification: notifications, in order of appearance.
+    """
+    # Run over lines of raw chktex-report and parse warnings/errors/messages into objects LintNotification,
+    # every notification consists of 3 lines (see OutFormat -v2 in chktexrc.in), a multi-line message
+    # (like in iter_chktex_records) adds lines before the code line
+    match = None
+    following_lines = []
+    for line in lines:
+        if match:
+            if following_lines and CHKTEX_NOTIFICATION_PATTERN.match(line):
+                # No underline found, the notification is cut off
+                yield chktex_output_notification(match, following_lines[:2], base_dir, files)
             else:
-                step = 1
-            i = i + step
+                following_lines.append(line)
+                if len(following_lines) >= 2 and CHKTEX_UNDERLINE_PATTERN.fullmatch(line):
+                    yield chktex_output_notification(match, following_lines, base_dir, files)
+                    match = None
+                continue
 
-        if notifications:
-            # Write report to summary md file
-            summary_file.add_overview_line(target_file_path,
-                                           nr_of_notifications.get('Error'),
-                                           nr_of_notifications.get('Warning'),
-                                           nr_of_notifications.get('Message'))
+        # Match lines like: "Warning 21, 43, This command might not be intended."
+        match = CHKTEX_NOTIFICATION_PATTERN.match(line)
+        following_lines = []
 
-            for notification in notifications:
-                summary_file.add_notification_entry(notification)
-        else:
-            log.info(f'After chktex-run notifications are: {notifications}')
+    if match:
+        yield chktex_output_notification(match, following_lines[:2], base_dir, files)
 
-        # Update checked files
-        already_checked_files.update(files)
 
-    except subprocess.CalledProcessError as e:
-        output = str(e.output, 'utf-8')
-        print(output)
+def parse_chktex_output(output, base_dir):
+    """
+        Parses the (TTY) console output of chktex (see iter_chktex_output).
+
+        Returns:
+            List(LintNotifications): Collection of notifications, in order of appearance
+            set: abs. paths of all tex files chktex reported on
+    """
+    files = set()
+    return list(iter_chktex_output(output.split("\n"), base_dir, files)), files
+
+
+def map_overlay_notifications(result: LintResult, overlay: SourceOverlay, checked_file_abs_path, base_dir):
+    """
+        Attributes the notifications on the edited copy of a tex file (see SourceOverlay) to the original tex file.
+    """
+    if checked_file_abs_path == overlay.tex_file_abs_path:
+        return
+    checked_file = repo_file(checked_file_abs_path, base_dir)
+    original_file = repo_file(overlay.tex_file_abs_path, base_dir)
+    for notification in result.notifications:
+        if notification.file == checked_file:
+            notification.file = original_file
+            notification.line = overlay.original_line(notification.line)
+    if checked_file in result.files:
+        result.files.discard(checked_file)
+        result.files.add(original_file)
+
+
+def write_tex_inputs_config(directory, tex_inputs_dir):
+    """
+        Writes a chktexrc into the given (private) directory, which adds tex_inputs_dir to the directories chktex
+        searches for \\input/\\include files. Given after chktexrc.in (-l), the config of the action still applies.
+
+        Args:
+            directory (str): abs. path of the directory the chktexrc is written to.
+            tex_inputs_dir (str): abs. path of the directory to be searched.
+
+        Returns:
+            str: abs. path of the chktexrc.
+    """
+    config_file_abs_path = os.path.join(directory, 'chktexrc')
+    with open(config_file_abs_path, 'w', encoding='utf-8') as file:
+        file.write(f'TeXInputs\n{{\n"{tex_inputs_dir}"\n}}\n')
+    return config_file_abs_path
+
+
+def run_chktex(result: LintResult, checked_file_abs_path, config_file_abs_paths, html_report_path,
+               create_zipped_report: bool, parse_notifications: bool):
+    """
+        Runs chktex on the (possibly edited) tex file with the given chktexrc files, see use_chktex.
+    """
+    base_dir, action_base_dir = get_repo_and_action_path_env_variables()
+    config_options = [option for path in config_file_abs_paths for option in ('-l', path)]
+    chktex_path = os.path.join(action_base_dir, CHKTEX_EXEC_REL_PATH)
+
+    # Perform linting and save console output to html-file
+    output_lines = None
+    if create_zipped_report:
+        # report_folder = "" # set manually if required to run locally
+        report_folder = os.getenv('LINT_REPORT_FOLDER')
+        log.info(f'report_folder: {report_folder}')
+
+        # Create the directory if it doesn't exist
+        os.makedirs(os.path.join(base_dir, report_folder), exist_ok=True)
+
+        # Perform linting and save console output to html-file (with a TTY to keep the color coding),
+        # the same chktex run also feeds the md-file (unless the result is cached)
+        command = f'script -q -c "{chktex_path} -g {" ".join(config_options)} {checked_file_abs_path}" /dev/null'
+        if parse_notifications:
+            output_lines = []
+        result.html_report_path = f'{report_folder}/{html_report_path}'
+        log.info(f'capture_console_report: {result.html_report_path}')
+        result.nr_of_warnings_for_zip = capture_console_report(command, os.path.join(base_dir, result.html_report_path),
+                                                               CHKTEX_NOTIFICATION_PATTERN, output_lines=output_lines)
+
+    # Process output and create md. file
+    if parse_notifications:
+        if output_lines is not None:
+            result.notifications = list(iter_chktex_output(split_lines(output_lines), base_dir, result.files))
+        else:
+            command = [chktex_path, '-g', *config_options, f'-V{CHKTEX_RECORD_OUTPUT_FORMAT}',
+                       '-s', CHKTEX_RECORD_FIELD_SEPARATOR, checked_file_abs_path]
+            result.notifications, result.files = analize_report(base_dir, command)
 
 
-def use_chktex(tex_file_path, create_zipped_report: bool, create_md_summary: bool, summary_file: SummaryMdFile):
+def use_chktex(tex_file_path, create_zipped_report: bool, create_md_summary: bool, result_cache: ResultCache = None,
+               hide_prelude: bool = False):
     """
         Performs linting on the tex file specified,
         the resulting chktex-warnings/messages/errors (notifications) will be provided, depending on option:
             as captured-console-output in html or
-            as md-file.
+            as notifications for the md-file.
+        Only touches files of its own, therefore it can be run concurrently for different tex files.
+        The tex file is never modified, edits (hiding the prelude import) are applied to an in-memory copy.
 
         Args:
             tex_file_path (str): Path to tex file to be linted.
             create_zipped_report (bool): Option to capture chktex's console output into a html file.
             create_md_summary (bool): Option to transform chktex's notifications to a md-report file.
-            summary_file (SummaryMdFile): summary file object where are notifications are written (md-file)
+            result_cache (ResultCache): cache of parsed notifications, None to always run chktex.
+            hide_prelude (bool): Option to comment out the prelude import (e.g. \\input{../../prelude}),
+                                 which is not resolvable from the repo root.
 
         Returns:
-            void.
+            LintResult: result to be merged into the LintRun.
     """
 
     # Retrieve the value of GITHUB_WORKSPACE
@@ -175,94 +409,196 @@ def use_chktex(tex_file_path, create_zipped_report: bool, create_md_summary: boo
     parts[-1] = f'{filename_without_extension}_lint-report.html'
     html_report_path = '-'.join(parts)
 
-    # Perform linting and save console output to html-file
-    if create_zipped_report:
-        # report_folder = "" # set manually if required to run locally
-        report_folder = os.getenv('LINT_REPORT_FOLDER')
-        log.info(f'report_folder: {report_folder}')
+    result = LintResult(tex_file_path, [], set(), 0, None)
+
+    cached = None
+    if create_md_summary and result_cache:
+        cache_key = result_cache.key_for(tex_file_abs_path, base_dir)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            log.info(f'Using cached chktex result for {tex_file_path}')
+            result.notifications = [LintNotification(**record) for record in cached['notifications']]
+            result.files = set(cached['files'])
+
+    if create_zipped_report or (create_md_summary and cached is None):
+        overlay = SourceOverlay(tex_file_abs_path)
+        if hide_prelude:
+            overlay.comment_out_inputs(PRELUDE_INPUT_NAME)
+        with stage('chktex', tex_file_path), overlay.materialize() as checked_file_abs_path:
+            config_file_abs_paths = [config_file_abs_path]
+            if checked_file_abs_path != tex_file_abs_path:
+                # The edited copy is outside the checkout, relative inputs are resolved from the original directory
+                config_file_abs_paths.append(write_tex_inputs_config(os.path.dirname(checked_file_abs_path),
+                                                                     os.path.dirname(tex_file_abs_path)))
+            run_chktex(result, checked_file_abs_path, config_file_abs_paths, html_report_path, create_zipped_report,
+                       create_md_summary and cached is None)
+        map_overlay_notifications(result, overlay, checked_file_abs_path, base_dir)
+
+    if create_md_summary and cached is None and result_cache:
+        result_cache.put(cache_key, {'notifications': [vars(n) for n in result.notifications],
+                                     'files': sorted(result.files)})
+
+    return result
+
+
+def use_chktex_in_worker(*args):
+    """
+        Runs use_chktex in a worker process, the stage timings recorded there are returned with its result.
 
-        # Create the directory if it doesn't exist
-        os.makedirs(f'{base_dir}/{report_folder}', exist_ok=True)
+        Args:
+            args: see use_chktex.
 
-        # Perform spell check and save console output to html-file
-        command = f'script -q -c "{chktex_path} -g -l {config_file_abs_path} {tex_file_abs_path}" /dev/null | ansi2html > {report_folder}/{html_report_path}'
-        subprocess.run(command, shell=True, check=True)
+        Returns:
+            LintResult: result to be merged into the LintRun (incl. timings).
+    """
+    result = use_chktex(*args)
+    result.timings = TIMER.pop_records()
+    return result
 
-        # Console output is only captured, need to count warnings for PR-comment
-        pattern = "(.+), (Warning|Error|Message) (\\d+), (\\d+), (.+)"
-        log.info(f'count_total_warnings: {report_folder}/{html_report_path}')
-        global nr_of_total_warnings_for_zip
-        nr_of_total_warnings_for_zip += count_total_warnings(base_dir, report_folder, html_report_path, pattern)
 
-    # Perform linting, process output and create md. file
-    if create_md_summary:
-        command = f'script -q -c "{chktex_path} -g -l {config_file_abs_path} {tex_file_abs_path}" /dev/null'
-        if not summary_file:
-            log.error("Summary file is none, writing report not feasible.")
-        else:
-            analize_report(base_dir, command, tex_file_path, summary_file)
+def lint_files(paths, run: LintRun, jobs: int, dependency_graph: TexDependencyGraph, use_processes: bool = False):
+    """
+        Lints the given tex files with up to `jobs` concurrent chktex processes.
+        Only root documents are linted, tex files included by another given tex file are linted as part of it.
+        Results are merged in input order, therefore the report is identical to a serial run.
 
+        Args:
+            paths (List(str)): rel. paths to tex files to be linted.
+            run (LintRun): state of this lint run.
+            jobs (int): number of concurrent chktex processes.
+            dependency_graph (TexDependencyGraph): \\input/\\include dependencies of the tex files.
+            use_processes (bool): run use_chktex in a pool of worker processes instead of threads, so that
+                                  parsing the chktex output scales with the cores as well (full-semester scan).
 
-def str_to_bool(value):
-    """
-    Performs type check if given value (given as str) is a bool
+        Returns:
+            void.
     """
-    if value.lower() in {'false', 'f', '0', 'no', 'n'}:
-        return False
-    elif value.lower() in {'true', 't', '1', 'yes', 'y'}:
-        return True
-    elif value.lower() in {'none'}:
-        print(f'Oh no, bool-arguments is none!')
-        return True
-    raise argparse.ArgumentTypeError(f'Invalid boolean value: {value}')
-
+    roots = dependency_graph.roots(paths)
+    log.info(f'Root documents to be linted: {roots}')
+    if use_processes and jobs > 1:
+        executor = worker_process_pool(jobs)
+        task = use_chktex_in_worker
+    else:
+        executor = ThreadPoolExecutor(max_workers=max(jobs, 1))
+        task = use_chktex
+    with executor:
+        futures = {}
+        if jobs > 1:
+            for path in dependency_graph.schedule(roots):
+                futures[path] = executor.submit(task, path, run.create_zipped_report, run.create_md_summary,
+                                                run.result_cache, run.hide_prelude)
+
+        for path in roots:
+            result = futures[path].result() if path in futures else use_chktex(path, run.create_zipped_report,
+                                                                               run.create_md_summary, run.result_cache,
+                                                                               run.hide_prelude)
+            run.merge(result)
+
+
+def create_result_cache(cache_dir, max_size_mb, hide_prelude=False):
+    base_dir, action_base_dir = get_repo_and_action_path_env_variables()
+    tool_version = executable_fingerprint(os.path.join(action_base_dir, CHKTEX_EXEC_REL_PATH))
+    if hide_prelude:
+        tool_version = f'{tool_version}-{PRELUDE_INPUT_NAME}-hidden'
+    return ResultCache(os.path.join(base_dir, cache_dir), 'chktex', tool_version,
+                       os.path.join(action_base_dir, CHKTEX_CONFIG_FILE_REL_PATH),
+                       max_size_mb)
 
-def main():
-    # Define the logger format
-    LOG_LEVEL = log.DEBUG
-    log.basicConfig(format='%(levelname)s: %(message)s', level=LOG_LEVEL)
 
-    # Define input argument parser
-    log.info("Start check.")
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-cf', '--changedfiles', type=str, required=True, help="Paths to changed files to be linted.")
-    parser.add_argument('-c', '--config', required=True, help="Config for CI/CD pipeline, likely .lecture-build-ci.json")
-    parser.add_argument('-wd', '--workdir', required=True, help="Working directory, likely repo root.")
+def add_arguments(parser):
+    """
+        Adds the lint options (the shared ones are added by add_common_arguments).
+    """
     parser.add_argument('--lint_pr_comment_with_zipped_report', type=str_to_bool, nargs='?', const=True,
                         default=False, help="Feature: zip report and post download link as PR-comment")
     parser.add_argument('--lint_summary', type=str_to_bool, nargs='?', const=True,
                         default=False, help="Feature: Write lint report as summary in md-format.")
-    args = parser.parse_args()
-    args.workdir = Path(args.workdir)
+    parser.add_argument('--lint_affected_entry_documents', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: lint the exercise/lesson entry documents that include a changed tex file "
+                             "(e.g. a shared prelude) instead of the changed tex file on its own.")
+    parser.add_argument('--lint_hide_prelude', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: lint tex files without their prelude import (e.g. \\input{../../prelude}), "
+                             "the tex files are not modified.")
 
-    config_file = Config(args)
+
+def run(args, config_file: Config, filtered_paths):
+    """
+        Lints the given tex files and writes the requested reports and the number of notifications (GITHUB_ENV).
+
+        Args:
+            args (argparse.Namespace): arguments, see add_common_arguments and add_arguments.
+            config_file (Config): configuration of the lecture repo.
+            filtered_paths (List(str)): rel. paths to tex files to be linted.
+
+        Returns:
+            void.
+    """
     create_zipped_report = args.lint_pr_comment_with_zipped_report
     log.info(f'lint_pr_comment_with_zipped_report is set: {create_zipped_report}')
     create_md_summary = args.lint_summary
     log.info(f'create_md_summary is set: {create_md_summary}')
-    log.info(f'Added/Modified tex-file: {args.changedfiles}')
 
-    # Filter paths that contain the specific directory defined in config in their path
-    filtered_paths = [p for p in ast.literal_eval(args.changedfiles) if config_file.active_semester in p]
-    log.info(f'Changed tex-files from {config_file.active_semester}: {filtered_paths}')
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    dependency_graph = TexDependencyGraph(base_dir)
+    if args.lint_affected_entry_documents:
+        with stage('dependency index'):
+            dependency_index_path = os.path.join(base_dir, args.cache_dir, DEPENDENCY_INDEX_FILE_NAME) \
+                if args.cache_dir else None
+            if dependency_index_path:
+                dependency_graph.load(dependency_index_path)
+            reverse_index = ReverseDependencyIndex(dependency_graph, config_file.entry_documents())
+            filtered_paths = reverse_index.affected(filtered_paths)
+            if dependency_index_path:
+                dependency_graph.save(dependency_index_path)
 
     # Perform spell-check and provide result depending on lint_pr_comment_with_zipped_report and lint_summary
     if create_md_summary:
         summary_file = SummaryMdFile('lint_summary.md', len(filtered_paths))
     else:
         summary_file = None
-    for path in filtered_paths:
-        if not any(path in s for s in already_checked_files):
-            use_chktex(path, create_zipped_report, create_md_summary, summary_file)
+    result_cache = create_result_cache(args.cache_dir, args.cache_max_mb, args.lint_hide_prelude) \
+        if args.cache_dir else None
+    # The baseline only applies to the md-report, the html-report is the captured console output
+    baseline = Baseline.load(args.baseline, BASELINE_SECTION, args.write_baseline) \
+        if args.baseline and create_md_summary else None
+    lint_run = LintRun(create_zipped_report, create_md_summary, summary_file, result_cache, args.lint_hide_prelude,
+                       baseline)
+    log.info(f'Linting with {args.jobs} concurrent chktex processes.')
+    with stage('total'):
+        lint_files(filtered_paths, lint_run, args.jobs, dependency_graph, use_processes=args.all)
+    if result_cache:
+        with stage('result cache eviction'):
+            result_cache.evict()
 
     if create_md_summary:
         summary_file.add_details_summary_end()
+    if baseline and baseline.update:
+        baseline.save(args.baseline, BASELINE_SECTION)
+    elif baseline:
+        log.info(f'{baseline.nr_of_suppressed} chktex notifications in the baseline were not reported.')
 
     # Append the environment variable to GITHUB_ENV
     with open(os.getenv('GITHUB_ENV'), 'a') as env_file:
-        env_file.write(f'TOTAL_LINT_WARNINGS_ZIP={nr_of_total_warnings_for_zip}\n')
+        env_file.write(f'TOTAL_LINT_WARNINGS_ZIP={lint_run.nr_of_total_warnings_for_zip}\n')
     with open(os.getenv('GITHUB_ENV'), 'a') as env_file:
-        env_file.write(f'TOTAL_LINT_WARNINGS_REPORT={nr_of_total_warnings_for_md_file}\n')
+        env_file.write(f'TOTAL_LINT_WARNINGS_REPORT={lint_run.nr_of_total_warnings_for_md_file}\n')
+
+
+def main():
+    # Define the logger format
+    LOG_LEVEL = log.DEBUG
+    log.basicConfig(format='%(levelname)s: %(message)s', level=LOG_LEVEL)
+
+    # Define input argument parser
+    log.info("Start check.")
+    parser = argparse.ArgumentParser()
+    add_common_arguments(parser)
+    add_arguments(parser)
+    args = parse_common_arguments(parser)
+
+    config_file = Config(args)
+    run(args, config_file, select_tex_files(args, config_file))
+    TIMER.write_report('lint', get_repo_and_action_path_env_variables()[0])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+import logging as log
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+from filelock import FileLock, Timeout
+
+SLOT_FILE_NAME = 'ltex_slot_{}.lock'
+DEFAULT_HEAP_MB = 1536
+# Metaspace, code cache, thread stacks etc. of a JVM on top of its heap
+JVM_OVERHEAD_MB = 256
+MIN_BACKOFF_S = 0.05
+MAX_BACKOFF_S = 2.0
+
+
+def memory_available_mb():
+    """
+        Returns:
+            int: memory available for new processes without swapping (MemAvailable) in MB,
+                 None if unknown (no /proc/meminfo).
+    """
+    try:
+        with open('/proc/meminfo', 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+class LtexLimiter:
+    def __init__(self, lock_dir, max_processes=None, heap_mb=DEFAULT_HEAP_MB):
+        """
+            Admits up to max_processes concurrent LTeX JVMs (ltex-cli-plus, ltex-ls-plus) per host:
+            every JVM holds one of the slot files in lock_dir, which is shared by all workflows on a
+            (self-hosted) runner. Slot 0 is always admitted, a further slot only while enough memory is
+            available for one more JVM, otherwise admission is retried with exponential back-off.
+            A thread holding a slot (e.g. for the language server) re-enters it (e.g. for the
+            ltex-cli-plus fallback).
+            The heap of every JVM is capped (JAVA_OPTS -Xmx), the JVM size used for admission is
+            raised to the largest RSS of a finished JVM.
+
+            Args:
+                lock_dir (str): directory of the slot files.
+                max_processes (int): number of slots, None to derive it from the cores and the available memory.
+                heap_mb (int): max. heap of every JVM in MB.
+        """
+        self.lock_dir = lock_dir
+        self.heap_mb = heap_mb
+        self.jvm_mb = heap_mb + JVM_OVERHEAD_MB
+        if not max_processes:
+            available_mb = memory_available_mb()
+            max_processes = os.cpu_count() or 1
+            if available_mb is not None:
+                max_processes = min(max_processes, available_mb // self.jvm_mb)
+        self.max_processes = max(max_processes, 1)
+        self._lock = threading.Lock()
+        self._held = threading.local()
+
+    @classmethod
+    def from_env(cls, lock_dir):
+        """
+            Env-variables: LTEX_MAX_PROCESSES (default: derived from cores and memory),
+                           LTEX_HEAP_MB (default: DEFAULT_HEAP_MB).
+        """
+        return cls(lock_dir, int(os.getenv('LTEX_MAX_PROCESSES') or 0),
+                   int(os.getenv('LTEX_HEAP_MB') or DEFAULT_HEAP_MB))
+
+    def java_env(self, java_opts=''):
+        """
+            Args:
+                java_opts (str): further options of this JVM (e.g. its class-data-sharing archive).
+
+            Returns:
+                dict: environment for a JVM with capped heap (JAVA_OPTS is read by the LTeX start scripts).
+        """
+        env_java_opts = os.getenv('JAVA_OPTS', '')
+        return {**os.environ, 'JAVA_OPTS': f'{env_java_opts} -Xmx{self.heap_mb}m {java_opts}'.strip()}
+
+    def _is_admissible(self, slot):
+        if slot == 0:
+            return True
+        available_mb = memory_available_mb()
+        return available_mb is None or available_mb >= self.jvm_mb
+
+    def _try_acquire(self):
+        for slot in range(self.max_processes):
+            if not self._is_admissible(slot):
+                # Memory pressure, only the slots already held by others may run
+                return None
+            lock = FileLock(os.path.join(self.lock_dir, SLOT_FILE_NAME.format(slot)))
+            try:
+                lock.acquire(timeout=0)
+                return lock
+            except Timeout:
+                continue
+        return None
+
+    @contextmanager
+    def slot(self, java_opts=''):
+        """
+            Waits for a free slot and holds it, e.g. `with limiter.slot() as env:` around one JVM.
+
+            Args:
+                java_opts (str): further options of the JVM (see java_env).
+
+            Yields:
+                dict: environment to start the JVM with (see java_env).
+        """
+        if getattr(self._held, 'lock', None):
+            yield self.java_env(java_opts)
+            return
+
+        backoff = MIN_BACKOFF_S
+        lock = self._try_acquire()
+        while lock is None:
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_S)
+            lock = self._try_acquire()
+        self._held.lock = lock
+        try:
+            yield self.java_env(java_opts)
+        finally:
+            self._held.lock = None
+            lock.release()
+            # Linux reports kB, the largest finished child is likely a JVM
+            peak_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // 1024
+            with self._lock:
+                if peak_rss_mb > self.jvm_mb:
+                    log.info(f'LTeX needs {peak_rss_mb} MB, admitting further processes only with that much '
+                             f'available memory.')
+                    self.jvm_mb = peak_rss_mb
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+import json
+import logging as log
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+
+# LSP severities (see DiagnosticSeverity) mapped to the names ltex-cli-plus prints
+SEVERITY_NAMES = {1: 'error', 2: 'warning', 3: 'info', 4: 'hint'}
+ACCEPT_SUGGESTION_ACTION_KIND = 'quickfix.ltex.acceptSuggestions'
+DEFAULT_CHECK_TIMEOUT = 300
+
+
+class LtexServerError(Exception):
+    pass
+
+
+def load_ltex_settings(config_file_path):
+    """
+        Loads the LTeX client configuration (ltex_config.txt) as nested settings for the section "ltex".
+        The file is not strict JSON (e.g. "ltex.language": de-AT), therefore bare values are quoted first.
+
+        Args:
+            config_file_path (str): Path to the ltex client configuration file.
+
+        Returns:
+            dict: settings, e.g. {'language': 'de-AT', 'latex': {'commands': {...}}}
+    """
+    with open(config_file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+    content = re.sub(r'(:\s*)([A-Za-z][\w-]*)(\s*[,}\n])', r'\1"\2"\3', content)
+
+    settings = {}
+    for key, value in json.loads(content).items():
+        parts = key.removeprefix('ltex.').split('.')
+        section = settings
+        for part in parts[:-1]:
+            section = section.setdefault(part, {})
+        section[parts[-1]] = value
+    return settings
+
+
+def ltex_ls_path_for(ltex_cli_path):
+    """
+        Derives the path of the ltex-ls-plus language server from the path of ltex-cli-plus
+        (both are shipped in the same bin directory).
+    """
+    return os.path.join(os.path.dirname(ltex_cli_path), 'ltex-ls-plus')
+
+
+class LtexLanguageServer:
+    """
+        Minimal LSP client for a single long-lived ltex-ls-plus process (JSON-RPC over stdio).
+        Documents are opened one after the other, their diagnostics are awaited and converted
+        by the caller into SpellingNotifications.
+    """
+
+    def __init__(self, server_path, settings, check_timeout=DEFAULT_CHECK_TIMEOUT):
+        self.server_path = server_path
+        self.settings = settings
+        self.check_timeout = check_timeout
+        self.process = None
+        self._next_id = 0
+        self._write_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._responses = {}
+        self._diagnostics = {}
+        self._reader = None
+        self._stdout_closed = False
+
+    def start(self, env=None):
+        log.info(f'Starting ltex-ls-plus: {self.server_path}')
+        try:
+            self.process = subprocess.Popen([self.server_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL, env=env)
+        except OSError as e:
+            raise LtexServerError(f'Could not start {self.server_path}: {e}') from e
+        self._stdout_closed = False
+
+        self._reader = threading.Thread(target=self._read_messages, daemon=True)
+        self._reader.start()
+
+        self.request('initialize', {
+            'processId': os.getpid(),
+            'rootUri': None,
+            'capabilities': {
+                'workspace': {'configuration': True},
+                'textDocument': {
+                    'publishDiagnostics': {},
+                    'codeAction': {'codeActionLiteralSupport': {'codeActionKind': {'valueSet': ['quickfix']}}}
+                }
+            },
+            'initializationOptions': {}
+        })
+        self.notify('initialized', {})
+        return self
+
+    def stop(self):
+        if not self.process:
+            return
+        try:
+            if self.process.poll() is None:
+                self.request('shutdown', None, timeout=10)
+                self.notify('exit', None)
+                self.process.wait(timeout=10)
+        except (LtexServerError, subprocess.TimeoutExpired, OSError):
+            self.process.kill()
+        finally:
+            self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def check_file(self, tex_file_abs_path, text=None):
+        """
+            Spell-checks one tex file.
+
+            Args:
+                tex_file_abs_path (str): absolute path of tex file to be spell-checked.
+                text (str): content to be checked instead of the file's content (e.g. an edited copy).
+
+            Returns:
+                List(dict): LSP diagnostics, each extended by 'suggestions' (List(str)).
+        """
+        uri = Path(tex_file_abs_path).resolve().as_uri()
+        if text is None:
+            with open(tex_file_abs_path, 'r', encoding='utf-8', errors='replace') as file:
+                text = file.read()
+
+        with self._condition:
+            self._diagnostics.pop(uri, None)
+        self.notify('textDocument/didOpen', {
+            'textDocument': {'uri': uri, 'languageId': 'latex', 'version': 1, 'text': text}
+        })
+        try:
+            with self._condition:
+                if not self._condition.wait_for(lambda: uri in self._diagnostics or not self._is_alive(),
+                                                timeout=self.check_timeout):
+                    raise LtexServerError(f'No diagnostics for {tex_file_abs_path} within {self.check_timeout}s')
+                if uri not in self._diagnostics:
+                    raise LtexServerError('ltex-ls-plus terminated unexpectedly')
+                diagnostics = self._diagnostics.pop(uri)
+
+            for diagnostic in diagnostics:
+                diagnostic['suggestions'] = self._suggestions_for(uri, diagnostic)
+        finally:
+            # A terminated server is reported as such, not as failing write
+            if self._is_alive():
+                self.notify('textDocument/didClose', {'textDocument': {'uri': uri}})
+        return diagnostics
+
+    def _suggestions_for(self, uri, diagnostic):
+        actions = self.request('textDocument/codeAction', {
+            'textDocument': {'uri': uri},
+            'range': diagnostic['range'],
+            'context': {'diagnostics': [diagnostic], 'only': ['quickfix']}
+        }) or []
+        return [action['title'] for action in actions
+                if action.get('kind') == ACCEPT_SUGGESTION_ACTION_KIND]
+
+    def request(self, method, params, timeout=None):
+        with self._condition:
+            self._next_id += 1
+            request_id = self._next_id
+        self._send({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: request_id in self._responses or not self._is_alive(),
+                                            timeout=timeout or self.check_timeout):
+                raise LtexServerError(f'Request {method} timed out')
+            if request_id not in self._responses:
+                raise LtexServerError('ltex-ls-plus terminated unexpectedly')
+            response = self._responses.pop(request_id)
+        if 'error' in response:
+            raise LtexServerError(f'Request {method} failed: {response["error"]}')
+        return response.get('result')
+
+    def notify(self, method, params):
+        self._send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def _is_alive(self):
+        return self.process is not None and not self._stdout_closed and self.process.poll() is None
+
+    def _send(self, message):
+        body = json.dumps(message).encode('utf-8')
+        with self._write_lock:
+            try:
+                self.process.stdin.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+                self.process.stdin.flush()
+            except (OSError, ValueError) as e:
+                raise LtexServerError(f'Could not write to ltex-ls-plus: {e}') from e
+
+    def _read_messages(self):
+        stdout = self.process.stdout
+        while True:
+            content_length = None
+            while True:
+                header = stdout.readline()
+                if not header:
+                    # The server terminated (it may not have been reaped yet, see _is_alive)
+                    with self._condition:
+                        self._stdout_closed = True
+                        self._condition.notify_all()
+                    return
+                header = header.strip()
+                if not header:
+                    break
+                name, _, value = header.decode('ascii').partition(':')
+                if name.lower() == 'content-length':
+                    content_length = int(value)
+            if content_length is None:
+                continue
+            self._dispatch(json.loads(stdout.read(content_length).decode('utf-8')))
+
+    def _dispatch(self, message):
+        method = message.get('method')
+        if method is None:
+            with self._condition:
+                self._responses[message['id']] = message
+                self._condition.notify_all()
+        elif method == 'textDocument/publishDiagnostics':
+            with self._condition:
+                self._diagnostics[message['params']['uri']] = message['params']['diagnostics']
+                self._condition.notify_all()
+        elif 'id' in message:
+            # Requests from the server to the client, e.g. workspace/configuration
+            if method == 'workspace/configuration':
+                result = [self.settings for _ in message['params']['items']]
+            elif method == 'ltex/workspaceSpecificConfiguration':
+                result = [{} for _ in message['params']['items']]
+            else:
+                result = None
+            self._send({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
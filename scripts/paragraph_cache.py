@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+import re
+
+from result_cache import ResultCache
+from source_overlay import SourceOverlay, find_paragraphs
+from tex_dependencies import COMMENT_PATTERN
+
+PARAGRAPH_CACHE_FORMAT_VERSION = '1'
+ENVIRONMENT_PATTERN = re.compile(r'\\(begin|end)\s*\{([^}]*)\}')
+# Magic comment switching the language, e.g. "% ltex: language=en-US"
+LANGUAGE_MAGIC_COMMENT_PATTERN = re.compile(r'^\s*%\s*ltex:.*\blanguage\s*=\s*([\w-]+)', re.IGNORECASE)
+
+
+class Paragraph:
+    def __init__(self, first_line: int, last_line: int, key: str):
+        """
+            Run of non-blank lines of a tex file (see source_overlay.find_paragraphs), the unit of the ParagraphCache.
+
+            Args:
+                first_line (int): line nr. (1-based) of the first line of the paragraph.
+                last_line (int): line nr. of the last line of the paragraph.
+                key (str): cache key of the paragraph, see ParagraphCache.paragraphs.
+        """
+        self.first_line = first_line
+        self.last_line = last_line
+        self.key = key
+
+    def __contains__(self, line):
+        """
+            Checks if the line nr. (1-based) is within the paragraph, e.g. `notification.line in paragraph`.
+        """
+        return self.first_line <= line <= self.last_line
+
+
+class ParagraphCache:
+    def __init__(self, result_cache: ResultCache):
+        """
+            Caches the notifications of single paragraphs (runs of non-blank lines) of tex files, so that only
+            new or edited paragraphs of a changed tex file are spell-checked again. A paragraph is identified by
+            its text (trailing whitespace ignored), its LaTeX context (enclosing environments and language)
+            and the tool version and configuration (incl. dictionary) of the result cache.
+            Notifications are stored with line nr. relative to the paragraph start.
+
+            Args:
+                result_cache (ResultCache): storage and eviction of the entries, e.g. namespace "ltex-paragraphs".
+        """
+        self.result_cache = result_cache
+
+    def paragraphs(self, overlay: SourceOverlay):
+        """
+            Returns:
+                List(Paragraph): paragraphs of the (possibly edited) tex file with their cache keys.
+        """
+        paragraphs = []
+        boundaries = find_paragraphs(overlay.lines)
+        environments = []
+        language = ''
+        next_boundary = 0
+        for index, line in enumerate(overlay.lines):
+            if next_boundary < len(boundaries) and boundaries[next_boundary][0] == index + 1:
+                first, last = boundaries[next_boundary]
+                text = '\n'.join(text_line.rstrip() for text_line in overlay.lines[first - 1:last])
+                context = f'{language}\0{"/".join(environments)}'
+                paragraphs.append(Paragraph(first, last, self.result_cache.key_for_content(
+                    PARAGRAPH_CACHE_FORMAT_VERSION, context, text)))
+                next_boundary += 1
+
+            magic_comment = LANGUAGE_MAGIC_COMMENT_PATTERN.match(line)
+            if magic_comment:
+                language = magic_comment.group(1)
+            for kind, environment in ENVIRONMENT_PATTERN.findall(COMMENT_PATTERN.sub('', line)):
+                if kind == 'begin':
+                    environments.append(environment)
+                elif environment in environments:
+                    del environments[len(environments) - 1 - environments[::-1].index(environment)]
+        return paragraphs
+
+    def lookup(self, paragraphs, tex_file_path):
+        """
+            Args:
+                paragraphs (List(Paragraph)): paragraphs of the tex file.
+                tex_file_path (str): rel. path to the tex file (cached paragraphs may stem from other tex files).
+
+            Returns:
+                List(dict): cached notifications (records, see SpellingNotification.from_record) of the cached
+                            paragraphs, re-anchored to the current line nr.
+                List(Paragraph): paragraphs that are not cached, to be spell-checked.
+        """
+        records = []
+        missed = []
+        for paragraph in paragraphs:
+            cached = self.result_cache.get(paragraph.key)
+            if cached is None:
+                missed.append(paragraph)
+                continue
+            for record in cached:
+                records.append({**record, 'file': tex_file_path, 'line': paragraph.first_line + record['line']})
+        return records, missed
+
+    def store(self, paragraphs, records):
+        """
+            Caches the notifications of spell-checked paragraphs, notifications outside these paragraphs
+            (e.g. in the kept LaTeX context) are dropped.
+
+            Args:
+                paragraphs (List(Paragraph)): spell-checked paragraphs.
+                records (List(dict)): notifications (records) of the spell-check.
+
+            Returns:
+                List(dict): notifications (records) within the given paragraphs.
+        """
+        kept = []
+        for paragraph in paragraphs:
+            paragraph_records = [record for record in records if record['line'] in paragraph]
+            self.result_cache.put(paragraph.key, [{**record, 'line': record['line'] - paragraph.first_line}
+                                                  for record in paragraph_records])
+            kept.extend(paragraph_records)
+        return kept
+
+    def evict(self):
+        """
+            Removes least-recently-used paragraphs until the result cache fits into its max. size.
+        """
+        self.result_cache.evict()
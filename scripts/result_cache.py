@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging as log
+import os
+import threading
+
+from tex_dependencies import input_closure
+
+DEFAULT_MAX_CACHE_SIZE_MB = 100
+CACHE_FORMAT_VERSION = '1'
+
+
+def executable_fingerprint(executable_path):
+    """
+        Identifies the version of a tool by the content of its executable and the name of
+        its installation directory (e.g. ltex-ls-plus-18.5.1/bin/ltex-cli-plus).
+    """
+    real_path = os.path.realpath(executable_path)
+    digest = hashlib.sha256(os.path.basename(os.path.dirname(os.path.dirname(real_path))).encode())
+    with open(real_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir, namespace, tool_version, config_file_path, max_size_mb=DEFAULT_MAX_CACHE_SIZE_MB):
+        """
+            On-disk cache of parsed check results (JSON), addressed by the content of the checked tex files,
+            the tool configuration and the tool version. Entries are evicted least-recently-used
+            as soon as the cache exceeds max_size_mb. The layout <cache_dir>/<namespace>/<xx>/<key>.json
+            can directly be stored and restored by actions/cache.
+
+            Args:
+                cache_dir (str): root directory of the cache.
+                namespace (str): subdirectory per tool, e.g. "chktex" or "ltex".
+                tool_version (str): version/fingerprint of the tool, see executable_fingerprint.
+                config_file_path (str): path of the tool's config file (e.g. chktexrc.in).
+                max_size_mb (int): upper bound for the size of this namespace.
+        """
+        self.directory = os.path.join(cache_dir, namespace)
+        self.namespace = namespace
+        self.tool_version = tool_version
+        with open(config_file_path, 'rb') as config_file:
+            self.config_digest = hashlib.sha256(config_file.read()).hexdigest()
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key_for(self, tex_file_abs_path, base_dir, variant=''):
+        """
+            Computes the cache key of a tex file from its content, the content of its \\input closure,
+            the tool's config file and the tool version. Paths are hashed relative to base_dir, so checkouts
+            of the repo at different paths (e.g. other runners) share the entries.
+
+            Args:
+                tex_file_abs_path (str): abs. path of the tex file.
+                base_dir (str): Path of repo base directory.
+                variant (str): distinguishes differently checked versions of the same tex file
+                               (e.g. restricted to some paragraphs).
+        """
+        def rel_path(path):
+            return os.path.relpath(path, base_dir or os.curdir)
+
+        digest = hashlib.sha256(f'{CACHE_FORMAT_VERSION}\0{self.namespace}\0{self.tool_version}\0'
+                                f'{self.config_digest}\0{rel_path(tex_file_abs_path)}\0'.encode())
+        if variant:
+            digest.update(f'{variant}\0'.encode())
+        for path in input_closure(tex_file_abs_path, base_dir):
+            digest.update(f'\0{rel_path(path)}\0'.encode())
+            with open(path, 'rb') as tex_file:
+                digest.update(tex_file.read())
+        return digest.hexdigest()
+
+    def key_for_content(self, *parts):
+        """
+            Computes the cache key of content not stored in a tex file of its own (e.g. a paragraph),
+            considering the tool's config file and the tool version.
+        """
+        digest = hashlib.sha256(f'{CACHE_FORMAT_VERSION}\0{self.namespace}\0{self.tool_version}\0'
+                                f'{self.config_digest}\0'.encode())
+        for part in parts:
+            digest.update(f'{part}\0'.encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key):
+        """
+            Returns:
+                cached value (JSON) or None on a cache miss.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as file:
+                value = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        os.utime(entry_path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f'{entry_path}.{os.getpid()}-{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(value, file)
+        os.replace(tmp_path, entry_path)
+
+    def evict(self):
+        """
+            Removes least-recently-used entries until the cache fits into max_size.
+        """
+        entries = []
+        for directory, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            os.remove(path)
+            total_size -= size
+        log.info(f'Result cache {self.namespace}: {self.hits} hits, {self.misses} misses, {total_size} bytes.')
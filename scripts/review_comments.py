@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+import hashlib
+import re
+from collections import Counter
+
+# Hidden marker at the end of every PR-review comment created by the spell-check
+FINGERPRINT_MARKER = '<!-- latex-validation-fingerprint: {} -->'
+FINGERPRINT_PATTERN = re.compile(r'<!-- latex-validation-fingerprint: ([0-9a-f]+) -->')
+
+# LanguageTool rule id at the end of a message, e.g. "... gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]"
+RULE_ID_PATTERN = re.compile(r'\[([A-Z0-9_]+)\]')
+# First line of a PR-review comment created before fingerprints were introduced, i.e. the message of ltex,
+# e.g. "'Ergebniss': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]"
+LEGACY_COMMENT_PATTERN = re.compile(r"'.*': .* \[[A-Z0-9_]+\]")
+
+
+def notification_fingerprint(notification, line_content):
+    """
+        Identifies a notification independently of its line nr., so that an unchanged notification keeps its
+        PR-review comment even if lines were added above.
+
+        Args:
+            notification (SpellingNotification): notification to be commented (possibly merged for one line).
+            line_content (str): content of the line the notification refers to.
+
+        Returns:
+            str: fingerprint of file, line content, rule ids and message.
+    """
+    digest = hashlib.sha256()
+    line_hash = hashlib.sha256(line_content.strip().encode()).hexdigest()
+    rule_ids = ','.join(RULE_ID_PATTERN.findall(notification.message))
+    for part in (notification.file, line_hash, rule_ids, notification.message):
+        digest.update(f'{part}\0'.encode())
+    return digest.hexdigest()[:32]
+
+
+def comment_body(text, fingerprint):
+    return f'{text}\n\n{FINGERPRINT_MARKER.format(fingerprint)}'
+
+
+def comment_fingerprint(comment):
+    """
+        Returns:
+            str: fingerprint of a PR-review comment created by the spell-check, None for other comments.
+    """
+    match = FINGERPRINT_PATTERN.search(comment.get('body') or '')
+    return match.group(1) if match else None
+
+
+def is_legacy_comment(comment, own_login=None):
+    """
+        PR-review comments created by the spell-check before fingerprints were introduced (without marker):
+        posted with the token of this run (own_login) or in the old report format (ltex message and suggestions).
+        Comments of other bots or users are left alone.
+
+        Args:
+            comment (dict): PR-review comment (REST API representation).
+            own_login (str): login of the token of this run, None if unknown.
+    """
+    if comment_fingerprint(comment) is not None:
+        return False
+    if own_login and (comment.get('user') or {}).get('login') == own_login:
+        return True
+    return LEGACY_COMMENT_PATTERN.fullmatch((comment.get('body') or '').split('\n', 1)[0]) is not None
+
+
+def reconcile_review_comments(existing_comments, new_comments, paths, own_login=None):
+    """
+        Diffs the PR-review comments required by the current spell-check against the ones already on the PR.
+
+        Args:
+            existing_comments (List(dict)): PR-review comments on the PR (REST API representation).
+            new_comments (List(dict)): comments to be shown, with keys path, line, body and fingerprint.
+            paths (List(str)): spell-checked files, only comments in these files are reconciled.
+            own_login (str): login of the token of this run (see is_legacy_comment), None if unknown.
+
+        Returns:
+            List(dict): comments to be created.
+            List(int): ids of comments to be deleted (resolved, outdated or legacy comments).
+            int: number of comments left alone.
+    """
+    wanted = Counter(comment['fingerprint'] for comment in new_comments)
+    comment_ids_to_delete = []
+    nr_of_kept_comments = 0
+    for comment in existing_comments:
+        if comment.get('path') not in paths:
+            continue
+        fingerprint = comment_fingerprint(comment)
+        # Outdated comments (line not part of the diff anymore) have no line
+        if fingerprint and wanted[fingerprint] > 0 and comment.get('line') is not None:
+            wanted[fingerprint] -= 1
+            nr_of_kept_comments += 1
+        elif fingerprint or is_legacy_comment(comment, own_login):
+            comment_ids_to_delete.append(comment['id'])
+
+    comments_to_create = []
+    for comment in new_comments:
+        if wanted[comment['fingerprint']] > 0:
+            wanted[comment['fingerprint']] -= 1
+            comments_to_create.append(comment)
+    return comments_to_create, comment_ids_to_delete, nr_of_kept_comments
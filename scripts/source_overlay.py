@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from tex_dependencies import COMMENT_PATTERN, INPUT_PATTERN
+
+# Memory-backed file system for overlay files, falls back to the default temp directory
+TMPFS_DIR = '/dev/shm'
+PRELUDE_INPUT_NAME = 'prelude'
+
+# Lines kept when a tex file is restricted to some paragraphs (LaTeX context of the paragraphs)
+BEGIN_DOCUMENT_PATTERN = re.compile(r'\\begin\s*\{document\}')
+ENVIRONMENT_BOUNDARY_PATTERN = re.compile(r'\\(?:begin|end)\s*\{')
+# Magic comments, e.g. "% ltex: language=en-US"
+LTEX_MAGIC_COMMENT_PATTERN = re.compile(r'^\s*%\s*ltex:', re.IGNORECASE)
+
+
+def find_paragraphs(lines):
+    """
+        Splits the lines of a tex file into paragraphs (runs of non-blank lines).
+
+        Returns:
+            List(Tuple(int, int)): line nr. (1-based) of first and last line of every paragraph.
+    """
+    paragraphs = []
+    start = None
+    for index, line in enumerate(lines):
+        if line.strip():
+            if start is None:
+                start = index + 1
+        elif start is not None:
+            paragraphs.append((start, index))
+            start = None
+    if start is not None:
+        paragraphs.append((start, len(lines)))
+    return paragraphs
+
+
+def line_ending(line):
+    return line[len(line.rstrip('\r\n')):]
+
+
+def overlay_dir():
+    return TMPFS_DIR if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK) else None
+
+
+class SourceOverlay:
+    def __init__(self, tex_file_abs_path):
+        """
+            In-memory copy of a tex file that can be edited before it is checked (e.g. hiding the prelude
+            import), the tex file in the checkout is never modified. Edits may replace a line by any number
+            of lines, line numbers reported on the edited copy are mapped back to the original tex file.
+
+            Args:
+                tex_file_abs_path (str): abs. path of the original tex file.
+        """
+        self.tex_file_abs_path = tex_file_abs_path
+        with open(tex_file_abs_path, 'r', encoding='utf-8', errors='replace', newline='') as file:
+            self.lines = file.read().splitlines(keepends=True)
+        # Original line nr. of every line of the edited copy
+        self.line_numbers = list(range(1, len(self.lines) + 1))
+        self.is_modified = False
+
+    @property
+    def text(self):
+        return ''.join(self.lines)
+
+    def replace_line(self, index, new_lines):
+        """
+            Replaces the line at the given index (0-based, of the edited copy) by new_lines.
+        """
+        original_line = self.line_numbers[index]
+        self.lines[index:index + 1] = new_lines
+        self.line_numbers[index:index + 1] = [original_line] * len(new_lines)
+        self.is_modified = True
+
+    def comment_out_inputs(self, input_name):
+        """
+            Comments out \\input/\\include of the given tex file (name without directory and extension),
+            e.g. \\input{../../prelude} for input_name "prelude". The number of lines is unchanged.
+
+            Returns:
+                int: number of commented out lines.
+        """
+        nr_of_lines = 0
+        for index, line in enumerate(self.lines):
+            names = INPUT_PATTERN.findall(COMMENT_PATTERN.sub('', line))
+            if any(os.path.basename(name.strip()).removesuffix('.tex') == input_name for name in names):
+                self.replace_line(index, [f'%{line}'])
+                nr_of_lines += 1
+        return nr_of_lines
+
+    def restrict_to_paragraphs(self, selected_lines):
+        """
+            Blanks all lines except the paragraphs containing a selected line and the LaTeX context they need:
+            the preamble (up to \\begin{document}), \\begin/\\end lines (environments stay balanced) and
+            ltex magic comments. Kept lines are unchanged, therefore line and column nr. stay valid.
+            Must be applied before other edits.
+
+            Args:
+                selected_lines (ChangedLineIndex or set): selected line nr. (1-based), e.g. lines in diff.
+
+            Returns:
+                List(Tuple(int, int)): first and last line nr. of the kept paragraphs.
+        """
+        kept = set()
+        for index, line in enumerate(self.lines):
+            if BEGIN_DOCUMENT_PATTERN.search(line):
+                kept.update(range(1, index + 2))
+                break
+        paragraphs = [(first, last) for first, last in find_paragraphs(self.lines)
+                      if any(line in selected_lines for line in range(first, last + 1))]
+        for first, last in paragraphs:
+            kept.update(range(first, last + 1))
+
+        for index, line in enumerate(self.lines):
+            if index + 1 in kept or not line.strip():
+                continue
+            if ENVIRONMENT_BOUNDARY_PATTERN.search(COMMENT_PATTERN.sub('', line)) or \
+                    LTEX_MAGIC_COMMENT_PATTERN.match(line):
+                continue
+            self.lines[index] = line_ending(line)
+            self.is_modified = True
+        return paragraphs
+
+    def original_line(self, line):
+        """
+            Maps a line nr. (1-based) of the edited copy to the line nr. of the original tex file.
+        """
+        if 1 <= line <= len(self.line_numbers):
+            return self.line_numbers[line - 1]
+        return line
+
+    @contextmanager
+    def materialize(self):
+        """
+            Provides the edited copy as file for tools that only read files: it is written to a private
+            directory on tmpfs (same file name) and removed afterwards. Unmodified tex files are not copied.
+            Relative \\input/\\include of the copy are not resolved from the directory of the tex file, see
+            lint_texs.write_tex_inputs_config.
+
+            Yields:
+                str: abs. path of the file to be checked.
+        """
+        if not self.is_modified:
+            yield self.tex_file_abs_path
+            return
+
+        directory = tempfile.mkdtemp(prefix='latex-validation-', dir=overlay_dir())
+        try:
+            path = os.path.join(directory, os.path.basename(self.tex_file_abs_path))
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                file.write(self.text)
+            yield path
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
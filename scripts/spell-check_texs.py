@@ -2,22 +2,31 @@
 import json
 import re
 import argparse
+import copy
 import logging as log
 import subprocess
 import os
-import requests
-from typing import List
-
-from github import Github
-from pathlib import Path
-from filelock import FileLock
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, List
 
+from baseline import Baseline, spelling_fingerprint
+from changed_lines import ChangedLineIndex, git_changed_lines
 from config import Config
+from review_comments import comment_body, comment_fingerprint, notification_fingerprint, reconcile_review_comments
+from ltex_limiter import LtexLimiter
+from ltex_ls_client import LtexLanguageServer, LtexServerError, SEVERITY_NAMES, load_ltex_settings, ltex_ls_path_for
+from paragraph_cache import ParagraphCache
+from result_cache import ResultCache, executable_fingerprint
+from source_overlay import SourceOverlay
+from stage_timer import TIMER, stage
 from summary_md_file import SummaryMdFile
-from tex_checks_utils import count_total_warnings, get_repo_and_action_path_env_variables
+from tex_checks_utils import (add_common_arguments, capture_console_report, get_repo_and_action_path_env_variables,
+                              parse_common_arguments, select_tex_files, split_lines, str_to_bool, worker_process_pool)
+
+if TYPE_CHECKING:
+    # Imported on demand, requests is only needed for PR-review comments
+    from github_api import PullRequestClient
 
-already_checked_files = set()
-nr_of_total_warnings = 0
 choices = {
     'zip_console_report_opt': 'ZIPP_CONSOLE_REPORT',
     'comment_in_code_and_make_report_opt': 'WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT',
@@ -26,11 +35,21 @@ choices = {
 }
 
 CONFIG_FILE_REL_PATH = 'ltex_config.txt'
+LTEX_CLI_DEFAULT_REL_PATH = 'ltex-ls-plus-18.5.1/bin/ltex-cli-plus'  # running locally
+# Class-data-sharing archive of ltex-cli-plus, next to its bin directory (built by action.yml)
+LTEX_CDS_ARCHIVE_NAME = 'ltex-cli-plus.jsa'
+PARAGRAPH_CACHE_NAMESPACE = 'ltex-paragraphs'
+# Section of the ltex notifications in the baseline file
+BASELINE_SECTION = 'ltex'
+
+# Matches lines like: "/home/runner/work/sw1-latex-exercise-ci/sw1-latex-exercise-ci/24SS/UE01/Unterricht/Lernziele.tex:57:136: info: 'yes': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]"
+LTEX_NOTIFICATION_PATTERN = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+):\s*(?P<type>\w+):\s*(?P<message>.+).*$")
 LOCK_DIR = f'{os.getenv("GITHUB_ACTION_PATH")}/tmp'
 os.makedirs(LOCK_DIR, exist_ok=True)
 
-LOCK_FILE = os.path.join(LOCK_DIR, 'ltex_cli_plus.lock')
-LOCK = FileLock(LOCK_FILE)
+# Shared by all spell-checks on this host (one slot per concurrent ltex JVM)
+LIMITER = LtexLimiter.from_env(LOCK_DIR)
 
 
 class SpellingNotification:
@@ -48,185 +67,364 @@ class SpellingNotification:
         return f"SpellingNotification(file={self.file}, type={self.type}, line={self.line}, column={self.column}, " \
                f" message={self.message}, code_snippet={self.code_snippet}, suggestions={self.suggestions})"
 
+    @classmethod
+    def from_record(cls, record: dict):
+        """
+            Restores a notification from its attributes (vars), e.g. as stored in the result cache.
+        """
+        return cls(record['file'], record['type'], record['line'], record['column'], record['message'],
+                   record['code_snippet'], record['suggestions'])
+
+
+class SpellCheckRun:
+    def __init__(self):
+        """
+            State of one spell-check run: the tex files already checked and the number of notifications,
+            a new run (e.g. of the package entry point or a test in the same process) starts from scratch.
+        """
+        self.already_checked_files = set()
+        self.nr_of_total_warnings = 0
+        self.nr_of_total_warnings_for_zip = 0
+
+    def mark_checked(self, notifications):
+        """
+            Counts the notifications of one spell-check run and marks their tex files as checked.
+
+            Args:
+                notifications (List(SpellingNotification)): notifications of one spell-check run.
+
+            Returns:
+                List(SpellingNotifications): notifications of tex files that were not checked before.
+        """
+        files = set()
+        unchecked = []
+        for notification in notifications:
+            files.add(notification.file)
+
+            # Avoid checking especially nested tex files (import), twice
+            if notification.file not in self.already_checked_files:
+                unchecked.append(notification)
+        self.nr_of_total_warnings += len(unchecked)
+
+        # Update checked files
+        self.already_checked_files.update(files)
+        return unchecked
+
+
+def review_comments_for(notifications: List[SpellingNotification]):
+    """
+        Converts notifications into PR-review comments, each with a fingerprint (see notification_fingerprint).
 
-def post_pr_comments(notifications: List[SpellingNotification]):
+        Returns:
+            List(dict): comments with keys path, line, body and fingerprint.
+    """
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    lines_per_file = {}
+    comments = []
+    for notification in notifications:
+        if notification.file not in lines_per_file:
+            with open(os.path.join(base_dir, notification.file), 'r', encoding='utf-8', errors='replace') as file:
+                lines_per_file[notification.file] = file.read().split('\n')
+        lines = lines_per_file[notification.file]
+        line_content = lines[notification.line - 1] if 0 < notification.line <= len(lines) else ''
+        fingerprint = notification_fingerprint(notification, line_content)
+        comments.append({'path': notification.file, 'line': notification.line,
+                         'body': comment_body(notification.message_and_suggestions_mixed, fingerprint),
+                         'fingerprint': fingerprint})
+    return comments
+
+
+def update_pr_comments(client: 'PullRequestClient', notifications: List[SpellingNotification], filtered_paths):
     """
-        Posts spell-check notifications (by ltex) as PR-review comments using PyGit
+        Reconciles the PR-review comments in the spell-checked files with the current notifications:
+        creates comments for new notifications, deletes comments of resolved notifications and
+        leaves unchanged ones alone (no notification spam for reviewers on every push).
 
         Args:
-            notifications: List[SpellingNotification]
+            client (PullRequestClient): client of the pull request.
+            notifications: List[SpellingNotification] to be commented.
+            filtered_paths (List(str)): List of paths to spell-checked files.
 
         Returns:
             void
     """
+    with stage('GitHub API'):
+        existing_comments = client.get_review_comments()
+        own_login = None
+        if any(comment.get('path') in filtered_paths and comment_fingerprint(comment) is None
+               for comment in existing_comments):
+            # Only needed to recognize legacy comments (see is_legacy_comment)
+            own_login = client.authenticated_login()
+        comments_to_create, comment_ids_to_delete, nr_of_kept_comments = reconcile_review_comments(
+            existing_comments, review_comments_for(notifications), filtered_paths, own_login)
+        log.info(f'PR-review comments: {len(comments_to_create)} new, {len(comment_ids_to_delete)} resolved, '
+                 f'{nr_of_kept_comments} unchanged.')
+
+        nr_of_deleted_comments = client.delete_review_comments(comment_ids_to_delete)
+        print(f"Deleted {nr_of_deleted_comments} comments: {comment_ids_to_delete}")
+        if comments_to_create:
+            nr_of_posted_comments = client.create_review(comments_to_create)
+            log.info(f'Posted {nr_of_posted_comments} of {len(comments_to_create)} PR-review comments.')
 
-    # Authenticate to GitHub
-    token = os.getenv('GITHUB_TOKEN')
-    g = Github(token)
 
-    # Retrieve the repository and pull request
-    repo = g.get_repo(os.getenv('GITHUB_REPOSITORY'))
-    log.info(f'repo: {repo}')
-    pr_number = os.getenv('GITHUB_REF').split('/')
-    log.info(f'pr_number: {pr_number}')
-    pr = repo.get_pull(int(pr_number[-2]))
+def line_is_in_diff(line, changedlines):
+    """
+        Checks if a line (nr) is in the diff.
 
-    # Fetch the file's diff
-    file_diff = next((f for f in pr.get_files() if f.filename == notifications[0].file), None)
-    log.info(f'diff pr.get_files: {file_diff.raw_data}')
+        Args:
+            line (int): line nr.
+            changedlines (ChangedLineIndex): changedlines of current file in diff, built once per file
+                                             (see changed_lines_of).
 
-    response = requests.get(pr.diff_url)
-    log.info(f'response: {response.status_code}, {response.text}')
-    if response.status_code == 200:
-        diff_content = response.text
-        print(f'diff_url content: {diff_content}')
+        Returns:
+            boolean: line is among changedlines (+-2 lines).
+    """
+    if not isinstance(changedlines, ChangedLineIndex):
+        raise TypeError(f'changedlines must be a ChangedLineIndex, not {type(changedlines).__name__}')
+    return line in changedlines
 
-    log.info(f'Existing notifications to be commented is: {notifications[0].file}')
 
-    # Get the commit ID (SHA) of the latest commit in the pull request
-    commit = repo.get_commit(sha=pr.head.sha)
+def iter_ltex_notifications(lines, base_dir):
+    """
+        Parses the console output of ltex-cli-plus into SpellingNotifications, one line at a time:
+        a notification is yielded as soon as the line of the next one (or the end of the output) is read.
 
-    for notification in notifications:
-        body = f'{notification.message_and_suggestions_mixed}'
-        pr.create_review_comment(
-            body=body,
-            commit=commit,
-            path=notification.file,
-            line=notification.line
-        )
-
-        # FAILED ATTEMPT to check for existing comments at the specified line, in order to overwrite them
-        # review_comments = pr.get_review_comments()
-        # if existing_comments:
-        # Update the existing comment
-        #    existing_comments[0].edit(body)
-        # else:
-        # Create a new comment
-        #    pr.create_review_comment(
-        #        body=body,
-        #        commit=commit,
-        #        path=notification.file,
-        #        line=notification.line
-        #    )
-
-    g.close()
+        Args:
+            lines (Iterable(str)): lines of the console output of ltex-cli-plus.
+            base_dir (str): Path of repo base directory.
 
+        Yields:
+            SpellingNotification: notifications in order of appearance.
+    """
+    lines = iter(lines)
+    match = None
+    code_snippet = ""
+    suggestions = []
+    for line in lines:
+        next_match = LTEX_NOTIFICATION_PATTERN.match(line)
+        if not next_match:
+            # Suggestions may span across multiple lines
+            suggestions.append(line.strip())
+            continue
+
+        if match:
+            yield spelling_notification_from(match, code_snippet, suggestions, base_dir)
+        match = next_match
+        code_snippet = next(lines, "").strip()
+        suggestions = []
+    if match:
+        yield spelling_notification_from(match, code_snippet, suggestions, base_dir)
+
+
+def spelling_notification_from(match, code_snippet, suggestions, base_dir):
+    """
+        Args:
+            match (re.Match): match of LTEX_NOTIFICATION_PATTERN.
+            code_snippet (str): the line following the matched line.
+            suggestions (List(str)): the stripped lines following the code snippet.
+            base_dir (str): Path of repo base directory.
 
-def line_is_in_diff(line, changedlines):
+        Returns:
+            SpellingNotification: the notification.
     """
-        Checks if a line (nr) is in the diff.
+    file = match.group('file').removeprefix(base_dir).removeprefix("/")
+    return SpellingNotification(file, match.group('type'), int(match.group('line')), int(match.group('column')),
+                                match.group('message').strip(), code_snippet,
+                                ''.join(f'\n{suggestion}' for suggestion in suggestions))
+
+
+def parse_ltex_output(output, base_dir):
+    """
+        Parses the raw console output of ltex-cli-plus into SpellingNotifications (see iter_ltex_notifications).
 
         Args:
-            line (int): line nr.
-            changedlines (List(int)): changedlines of current file in diff.
+            output (str): console output of ltex-cli-plus.
+            base_dir (str): Path of repo base directory.
 
         Returns:
-            boolean: line is among changedlines.
+            List(SpellingNotification): notifications in order of appearance.
     """
-    line_in_diff = False
-    for changedline in changedlines:
-        if changedline - 2 <= line <= changedline + 2:
-            line_in_diff = True
-    return line_in_diff
+    return list(iter_ltex_notifications(output.split("\n"), base_dir))
 
 
-def analize_report(option, base_dir, command, changedlines):
+def separate_ltex_output_per_file(lines, path_of, first_path):
     """
-        Performs spell-check (with ltex) on specified tex file,
-        IF option == choices['comment_in_code_and_make_report_opt']:
-            posts resulting ltex-warnings/messages/errors (notifications) as PR-review-comments,
-            if respective line, where ltex-notification appears, is in diff and
-        collects the remaining notifications for later convertion to report (md-file).
+        Ends the output of every tex file of a batched ltex-cli-plus run with an empty line (as the output of a run
+        for this tex file only), so the notifications of a tex file never absorb lines of the next tex file.
 
         Args:
-            option (str): one of the options of choices (see global variable "choices").
-            base_dir (str): Path of repo base directory.
-            command (str): ltex command to perform spell-check on a specific ltex file, considering a ltex-config file
-            changedlines (List(int)): List of line nr. of ltex file, to be analysed, in diff.
+            lines (Iterable(str)): lines of the console output of ltex-cli-plus.
+            path_of (function): maps the file of a notification to its rel. path of tex file, None if unknown.
+            first_path (str): rel. path of the tex file the output starts with.
+
+        Yields:
+            str: the lines, with an empty line inserted where the output of the next tex file starts.
+    """
+    current_path = first_path
+    previous_line = ""
+    for line in lines:
+        match = LTEX_NOTIFICATION_PATTERN.match(line)
+        if match:
+            # Notifications are printed grouped by file, unknown paths belong to the file printed before
+            path = path_of(match.group('file'))
+            if path is not None and path != current_path:
+                if previous_line != "":
+                    yield ""
+                current_path = path
+        yield line
+        previous_line = line
+    if previous_line != "":
+        yield ""
+
+
+def notifications_from_diagnostics(tex_file_path, tex_file_abs_path, diagnostics):
+    """
+        Converts LSP diagnostics of ltex-ls-plus into SpellingNotifications,
+        equivalent to the ones parsed from the ltex-cli-plus console output.
+
+        Args:
+            tex_file_path (str): rel. path to spell-checked tex file.
+            tex_file_abs_path (str): abs. path to spell-checked tex file.
+            diagnostics (List(dict)): diagnostics as returned by LtexLanguageServer.check_file
 
         Returns:
-            List(SpellingNotifications): Collection of remaining notifications
+            List(SpellingNotification): notifications sorted by position.
+    """
+    with open(tex_file_abs_path, 'r', encoding='utf-8', errors='replace') as file:
+        source_lines = file.read().split('\n')
+
+    notifications = []
+    for diagnostic in sorted(diagnostics, key=lambda d: (d['range']['start']['line'], d['range']['start']['character'])):
+        line = diagnostic['range']['start']['line'] + 1
+        column = diagnostic['range']['start']['character'] + 1
+        type = SEVERITY_NAMES.get(diagnostic.get('severity'), 'info')
+        message = diagnostic['message'].strip()
+        if diagnostic.get('code'):
+            message = f'{message} [{diagnostic["code"]}]'
+        code_snippet = source_lines[line - 1].strip() if line <= len(source_lines) else ""
+        suggestions = ''.join(f'\n{suggestion}' for suggestion in diagnostic['suggestions'])
+        notifications.append(
+            SpellingNotification(tex_file_path, type, line, column, message, code_snippet, suggestions))
+    return notifications
+
+
+def split_notifications_by_diff(notifications, changed_lines_per_file):
     """
+        Splits notifications into the ones to be posted as PR-review-comments (line is in diff)
+        and the remaining ones to be reported in an extra report (md-file).
+        Multiple notifications for one line are merged into one (new) SpellingNotification,
+        the given notifications are not modified.
+
+        Args:
+            notifications (List(SpellingNotification)): notifications of one spell-check run.
+            changed_lines_per_file (dict): rel. path of tex file -> ChangedLineIndex of its line nr. in diff
+                                           (see changed_lines_of), tex files without changes are missing.
+
+        Returns:
+            List(SpellingNotifications): notifications to be commented
+            List(SpellingNotifications): remaining notifications
+    """
+    notifications_to_comment = {}
+    notifications_to_report = []
+    for notification in notifications:
+        changedlines = changed_lines_per_file.get(notification.file)
+        if changedlines is not None and line_is_in_diff(notification.line, changedlines):
+            # Merge multiple notifications for one line in tex file into one SpellingNotification
+            # to create one PR-review-comment
+            notif = notifications_to_comment.get((notification.file, notification.line))
+            if notif:
+                notif.message = f'{notif.message}\n{notification.message}'
+                notif.suggestions = f'{notif.suggestions}\n{notification.suggestions}'
+                notif.message_and_suggestions_mixed \
+                    = f'{notif.message_and_suggestions_mixed}\n\n{notification.message}{notification.suggestions}'
+            else:
+                notifications_to_comment[(notification.file, notification.line)] = copy.copy(notification)
+        else:
+            notifications_to_report.append(notification)
+    return list(notifications_to_comment.values()), notifications_to_report
 
-    # Run ltex for specified ltex file
-    with LOCK:
-        try:
-            log.info(f'command: {command}')
-            output = subprocess.check_output(command, shell=True, encoding='utf-8', errors='replace')
-            log.info(f'Attention, unexpected output of ltex is: {output}')
-            return []
 
+def run_ltex_cli(command, files=None):
+    """
+        Runs ltex-cli-plus (holding a slot of the LIMITER) and streams its console output,
+        the output is never held in memory as a whole.
+
+        Args:
+            command (str): ltex command to perform spell-check on one or more tex files, considering a ltex-config file
+            files (str): rel. paths of the spell-checked tex files (for the timings).
+
+        Yields:
+            str: lines of the console output of ltex (see split_lines), just [''] if ltex did not print anything.
+    """
+    with LIMITER.slot(ltex_cli_java_opts()) as env, stage('ltex-cli-plus', files):
+        log.info(f'command: {command}')
+        with subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, encoding='utf-8', errors='replace',
+                              env=env) as process:
+            yield from split_lines(process.stdout)
         # As soon as ltex finds 1 warning or error, it returns return code 2
-        except subprocess.CalledProcessError as e:
-            output = e.output
-            log.info(f"Got error: {e.stderr}, and output.")
-            lines = output.split("\n")
-
-            # Run over lines of raw ltex-report and parse warnings/errors/messages into objects SpellingNotification
-            files = set()
-            notifications = {'notifications_to_comment': [], 'notifications_to_report': []}
-            i = 0
-            while i < len(lines):
-                first_line = lines[i]
-                second_line = lines[i + 1] if i + 1 < len(lines) else ""
-                step = 2
-
-                # Matches lines like: "/home/runner/work/sw1-latex-exercise-ci/sw1-latex-exercise-ci/24SS/UE01/Unterricht/Lernziele.tex:57:136: info: 'yes': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]"
-                pattern = (
-                    r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+):\s*(?P<type>\w+):\s*(?P<message>.+).*$"
-                )
-                match = re.match(pattern, first_line)
-                global nr_of_total_warnings
-                if match:
-                    file = match.group('file')
-                    file = file.removeprefix(base_dir).removeprefix("/")
-                    files.add(file)
-
-                    # Avoid checking especially nested tex files (import), twice
-                    if file not in already_checked_files:
-                        nr_of_total_warnings = nr_of_total_warnings + 1
-                        type = match.group('type')
-                        line = int(match.group('line'))
-                        column = int(match.group('column'))
-                        message = match.group('message').strip()
-                        code_snippet = second_line.strip()
-                        suggestions = ""
-
-                        # Suggestions may span across multiple lines
-                        while (i + step) < len(lines) and not re.match(pattern, lines[i + step]):
-                            suggestions = f'{suggestions}\n{lines[i + step].strip()}'
-                            step = step + 1
-
-                        if option == choices['comment_in_code_and_make_report_opt'] and line_is_in_diff(line, changedlines):
-                            # Merge multiple notifications for one line in tex file into one SpellingNotification
-                            # to create one PR-review-comment
-                            notif = next(
-                                (n for n in notifications['notifications_to_comment'] if n.file == file and n.line == line),
-                                None)
-                            if notif:
-                                notif.message = f'{notif.message}\n{message}'
-                                notif.suggestions = f'{notif.suggestions}\n{suggestions}'
-                                notif.message_and_suggestions_mixed \
-                                    = f'{notif.message_and_suggestions_mixed}\n\n{message}{suggestions}'
-                            else:
-                                notifications['notifications_to_comment'].append(
-                                    SpellingNotification(file, type, line, column, message, code_snippet, suggestions))
-                        else:
-                            notifications['notifications_to_report'].append(
-                                SpellingNotification(file, type, line, column, message, code_snippet, suggestions))
-                else:
-                    step = 1
-                i = i + step
-
-            # Notification for lines that are in diff, can be commented directly in the code (PR-review-comment)
-            if len(notifications['notifications_to_comment']) > 0:
-                post_pr_comments(notifications['notifications_to_comment'])
-
-            # Update checked files
-            already_checked_files.update(files)
-
-            # Notification for lines not in diff, must be reported in an extra report (md-file)
-            return notifications['notifications_to_report']
+        log.info(f'ltex exited with return code {process.returncode}.')
+
+
+def analize_report(base_dir, command, files=None):
+    """
+        Performs spell-check (with ltex-cli-plus) with the given command and parses its console output into
+        SpellingNotifications while ltex-cli-plus is running (see run_ltex_cli and iter_ltex_notifications).
+
+        Args:
+            base_dir (str): Path of repo base directory.
+            command (str): ltex command to perform spell-check on a specific tex file, considering a ltex-config file
+            files (str): rel. path of the spell-checked tex file (for the timings).
+
+        Returns:
+            List(SpellingNotification): notifications in order of appearance (not yet marked as checked).
+    """
+    return list(iter_ltex_notifications(run_ltex_cli(command, files), base_dir))
+
+
+def use_ltex_batch(tex_file_paths, overlays=None):
+    """
+        Performs spell-check on several tex files with a single ltex-cli-plus invocation
+        and demultiplexes the combined output per tex file.
+
+        Args:
+            tex_file_paths (List(str)): rel. paths to tex files to be spell-checked.
+            overlays (dict): rel. path of tex file -> SourceOverlay to be checked instead of the tex file.
+
+        Returns:
+            dict: rel. path of tex file -> List(SpellingNotification), in order of appearance.
+    """
+    overlays = overlays or {}
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    ltex_path, config_file_abs_path = get_ltex_paths()
+    normalized_paths = {os.path.normpath(path): path for path in tex_file_paths}
+
+    def path_of(file):
+        return normalized_paths.get(os.path.normpath(file.removeprefix(base_dir).removeprefix("/")))
+
+    # The combined output is demultiplexed while ltex is running, each tex file is parsed as if ltex had been
+    # run for this file only
+    notifications_per_file = {path: [] for path in tex_file_paths}
+    current_path = tex_file_paths[0]
+    with ExitStack() as stack:
+        checked_abs_paths = {path: stack.enter_context(overlays[path].materialize()) if path in overlays
+                             else os.path.join(base_dir, path) for path in tex_file_paths}
+        normalized_paths.update({os.path.normpath(checked_abs_path.removeprefix(base_dir).removeprefix("/")): path
+                                 for path, checked_abs_path in checked_abs_paths.items() if path in overlays})
+        command = f'{ltex_path} --client-configuration={config_file_abs_path} {" ".join(checked_abs_paths.values())}'
+        if len(tex_file_paths) == 1:
+            notifications = analize_report(base_dir, command, current_path)
+        else:
+            output_lines = separate_ltex_output_per_file(run_ltex_cli(command, ' '.join(tex_file_paths)), path_of,
+                                                          current_path)
+            notifications = iter_ltex_notifications(output_lines, base_dir)
+        for notification in notifications:
+            current_path = path_of(notification.file) or current_path
+            if current_path in overlays:
+                # Notifications on the edited copy belong to the tex file
+                notification.file = current_path
+                notification.line = overlays[current_path].original_line(notification.line)
+            notifications_per_file[current_path].append(notification)
+    return notifications_per_file
 
 
 def clean_up_data(data, changed_files_paths):
@@ -253,197 +451,508 @@ def clean_up_data(data, changed_files_paths):
     return cleaned_up_data
 
 
-def use_ltex(tex_file_path, option, changedlines):
+def changed_lines_of(base_dir, filtered_paths, changedlines=None, diff_base=None):
     """
-        Performs spell-check on the tex file specified,
-        the resulting ltex-warnings/messages/errors (notifications) will be provided, depending on option:
-            as captured-console-output in html or
-            as md-file and/or
-            as PR-review-comments (if line where notification is situated is in diff).
+        Determines the changed lines of the tex files, with git diff against diff_base or from the diff-JSON.
+        git diff needs the merge base of diff_base and HEAD, i.e. a checkout with history (actions/checkout
+        with fetch-depth: 0); without it, the diff-JSON is used if given.
 
         Args:
-            tex_file_path (str): Path to tex file to be spell-checked.
-            option (str): one of the options of choices (see global variable 'choices').
-            changedlines (List(int)): line nr. of file to be spell-checked, in diff.
+            base_dir (str): path of the git repository.
+            filtered_paths (List(str)): rel. paths of the tex files of interest.
+            changedlines (str): path to the diff-JSON (see spell_check_and_report), None if not available.
+            diff_base (str): git revision to determine the changed lines with git diff, None to use changedlines.
 
         Returns:
-            List(SpellingNotification): if option != choices['zip_console_report_opt'],
-                                        returns list of notifications to be later written to the md-report-file.
+            dict: rel. path of tex file -> ChangedLineIndex of its line nr. in diff, tex files without changes
+                  are missing.
+
+        Raises:
+            subprocess.CalledProcessError: if git diff fails and there is no diff-JSON to fall back to.
     """
+    if diff_base:
+        try:
+            changed_files = git_changed_lines(base_dir, filtered_paths, diff_base)
+            log.info(f'Changed lines are: {changed_files}')
+            return {path: ChangedLineIndex(lines) for path, lines in changed_files.items()}
+        except subprocess.CalledProcessError:
+            if not changedlines:
+                log.error(f'git diff against {diff_base} failed, it requires the history of the base branch '
+                          f'(e.g. actions/checkout with fetch-depth: 0).')
+                raise
+            log.warning(f'git diff against {diff_base} failed (e.g. no merge base in a shallow checkout), '
+                        f'using the changed lines of {changedlines}.')
 
-    base_dir, action_base_dir = get_repo_and_action_path_env_variables()
+    with open(changedlines, 'r') as file:
+        diff = json.load(file)
+        log.info(f'Found data: {diff["type"]}')
+    changed_files = clean_up_data(diff, filtered_paths)
+    log.info(f'Changed lines are: {changed_files}')
+    return {changed_file['path']: ChangedLineIndex(changed_file['changed_lines']) for changed_file in changed_files}
 
-    # Create paths to tex file, ltex executable and ltex config file
-    tex_file_abs_path = os.path.join(base_dir, tex_file_path)
-    log.info(f'tex-file: {tex_file_abs_path}')
+
+def get_ltex_paths():
+    """
+        Returns:
+            string: abs. path of ltex-cli-plus executable
+            string: abs. path of ltex config file
+    """
+    base_dir, action_base_dir = get_repo_and_action_path_env_variables()
     config_file_abs_path = os.path.join(action_base_dir, CONFIG_FILE_REL_PATH)
-    log.info(f'config-file: {config_file_abs_path}')
     ltex_dir = os.getenv('LTEX_PLUS_DIR')
     if not ltex_dir:
-        ltex_dir = 'ltex-ls-plus-18.5.1/bin/ltex-cli-plus'  # running locally
-    ltex_path = os.path.join(base_dir, ltex_dir)
-    log.info(f'ltex-plus: {ltex_path}')
+        ltex_dir = LTEX_CLI_DEFAULT_REL_PATH
+    return os.path.join(base_dir, ltex_dir), config_file_abs_path
+
+
+def ltex_cli_java_opts():
+    """
+        The class-data-sharing archive of ltex-cli-plus (recorded by a training run of the action, see action.yml)
+        is mapped at every JVM start instead of loading and verifying the classes of LanguageTool again.
+        An outdated archive (e.g. of another JVM version) is silently ignored by the JVM.
+
+        Returns:
+            str: JAVA_OPTS to start ltex-cli-plus with the archive, empty if there is none.
+    """
+    ltex_path, _ = get_ltex_paths()
+    archive_path = os.path.join(os.path.dirname(os.path.dirname(ltex_path)), LTEX_CDS_ARCHIVE_NAME)
+    if not os.path.isfile(archive_path):
+        return ''
+    # JVM warnings are printed to stdout, they must not end up in the console output of ltex
+    return f'-XX:SharedArchiveFile={archive_path} -Xlog:cds*=off'
+
+
+def start_ltex_server(env=None):
+    """
+        Starts one long-lived ltex-ls-plus language server for all tex files of this run.
+
+        Args:
+            env (dict): environment of the server (see LtexLimiter.java_env), None to inherit it.
+
+        Returns:
+            LtexLanguageServer: running server or None, if it could not be started (fallback to ltex-cli-plus).
+    """
+    ltex_path, config_file_abs_path = get_ltex_paths()
+    try:
+        server = LtexLanguageServer(ltex_ls_path_for(ltex_path), load_ltex_settings(config_file_abs_path))
+    except (OSError, ValueError) as e:
+        log.warning(f'Could not load ltex settings, falling back to ltex-cli-plus: {e}')
+        return None
+    try:
+        with stage('ltex-ls-plus start'):
+            return server.start(env)
+    except LtexServerError as e:
+        log.warning(f'Could not start ltex-ls-plus, falling back to ltex-cli-plus: {e}')
+        server.stop()
+        return None
+
+
+def capture_ltex_console_report(tex_file_path, output_lines=None):
+    """
+        Performs spell-check on the tex file specified and captures the (color-coded) console output
+        into a html-report (for the zipped report).
+
+        Args:
+            tex_file_path (str): rel. path to tex file to be spell-checked.
+            output_lines (List(bytes)): if given, the raw console output is collected in addition,
+                                        so that the same ltex run can feed the md-reports.
+
+        Returns:
+            int: number of notifications in the captured console output.
+    """
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    tex_file_abs_path = os.path.join(base_dir, tex_file_path)
+    ltex_path, config_file_abs_path = get_ltex_paths()
 
     # Create report file path
     parts = tex_file_path.split('/')
     filename_without_extension = parts[-1].split('.')[0]
     parts[-1] = f'{filename_without_extension}_report.html'
-    tex_file_path = '-'.join(parts)
-
-    if option == choices['zip_console_report_opt']:
-        # report_folder = ".github/scripts/test_exercise_files/ltex_reports" # for local run
-        report_folder = os.getenv('SPELLING_REPORT_FOLDER')
-        log.info(f'report_folder: {report_folder}')
-
-        # Create the directory if it doesn't exist
-        os.makedirs(f'{base_dir}/{report_folder}', exist_ok=True)
-
-        # Perform spell check and save console output to html-file
-        with LOCK:
-            command = f'script -q -c "{ltex_path} --client-configuration={config_file_abs_path} {tex_file_abs_path}" /dev/null | ansi2html > {report_folder}/{tex_file_path}'
-            subprocess.run(command, shell=True, check=True)
-
-            # Console output is only captured, need to count warnings for PR-comment
-            global nr_of_total_warnings
-            # Matches lines like: /home/runner/work/sw1-latex-exercise-ci/sw1-latex-exercise-ci/24SS/UE01/Unterricht/Lernziele.tex:57:136: info: 'yes': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]
-            pattern = r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+):\s*(?P<type>\w+):\s*(?P<message>.+).*$"
-            nr_of_total_warnings += count_total_warnings(base_dir, report_folder, tex_file_path, pattern, for_ltex_purposes=True)
-    else:
-        command = f'{ltex_path} --client-configuration={config_file_abs_path} {tex_file_abs_path}'
-        return analize_report(option, base_dir, command, changedlines)
+    html_report_path = '-'.join(parts)
+
+    # report_folder = ".github/scripts/test_exercise_files/ltex_reports" # for local run
+    report_folder = os.getenv('SPELLING_REPORT_FOLDER')
+    log.info(f'report_folder: {report_folder}')
+
+    # Create the directory if it doesn't exist
+    os.makedirs(os.path.join(base_dir, report_folder), exist_ok=True)
+
+    # Perform spell check and save console output to html-file,
+    # console output is only captured, need to count warnings for PR-comment
+    with LIMITER.slot(ltex_cli_java_opts()) as env:
+        command = f'script -q -c "{ltex_path} --client-configuration={config_file_abs_path} {tex_file_abs_path}" /dev/null'
+        return capture_console_report(command, os.path.join(base_dir, report_folder, html_report_path),
+                                      LTEX_NOTIFICATION_PATTERN, for_ltex_purposes=True, output_lines=output_lines,
+                                      env=env)
 
 
-def delete_old_comments_in_changed_files(filtered_paths):
+def check_tex_files(tex_file_paths, ltex_server=None, overlays=None):
     """
-        Deletes all PR-review-comments in the files of interest,
-        to avoid multiple PR-review-comments per line due to later comment-addition by the spell-checking process
+        Spell-checks the given tex files, either file by file with the language server
+        or with a single ltex-cli-plus invocation.
 
         Args:
-            filtered_paths (List(str)): List of paths to files of interest (to be spell-checked later).
+            tex_file_paths (List(str)): rel. paths to tex files to be spell-checked.
+            ltex_server (LtexLanguageServer): running language server, None to use ltex-cli-plus.
+            overlays (dict): rel. path of tex file -> SourceOverlay to be checked instead of the tex file.
 
         Returns:
-            void.
+            dict: rel. path of tex file -> List(SpellingNotification), not yet routed.
     """
+    overlays = overlays or {}
+    if not ltex_server:
+        return use_ltex_batch(tex_file_paths, overlays)
+
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    notifications_per_file = {}
+    for path in tex_file_paths:
+        tex_file_abs_path = os.path.join(base_dir, path)
+        try:
+            overlay = overlays.get(path)
+            with stage('ltex-ls-plus check', path):
+                diagnostics = ltex_server.check_file(tex_file_abs_path, overlay.text if overlay else None)
+            for diagnostic in diagnostics if overlay else []:
+                for position in (diagnostic['range']['start'], diagnostic['range']['end']):
+                    position['line'] = overlay.original_line(position['line'] + 1) - 1
+            notifications_per_file[path] = notifications_from_diagnostics(path, tex_file_abs_path, diagnostics)
+        except LtexServerError as e:
+            log.warning(f'ltex-ls-plus failed for {path}, falling back to ltex-cli-plus: {e}')
+            notifications_per_file.update(use_ltex_batch([path], overlays))
+    return notifications_per_file
+
+
+def check_changed_paragraphs(tex_file_paths, ltex_server, overlays, paragraph_cache: ParagraphCache):
+    """
+        Spell-checks only the paragraphs of the given tex files that are not in the paragraph cache,
+        the cached notifications of the other paragraphs are re-anchored to their current line nr.
 
-    # Delete all old comments
-    token = os.getenv('GITHUB_TOKEN')
-    g = Github(token)
-    repo = g.get_repo(os.getenv('GITHUB_REPOSITORY'))
-    pr_number = os.getenv('GITHUB_REF').split('/')
-    pr = repo.get_pull(int(pr_number[-2]))
-    review_comments = pr.get_review_comments()
-    for comment in review_comments:
-        if comment.path in filtered_paths:
-            comment.delete()
-            print(f"Deleted comment: {comment.path}, {comment.position}, {comment.id}")
-    g.close()
+        Args:
+            tex_file_paths (List(str)): rel. paths to tex files to be spell-checked.
+            ltex_server (LtexLanguageServer): running language server, None to use ltex-cli-plus.
+            overlays (dict): rel. path of tex file -> SourceOverlay to be checked instead of the tex file,
+                             extended by the tex files restricted to their uncached paragraphs.
+            paragraph_cache (ParagraphCache): cache of the notifications per paragraph.
+
+        Returns:
+            dict: rel. path of tex file -> List(SpellingNotification) sorted by position, not yet routed.
+    """
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    records_per_file = {}
+    missed_paragraphs = {}
+    for path in tex_file_paths:
+        # The overlay reads the tex file, it is only created if there is none yet
+        if path not in overlays:
+            overlays[path] = SourceOverlay(os.path.join(base_dir, path))
+        overlay = overlays[path]
+        records_per_file[path], missed_paragraphs[path] = paragraph_cache.lookup(paragraph_cache.paragraphs(overlay),
+                                                                                 path)
+        if missed_paragraphs[path]:
+            overlay.restrict_to_paragraphs({line for paragraph in missed_paragraphs[path]
+                                            for line in range(paragraph.first_line, paragraph.last_line + 1)})
+
+    paths_to_check = [path for path in tex_file_paths if missed_paragraphs[path]]
+    log.info(f'Spell-checking {sum(len(paragraphs) for paragraphs in missed_paragraphs.values())} uncached '
+             f'paragraphs of {paths_to_check}')
+    checked = check_tex_files(paths_to_check, ltex_server, overlays) if paths_to_check else {}
+
+    notifications_per_file = {}
+    for path in tex_file_paths:
+        records = records_per_file[path] + paragraph_cache.store(missed_paragraphs[path],
+                                                                 [vars(n) for n in checked.get(path, [])])
+        notifications_per_file[path] = sorted((SpellingNotification.from_record(r) for r in records),
+                                              key=lambda n: (n.line, n.column))
+    return notifications_per_file
+
+
+def spell_check_chunk(chunk, ltex_server=None, result_cache=None, changed_paragraphs_only=False,
+                      paragraph_cache=None):
+    """
+        Spell-checks the tex files of one chunk with a single ltex-cli-plus invocation (or the language server),
+        only tex files whose result is not cached are checked.
 
+        Args:
+            chunk (dict): rel. path to tex file -> its line nr. in diff.
+            other args: see spell_check_files.
 
-def comment_in_code_and_make_report_opt(option, filtered_paths, changedlines):
+        Returns:
+            dict: rel. path of tex file -> List(SpellingNotification), not yet routed.
+    """
+    base_dir, _ = get_repo_and_action_path_env_variables()
+
+    # Tex files restricted to their changed paragraphs, line nr. are not shifted
+    overlays = {}
+    variants = {}
+    if changed_paragraphs_only:
+        for path, changedlines in chunk.items():
+            if changedlines is not None:
+                overlays[path] = SourceOverlay(os.path.join(base_dir, path))
+                paragraphs = overlays[path].restrict_to_paragraphs(changedlines)
+                variants[path] = f'paragraphs:{paragraphs}'
+                log.info(f'Spell-checking paragraphs {paragraphs} of {path}')
+
+    # Only spell-check tex files whose result is not cached
+    notifications_per_file = {}
+    cache_keys = {}
+    if result_cache:
+        for path in chunk:
+            cache_keys[path] = result_cache.key_for(os.path.join(base_dir, path), base_dir, variants.get(path, ''))
+            cached = result_cache.get(cache_keys[path])
+            if cached is not None:
+                log.info(f'Using cached ltex result for {path}')
+                notifications_per_file[path] = [SpellingNotification.from_record(r) for r in cached]
+
+    missing_paths = [path for path in chunk if path not in notifications_per_file]
+    if missing_paths:
+        if paragraph_cache:
+            checked = check_changed_paragraphs(missing_paths, ltex_server, overlays, paragraph_cache)
+        else:
+            checked = check_tex_files(missing_paths, ltex_server, overlays)
+        if result_cache:
+            for path in missing_paths:
+                result_cache.put(cache_keys[path], [vars(n) for n in checked[path]])
+        notifications_per_file.update(checked)
+    return notifications_per_file
+
+
+def spell_check_chunk_in_worker(*args):
     """
-        Performs spell-check (with ltex) on specified tex files,
-        posts resulting ltex-warnings/messages/errors (notifications) as PR-review-comments,
-        if respective line, where ltex-notification appears, is in diff and
-        collects the remaining notifications to then write them to a report (md-file).
+        Runs spell_check_chunk in a worker process, the stage timings recorded there are returned with its result.
 
         Args:
-            option (str): one of the options of choices (see global variable "choices").
-            filtered_paths (List(str)): List of paths to tex files to be spell-checked.
-            changedlines (str): Path to changed files information of diff
-                                (created by another action GrantBirki/git-diff-action@v2.8.0)
+            args: see spell_check_chunk.
 
         Returns:
-            void.
+            dict: rel. path of tex file -> List(SpellingNotification), not yet routed.
+            List(dict): stage timings (see StageTimer.records), to be added to the TIMER of the run.
     """
-    summary_file = SummaryMdFile('spell_check_report.md',
-                                 len(filtered_paths),
-                                 is_complementary_to_code_comments=True)
-    log.info(f'File {summary_file.file_name} successfully created.')
+    return spell_check_chunk(*args), TIMER.pop_records()
 
-    # Delete old comments in order to avoid multiple comments for same line
-    delete_old_comments_in_changed_files(filtered_paths)
 
-    # Make report to PR comments
-    with open(changedlines, 'r') as file:
-        diff = json.load(file)
-        log.info(f'Found data: {diff["type"]}')
-    changed_files = clean_up_data(diff, filtered_paths)
+def spell_check_files(files, ltex_server=None, batch_size=1, result_cache=None, zip_report=False,
+                      changed_paragraphs_only=False, paragraph_cache=None, jobs=1, spell_check_run=None):
+    """
+        Spell-checks the given tex files (in input order), either one by one or
+        in chunks of batch_size tex files per ltex-cli-plus invocation.
 
-    log.info(f'Changed lines are: {changed_files}')
-    for changed_file in changed_files:
-        if not any(changed_file in s for s in already_checked_files):
-            notifications_not_in_diff = use_ltex(changed_file['path'], option, changed_file['changed_lines'])
-            # log.info(f'It is time to report by md: {notifications_not_in_diff}')
+        Args:
+            files (List(Tuple(str, List(int)))): rel. paths to tex files and their line nr. in diff.
+            ltex_server (LtexLanguageServer): running language server, None to use ltex-cli-plus.
+            batch_size (int): number of tex files per ltex-cli-plus invocation, 0 for all at once
+                              (split evenly between the jobs).
+            result_cache (ResultCache): cache of parsed notifications, None to always run ltex.
+            zip_report (bool): capture the console output of every tex file into a html-report as well,
+                               see spell_check_files_with_console_report.
+            changed_paragraphs_only (bool): only spell-check the paragraphs with lines in diff (and their
+                                            LaTeX context) of tex files with line nr. in diff.
+            paragraph_cache (ParagraphCache): cache of notifications per paragraph, None to spell-check whole
+                                              tex files (not used for zip_report).
+            jobs (int): number of worker processes running ltex-cli-plus concurrently
+                        (not used for ltex_server and zip_report).
+            spell_check_run (SpellCheckRun): counts the notifications of the html-reports (zip_report).
+
+        Yields:
+            Tuple(str, List(int), List(SpellingNotification)): rel. path to tex file, its line nr. in diff
+                                                               and its notifications (not yet marked as checked).
+    """
+    if zip_report:
+        yield from spell_check_files_with_console_report(files, result_cache, spell_check_run)
+        return
+
+    if ltex_server or batch_size == 1:
+        chunk_size = 1
+    elif batch_size > 1:
+        chunk_size = batch_size
+    else:
+        chunk_size = max(-(-len(files) // max(jobs, 1)), 1)
+
+    chunks = []
+    for start in range(0, len(files), chunk_size):
+        chunk = {}
+        for path, changedlines in files[start:start + chunk_size]:
+            if path not in chunk:
+                chunk[path] = changedlines
+        if chunk:
+            chunks.append(chunk)
+
+    if jobs > 1 and not ltex_server and len(chunks) > 1:
+        log.info(f'Spell-checking {len(chunks)} chunks with {jobs} worker processes.')
+        with worker_process_pool(jobs) as executor:
+            futures = [executor.submit(spell_check_chunk_in_worker, chunk, None, result_cache,
+                                       changed_paragraphs_only, paragraph_cache) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                notifications_per_file, timings = future.result()
+                TIMER.add_records(timings)
+                for path, changedlines in chunk.items():
+                    yield path, changedlines, notifications_per_file[path]
+        return
+
+    for chunk in chunks:
+        notifications_per_file = spell_check_chunk(chunk, ltex_server, result_cache, changed_paragraphs_only,
+                                                   paragraph_cache)
+        for path, changedlines in chunk.items():
+            yield path, changedlines, notifications_per_file[path]
+
+
+def spell_check_files_with_console_report(files, result_cache=None, spell_check_run=None):
+    """
+        Spell-checks the given tex files one by one with ltex-cli-plus and captures the console output of every
+        tex file into a html-report (for the zipped report). The same ltex run feeds the md-reports,
+        therefore the result cache is only updated, not used.
 
-            # Write report for warnings outside diff to summary md file
-            if notifications_not_in_diff is not None:
-                summary_file.add_overview_line(changed_file['path'],
-                                               0,
-                                               len(notifications_not_in_diff),
-                                               0)
-
-                for notification in notifications_not_in_diff:
-                    summary_file.add_notification_entry(notification)
-            else:
-                log.warning(f'Attention for {changed_file}: notifications_not_in_diff was None.')
-    summary_file.add_details_summary_end()
-    log.info('Report finnished.')
+        Args:
+            files (List(Tuple(str, List(int)))): rel. paths to tex files and their line nr. in diff.
+            result_cache (ResultCache): cache of parsed notifications, None to not cache.
+            spell_check_run (SpellCheckRun): counts the notifications of the html-reports, None to not count them.
 
+        Yields:
+            Tuple(str, List(int), List(SpellingNotification)): rel. path to tex file, its line nr. in diff
+                                                               and its notifications (not yet marked as checked).
+    """
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    for path, changedlines in files:
+        output_lines = []
+        with stage('ltex-cli-plus', path):
+            nr_of_warnings_for_zip = capture_ltex_console_report(path, output_lines)
+        if spell_check_run:
+            spell_check_run.nr_of_total_warnings_for_zip += nr_of_warnings_for_zip
+        notifications = list(iter_ltex_notifications(split_lines(output_lines), base_dir))
+        if result_cache:
+            result_cache.put(result_cache.key_for(os.path.join(base_dir, path), base_dir),
+                             [vars(n) for n in notifications])
+        yield path, changedlines, notifications
+
+
+def write_overview_and_notifications(summary_file, path, notifications):
+    summary_file.add_overview_line(path,
+                                   0,
+                                   len(notifications),
+                                   0)
 
-def make_md_report_without_comments(option, filtered_paths):
+    for notification in notifications:
+        summary_file.add_notification_entry(notification)
+
+
+def spell_check_and_report(options, filtered_paths, changedlines=None, ltex_server=None, batch_size=1,
+                           result_cache=None, changed_paragraphs_only=False, paragraph_cache=None, jobs=1,
+                           diff_base=None, baseline: Baseline = None):
     """
-        Performs spell-check (with ltex) on specified tex files,
-        collects the ltex-notifications (warnings/messages/errors) to then write them to a report (md-file)
-        for later use as GITHUB_STEP_SUMMARY or PR-comment posting.
+        Performs spell-check (with ltex) on specified tex files, with one ltex run per tex file
+        feeding all requested outputs (options):
+            choices['zip_console_report_opt']: captured console output as html-report (to be zipped),
+            choices['comment_in_code_and_make_report_opt']: posts ltex-notifications as PR-review-comments,
+                if respective line, where ltex-notification appears, is in diff and writes the remaining
+                notifications to spell_check_remaining_report.md,
+            choices['make_report_for_pr_comment_opt'] or choices['make_report_for_github_summary_opt']:
+                writes all ltex-notifications to spell_check_report.md
+                for later use as GITHUB_STEP_SUMMARY or PR-comment posting.
         (PR-comment (comment in PR) != PR-review-comment (comment in PR in line of a file))
 
         Args:
-            option (str): one of the options of choices (see global variable "choices").
+            options (List(str)): options of choices (see global variable "choices").
             filtered_paths (List(str)): List of paths to tex files to be spell-checked.
+            changedlines (str): Path to changed files information of diff
+                                (created by another action GrantBirki/git-diff-action@v2.8.0),
+                                required for choices['comment_in_code_and_make_report_opt'].
+            ltex_server (LtexLanguageServer): running language server, None to use ltex-cli-plus.
+            batch_size (int): number of tex files per ltex-cli-plus invocation, 0 for all at once.
+            result_cache (ResultCache): cache of parsed notifications, None to always run ltex.
+            changed_paragraphs_only (bool): for choices['comment_in_code_and_make_report_opt'] only:
+                spell-check only the paragraphs with lines in diff, the remaining report then only contains
+                notifications of these paragraphs (ignored if another report needs the whole tex files).
+            paragraph_cache (ParagraphCache): cache of notifications per paragraph, None to not use it.
+            jobs (int): number of worker processes running ltex-cli-plus concurrently.
+            diff_base (str): git revision to determine the changed lines with git diff (instead of changedlines,
+                             which is only used if git diff fails), None to use changedlines.
+            baseline (Baseline): accepted notifications, neither reported nor commented; None to report all.
 
         Returns:
-            void.
+            SpellCheckRun: state of the run, incl. the number of notifications.
     """
-    summary_file = SummaryMdFile('spell_check_report.md',
-                                 len(filtered_paths))
-
-    for path in filtered_paths:
-        if not any(path in s for s in already_checked_files):
-            notifications = use_ltex(path, option, None)
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    spell_check_run = SpellCheckRun()
+    zip_report = choices['zip_console_report_opt'] in options
+    comment_in_code = choices['comment_in_code_and_make_report_opt'] in options
+    md_report = (choices['make_report_for_pr_comment_opt'] in options
+                 or choices['make_report_for_github_summary_opt'] in options)
+
+    summary_file = SummaryMdFile('spell_check_report.md', len(filtered_paths)) if md_report else None
+    remaining_summary_file = None
+    changed_lines_per_file = {}
+    pull_request_client = None
+    notifications_to_comment = []
+    if comment_in_code:
+        remaining_summary_file = SummaryMdFile('spell_check_remaining_report.md',
+                                               len(filtered_paths),
+                                               is_complementary_to_code_comments=True)
+        log.info(f'File {remaining_summary_file.file_name} successfully created.')
+        from github_api import PullRequestClient
+
+        pull_request_client = PullRequestClient.from_env()
+
+        # Make report to PR comments
+        changed_lines_per_file = changed_lines_of(base_dir, filtered_paths, changedlines, diff_base)
+
+    # ltex-cli-plus does not follow \input/\include, so every tex file is spell-checked on its own
+    # (unlike linting, no collapsing to root documents)
+    if zip_report or md_report:
+        files = [(path, changed_lines_per_file.get(path)) for path in filtered_paths]
+    else:
+        files = list(changed_lines_per_file.items())
+    if changed_paragraphs_only and (zip_report or md_report):
+        log.info('Spell-checking whole tex files, as they are reported completely.')
+    changed_paragraphs_only = changed_paragraphs_only and comment_in_code and not zip_report and not md_report
+
+    for path, lines_in_diff, notifications in spell_check_files(files, ltex_server, batch_size, result_cache,
+                                                                  zip_report, changed_paragraphs_only,
+                                                                  paragraph_cache, jobs, spell_check_run):
+        if baseline:
+            notifications = baseline.new_notifications(notifications, spelling_fingerprint)
+        notifications = spell_check_run.mark_checked(notifications)
+
+        if summary_file:
+            # Write resulting ltex-notifications to md-file
+            write_overview_and_notifications(summary_file, path, notifications)
+
+        if remaining_summary_file and lines_in_diff is not None:
+            notifications_in_diff, notifications_not_in_diff = split_notifications_by_diff(notifications,
+                                                                                           changed_lines_per_file)
+            notifications_to_comment.extend(notifications_in_diff)
 
-            if notifications is not None:
-                # Write resulting ltex-notifications to md-file
-                # log.info(f'It is time to report by md: {notifications}')
-                summary_file.add_overview_line(path,
-                                               0,
-                                               len(notifications),
-                                               0)
+            # Write report for warnings outside diff to summary md file
+            write_overview_and_notifications(remaining_summary_file, path, notifications_not_in_diff)
 
-                for notification in notifications:
-                    summary_file.add_notification_entry(notification)
-            else:
-                log.warning(f'Notifications for {path}: {notifications}')
+    # Notification for lines that are in diff, can be commented directly in the code (PR-review-comment),
+    # only new ones are posted (as one PR-review), the ones of resolved notifications are deleted
+    if pull_request_client:
+        update_pr_comments(pull_request_client, notifications_to_comment, filtered_paths)
+        pull_request_client.close()
 
     # Add details html-tag
-    summary_file.add_details_summary_end()
+    for file in (summary_file, remaining_summary_file):
+        if file:
+            file.add_details_summary_end()
     log.info('Report finnished.')
+    return spell_check_run
 
 
-def main():
-    # Define the logger format
-    LOG_LEVEL = log.DEBUG
-    log.basicConfig(format='%(levelname)s: %(message)s', level=LOG_LEVEL)
+def create_result_cache(cache_dir, max_size_mb, namespace='ltex'):
+    base_dir, _ = get_repo_and_action_path_env_variables()
+    ltex_path, config_file_abs_path = get_ltex_paths()
+    return ResultCache(os.path.join(base_dir, cache_dir), namespace, executable_fingerprint(ltex_path),
+                       config_file_abs_path, max_size_mb)
 
-    # Define input argument parser
-    log.info("Start check.")
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-cf', '--changedfiles', required=True, help="Paths to changed files to be spell-checked.")
+
+def add_arguments(parser):
+    """
+        Adds the spell-check options (the shared ones are added by add_common_arguments).
+    """
     parser.add_argument('-o', '--option', choices=[choices['zip_console_report_opt'],
                                                    choices['comment_in_code_and_make_report_opt'],
                                                    choices['make_report_for_pr_comment_opt'],
                                                    choices['make_report_for_github_summary_opt']],
-                        required=True,
-                        help='Choose between 4 options: ZIPP_CONSOLE_REPORT to capture console output to html-report, '
+                        action='append', required=True,
+                        help='Choose any of 4 options (repeat --option to combine them, the tex files are then '
+                             'spell-checked only once): ZIPP_CONSOLE_REPORT to capture console output to html-report, '
                              'WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT: writes pr-review-comments directly in code '
                              '(if in diff) and reports the rest as .md-file'
                              'WRITE_MD_REPORT_AS_PR_COMMENT: writes all warnings as md-file and posts it as pr-comment'
@@ -451,44 +960,124 @@ def main():
                              'as GITHUB_SUMMARY')
     parser.add_argument('-cl', '--changedlines',
                         help="Path to the diff-JSON file from action GrantBirki/git-diff-action@v2.8.0. "
-                             "(required for option WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT)")
-    parser.add_argument('-c', '--config', required=True,
-                        help="Config for CI/CD pipeline, likely .lecture-build-ci.json")
-    parser.add_argument('-wd', '--workdir', required=True, help="Working directory, likely repo root.")
-    args = parser.parse_args()
-    args.workdir = Path(args.workdir)
-
-    log.info(f'Chosen option: {args.option}')
-    if args.option == choices['comment_in_code_and_make_report_opt'] and (
-      not args.changedlines or not os.getenv('GITHUB_TOKEN')):
+                             "(required for option WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT, "
+                             "unless --diff_base is set)")
+    parser.add_argument('--diff_base',
+                        help="Git revision the changes are based on (e.g. origin/main): the changed lines are "
+                             "determined with git diff against the merge base with HEAD instead of --changedlines "
+                             "(requires the git history, e.g. fetch-depth: 0; falls back to --changedlines if given).")
+    parser.add_argument('--ltex_server', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: spell-check all files with one long-lived ltex-ls-plus language server "
+                             "instead of one ltex-cli-plus run per file (not used for ZIPP_CONSOLE_REPORT).")
+    parser.add_argument('--batch_size', type=int, default=1,
+                        help="Number of tex files spell-checked per ltex-cli-plus invocation, 0 for all at once "
+                             "(not used for ZIPP_CONSOLE_REPORT and --ltex_server).")
+    parser.add_argument('--changed_paragraphs_only', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: for WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT only spell-check the "
+                             "paragraphs with lines in diff (incl. preamble and environment boundaries).")
+    parser.add_argument('--paragraph_cache', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: cache the ltex results per paragraph (requires --cache_dir), only new or "
+                             "edited paragraphs of a changed tex file are spell-checked (not used for "
+                             "ZIPP_CONSOLE_REPORT).")
+
+
+def check_arguments(parser, args):
+    """
+        Checks the combination of spell-check options, exits with a usage error if it is not feasible.
+    """
+    log.info(f'Chosen options: {args.option}')
+    if args.all and choices['comment_in_code_and_make_report_opt'] in args.option:
+        parser.error('--all can not be combined with WRITE_PR_COMMENTS_AND_MD_REPORT_AS_PR_COMMENT (no diff).')
+    if choices['comment_in_code_and_make_report_opt'] in args.option and (
+      not (args.changedlines or args.diff_base) or not os.getenv('GITHUB_TOKEN')):
         raise argparse.ArgumentTypeError(
-            "When setting --option to WRITE_PR_COMMENTS_AND_MD_REPORT, changedlines and the env-variable GITHUB_TOKEN "
-            "must be set.")
+            "When setting --option to WRITE_PR_COMMENTS_AND_MD_REPORT, changedlines (or diff_base) and the "
+            "env-variable GITHUB_TOKEN must be set.")
 
-    config_file = Config(args)
-    log.info(f'Added/Modified tex-file: {args.changedfiles}')
-    log.info(f'Added/Modified tex-file lines: {args.changedlines}')
 
-    # Filter paths that contain the specific directory defined in config in their path
-    filtered_paths = [p for p in eval(args.changedfiles) if config_file.active_semester in p]
-    log.info(f'Changed tex-files from {config_file.active_semester}: {filtered_paths}')
+def run(args, config_file: Config, filtered_paths):
+    """
+        Spell-checks the given tex files and writes the requested reports, PR-review comments and
+        the number of notifications (GITHUB_ENV).
 
-    # Perform spell-check and provide result depending on args.option
-    if args.option == choices['zip_console_report_opt']:
-        for path in filtered_paths:
-            if not any(path in s for s in already_checked_files):
-                use_ltex(path, args.option, None)
+        Args:
+            args (argparse.Namespace): arguments, see add_common_arguments and add_arguments.
+            config_file (Config): configuration of the lecture repo.
+            filtered_paths (List(str)): rel. paths to tex files to be spell-checked.
 
-    elif args.option == choices['comment_in_code_and_make_report_opt']:
-        comment_in_code_and_make_report_opt(args.option, filtered_paths, args.changedlines)
+        Returns:
+            Tuple(int, int): number of notifications in the md-reports and in the html-reports.
+    """
+    log.info(f'Added/Modified tex-file lines: {args.changedlines}')
 
-    # workflow: choices['make_report_for_pr_comment_opt'] or choices['make_report_for_github_summary_opt']
-    else:
-        make_md_report_without_comments(args.option, filtered_paths)
+    # Perform spell-check and provide result depending on args.option
+    zip_report = choices['zip_console_report_opt'] in args.option
+    md_report = any(option != choices['zip_console_report_opt'] for option in args.option)
+
+    result_cache = create_result_cache(args.cache_dir, args.cache_max_mb) if args.cache_dir and md_report else None
+    paragraph_cache = None
+    if result_cache and args.paragraph_cache:
+        paragraph_cache = ParagraphCache(create_result_cache(args.cache_dir, args.cache_max_mb,
+                                                             PARAGRAPH_CACHE_NAMESPACE))
+    elif args.paragraph_cache and not args.cache_dir:
+        log.warning('The paragraph cache requires the result cache (--cache_dir, input use_result_cache), '
+                    'spell-checking whole tex files.')
+    # The baseline only applies to the md-reports and PR-review comments, the html-report is the captured console output
+    baseline = Baseline.load(args.baseline, BASELINE_SECTION, args.write_baseline) \
+        if args.baseline and md_report else None
+    log.info(f'Up to {LIMITER.max_processes} concurrent ltex processes ({LIMITER.heap_mb} MB heap each).')
+    with ExitStack() as stack:
+        ltex_server = None
+        # The language server is one JVM as well, it holds a slot for its whole lifetime;
+        # the console output for the html-report can only be captured from ltex-cli-plus
+        if args.ltex_server and not zip_report and filtered_paths:
+            ltex_server = start_ltex_server(stack.enter_context(LIMITER.slot()))
+            if not ltex_server:
+                stack.close()
+        try:
+            with stage('total'):
+                spell_check_run = spell_check_and_report(args.option, filtered_paths, args.changedlines, ltex_server,
+                                                         args.batch_size, result_cache, args.changed_paragraphs_only,
+                                                         paragraph_cache, args.jobs, args.diff_base, baseline)
+        finally:
+            if ltex_server:
+                with stage('ltex-ls-plus stop'):
+                    ltex_server.stop()
+    for cache in (result_cache, paragraph_cache):
+        if cache:
+            with stage('result cache eviction'):
+                cache.evict()
+    if baseline and baseline.update:
+        baseline.save(args.baseline, BASELINE_SECTION)
+    elif baseline:
+        log.info(f'{baseline.nr_of_suppressed} ltex notifications in the baseline were not reported.')
+
+    nr_of_total_warnings = spell_check_run.nr_of_total_warnings if md_report \
+        else spell_check_run.nr_of_total_warnings_for_zip
 
     # Append the environment variable to GITHUB_ENV
     with open(os.getenv('GITHUB_ENV'), 'a') as env_file:
+        env_file.write(f"TOTAL_SPELLINGCHECK_WARNINGS_ZIP={spell_check_run.nr_of_total_warnings_for_zip}\n")
         env_file.write(f"TOTAL_SPELLINGCHECK_WARNINGS={nr_of_total_warnings}\n")
+    return nr_of_total_warnings, spell_check_run.nr_of_total_warnings_for_zip
+
+
+def main():
+    # Define the logger format
+    LOG_LEVEL = log.DEBUG
+    log.basicConfig(format='%(levelname)s: %(message)s', level=LOG_LEVEL)
+
+    # Define input argument parser
+    log.info("Start check.")
+    parser = argparse.ArgumentParser()
+    add_common_arguments(parser)
+    add_arguments(parser)
+    args = parse_common_arguments(parser)
+    check_arguments(parser, args)
+
+    config_file = Config(args)
+    run(args, config_file, select_tex_files(args, config_file))
+    TIMER.write_report('spell-check', get_repo_and_action_path_env_variables()[0])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+import json
+import logging as log
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+TIMING_REPORT_FILE_NAME = '{}_timings.json'
+TIMING_REPORT_FORMAT_VERSION = '1'
+
+
+class StageTimer:
+    def __init__(self, enabled=True):
+        """
+            Records wall time, CPU time of child processes (e.g. chktex, the LTeX JVM) and peak RSS of named stages,
+            per stage and tex file. Only a few getrusage calls per stage, therefore always on
+            (disable with env-variable STAGE_TIMING=false).
+            Stages may be nested and may run concurrently (threads); child CPU time is counted process-wide,
+            so concurrent stages each include the CPU time of children finished in the meantime.
+        """
+        self.enabled = enabled
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, file=None):
+        """
+            Times the enclosed block, e.g. `with stage('chktex', tex_file_path):`.
+
+            Args:
+                name (str): name of the stage.
+                file (str): rel. path to the tex file the stage works on, None for stages of the whole run.
+        """
+        if not self.enabled:
+            yield
+            return
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            own = resource.getrusage(resource.RUSAGE_SELF)
+            record = {
+                'stage': name,
+                'file': file,
+                'wall_s': round(wall_time, 6),
+                'child_cpu_s': round(children.ru_utime + children.ru_stime
+                                     - children_before.ru_utime - children_before.ru_stime, 6),
+                # Linux reports kB; peak so far of this process and of the largest finished child
+                'peak_rss_kb': own.ru_maxrss,
+                'child_peak_rss_kb': children.ru_maxrss
+            }
+            with self._lock:
+                self.records.append(record)
+
+    def pop_records(self):
+        """
+            Removes and returns the records so far, e.g. those of a task run in a worker process, whose
+            timer is never reported (see add_records).
+
+            Returns:
+                List(dict): records, in order of completion.
+        """
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def add_records(self, records):
+        """
+            Adds records of another timer, e.g. the ones a worker process returned with the result of its task.
+        """
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self):
+        """
+            Returns:
+                List(dict): per stage (in order of first occurrence): count, total and max wall time,
+                            total child CPU time and peak RSS.
+        """
+        stages = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            stage = stages.setdefault(record['stage'], {'stage': record['stage'], 'count': 0, 'wall_s': 0.0,
+                                                        'max_wall_s': 0.0, 'child_cpu_s': 0.0, 'peak_rss_kb': 0,
+                                                        'child_peak_rss_kb': 0})
+            stage['count'] += 1
+            stage['wall_s'] += record['wall_s']
+            stage['max_wall_s'] = max(stage['max_wall_s'], record['wall_s'])
+            stage['child_cpu_s'] += record['child_cpu_s']
+            stage['peak_rss_kb'] = max(stage['peak_rss_kb'], record['peak_rss_kb'])
+            stage['child_peak_rss_kb'] = max(stage['child_peak_rss_kb'], record['child_peak_rss_kb'])
+        return list(stages.values())
+
+    def markdown_table(self, title):
+        lines = [f'### Timings: {title}\n',
+                 '| Stage | Count | Wall [s] | Max [s] | Child CPU [s] | Peak RSS [MB] | Child peak RSS [MB] |',
+                 '|---|---:|---:|---:|---:|---:|---:|']
+        for stage in self.summary():
+            lines.append(f'| {stage["stage"]} | {stage["count"]} | {stage["wall_s"]:.2f} | {stage["max_wall_s"]:.2f} '
+                         f'| {stage["child_cpu_s"]:.2f} | {stage["peak_rss_kb"] / 1024:.0f} '
+                         f'| {stage["child_peak_rss_kb"] / 1024:.0f} |')
+        return '\n'.join(lines) + '\n\n'
+
+    def write_report(self, script_name, base_dir):
+        """
+            Writes all records as JSON (<base_dir>/<script_name>_timings.json) and appends the per-stage table
+            to the GitHub step summary (env-variable GITHUB_STEP_SUMMARY), if set.
+        """
+        if not self.enabled or not self.records:
+            return
+        report_path = os.path.join(base_dir, TIMING_REPORT_FILE_NAME.format(script_name))
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': TIMING_REPORT_FORMAT_VERSION, 'script': script_name, 'stages': self.summary(),
+                       'records': self.records}, file, indent=1)
+        log.info(f'Timings written to {report_path}')
+
+        step_summary_path = os.getenv('GITHUB_STEP_SUMMARY')
+        if step_summary_path:
+            with open(step_summary_path, 'a', encoding='utf-8') as file:
+                file.write(self.markdown_table(script_name))
+
+
+TIMER = StageTimer(os.getenv('STAGE_TIMING', 'true').lower() not in ('false', 'no', '0'))
+stage = TIMER.stage
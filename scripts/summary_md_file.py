@@ -1,11 +1,10 @@
 #!/usr/bin/env python
 import os
-import threading
+import queue
 
+from stage_timer import stage
 from tex_checks_utils import get_repo_and_action_path_env_variables
 
-file_lock = threading.Lock()
-
 
 class SummaryMdFile:
     def __init__(self, file_name, total_files, make_content_expandable=True, is_complementary_to_code_comments=False):
@@ -35,6 +34,9 @@ class SummaryMdFile:
 
         self.add_details_summary = make_content_expandable
 
+        # Rendered report parts, written to the file at once by flush (producers may run concurrently)
+        self.pending_parts = queue.SimpleQueue()
+
         base_dir, _ = get_repo_and_action_path_env_variables()
         self.file_name = os.path.join(base_dir, file_name)
 
@@ -64,10 +66,8 @@ class SummaryMdFile:
             Returns:
                 void
         """
-        with file_lock:
-            with open(self.file_name, 'ab+') as f:
-                f.write(f'## Path: {tex_file_path}\n'
-                        f'{nr_errors} errors printed, {nr_warnings} warnings printed, {nr_messages} messages printed\n\n'.encode())
+        self.pending_parts.put(f'## Path: {tex_file_path}\n'
+                               f'{nr_errors} errors printed, {nr_warnings} warnings printed, {nr_messages} messages printed\n\n')
 
     def add_notification_entry(self, notification):
         """
@@ -79,31 +79,42 @@ class SummaryMdFile:
             Returns:
                 void
         """
-        with file_lock:
-            with open(self.file_name, 'ab+') as f:
-                if not hasattr(notification, 'suggestions'):
-                    f.write(f'### Path: {notification.file}\n'
-                            f'* **Type:** {notification.type}\n'
-                            f'* **Line:** {notification.line}\n'
-                            f'* **Message:** {notification.message}\n'
-                            f'* **Context:**\n'
-                            f'```\n'
-                            f'{notification.code_snippet}\n'
-                            f'```\n\n'.encode())
-                elif hasattr(notification, 'suggestions'):
-                    f.write(f'### Path: {notification.file}\n'
-                            f'* **Type:** {notification.type}\n'
-                            f'* **Line:** {notification.line}\n'
-                            f'* **Message:** {notification.message}\n'
-                            f'* **Context:**\n'
-                            f'```\n'
-                            f'{notification.code_snippet}\n'
-                            f'{notification.suggestions}\n'
-                            f'```\n\n'.encode())
-                else:
-                    print('Error: Incorrect notification type.')
+        if not hasattr(notification, 'suggestions'):
+            self.pending_parts.put(f'### Path: {notification.file}\n'
+                                   f'* **Type:** {notification.type}\n'
+                                   f'* **Line:** {notification.line}\n'
+                                   f'* **Message:** {notification.message}\n'
+                                   f'* **Context:**\n'
+                                   f'```\n'
+                                   f'{notification.code_snippet}\n'
+                                   f'```\n\n')
+        elif hasattr(notification, 'suggestions'):
+            self.pending_parts.put(f'### Path: {notification.file}\n'
+                                   f'* **Type:** {notification.type}\n'
+                                   f'* **Line:** {notification.line}\n'
+                                   f'* **Message:** {notification.message}\n'
+                                   f'* **Context:**\n'
+                                   f'```\n'
+                                   f'{notification.code_snippet}\n'
+                                   f'{notification.suggestions}\n'
+                                   f'```\n\n')
+        else:
+            print('Error: Incorrect notification type.')
 
     def add_details_summary_end(self):
-        with file_lock:
-            with open(self.file_name, 'ab+') as f:
-                f.write(f'</details>'.encode())
+        self.pending_parts.put(f'</details>')
+        self.flush()
+
+    def flush(self):
+        """
+            Appends all pending report parts to the md-file with a single write.
+        """
+        parts = []
+        while True:
+            try:
+                parts.append(self.pending_parts.get_nowait())
+            except queue.Empty:
+                break
+        if parts:
+            with stage('write report', os.path.basename(self.file_name)), open(self.file_name, 'ab') as f:
+                f.write(''.join(parts).encode())
@@ -1,7 +1,18 @@
+import argparse
+import ast
+import logging as log
+import multiprocessing
 import os
 import re
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-from bs4 import BeautifulSoup
+from result_cache import DEFAULT_MAX_CACHE_SIZE_MB
+from stage_timer import stage
+
+ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+EMPTY_LTEX_REPORT_PLACEHOLDER = "Everything is fine. LTeX did not find any improvements."
 
 
 def get_repo_and_action_path_env_variables():
@@ -35,12 +46,49 @@ def get_repo_and_action_path_env_variables():
     return base_dir, action_base_dir
 
 
+def split_lines(stream):
+    """
+        Yields the lines of a text stream (e.g. Popen.stdout, or a list of chunks) without their line break,
+        exactly like ''.join(stream).split('\\n') (incl. the part after the last line break, possibly ''),
+        without holding the whole text in memory.
+    """
+    rest = ''
+    for chunk in stream:
+        lines = f'{rest}{chunk}'.split('\n')
+        rest = lines.pop()
+        yield from lines
+    yield rest
+
+
+def configure_worker_logging(level):
+    """
+        Logs in a worker process like in the main process (see main of the scripts).
+    """
+    log.basicConfig(format='%(levelname)s: %(message)s', level=level)
+
+
+def worker_process_pool(max_workers):
+    """
+        Pool of worker processes, which are spawned instead of forked: the pipelines may run in threads
+        (see latex_validation_action), forking a multithreaded process could copy locks held by another
+        thread (e.g. of logging or of the LTeX limiter) into a worker, which would then deadlock on them.
+        Spawned workers import the scripts again (sys.path and the env-variables of the parent are used).
+
+        Args:
+            max_workers (int): number of worker processes.
+
+        Returns:
+            ProcessPoolExecutor: pool, whose workers log with the level of the main process.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=configure_worker_logging, initargs=(log.getLogger().level,))
+
+
 def remove_ansi_escape_sequences(text):
     """
         Remove ANSI escape sequences from a string text.
     """
-    ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
-    return ansi_escape.sub('', text)
+    return ANSI_ESCAPE_PATTERN.sub('', text)
 
 
 def extract_plain_text_from_html(file_path, for_ltex_purposes=False):
@@ -54,6 +102,8 @@ def extract_plain_text_from_html(file_path, for_ltex_purposes=False):
         Returns:
             string: text of html-file without color coding/ANSI escape sequences
     """
+    from bs4 import BeautifulSoup
+
     with open(file_path, 'r', encoding='latin1') as file:
         html_content = file.read()
         # Parse HTML and extract text
@@ -68,7 +118,7 @@ def extract_plain_text_from_html(file_path, for_ltex_purposes=False):
             # Check if the body tag exists and contains non-whitespace content
             if body_tag and not body_tag.get_text(strip=True):
                 # The body of the HTML file is empty. Adding placeholder text.
-                body_tag.append("Everything is fine. LTeX did not find any improvements.")
+                body_tag.append(EMPTY_LTEX_REPORT_PLACEHOLDER)
                 with open(file_path, 'w', encoding='utf-8') as write_file:
                     write_file.write(str(soup))
             else:
@@ -78,6 +128,32 @@ def extract_plain_text_from_html(file_path, for_ltex_purposes=False):
     return remove_ansi_escape_sequences(text)
 
 
+class NotificationCounter:
+    def __init__(self, pattern):
+        """
+            Counts notifications (warnings, messages and errors) line by line in chktex or ltex console output.
+            A line matching the pattern starts a notification, the line directly after it
+            (code snippet) is never counted.
+
+            Args:
+                pattern (re.Pattern or str): regex pattern to match the first line of a notification.
+        """
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.count = 0
+        self.has_text = False
+        self._skip_next_line = False
+
+    def feed(self, line):
+        line = remove_ansi_escape_sequences(line).rstrip('\r\n')
+        if line.strip():
+            self.has_text = True
+        if self._skip_next_line:
+            self._skip_next_line = False
+        elif self.pattern.match(line):
+            self.count = self.count + 1
+            self._skip_next_line = True
+
+
 def count_total_warnings(base_dir, report_folder, html_report_file_name, pattern, for_ltex_purposes=False):
     """
         Count number of warnings, messages and errors given a chktex or ltex console report (html file)
@@ -93,20 +169,133 @@ def count_total_warnings(base_dir, report_folder, html_report_file_name, pattern
         Returns:
             int: Number of notifications in html-report according to given pattern (warnings/errors/messages)
     """
-    output = extract_plain_text_from_html(f'{base_dir}/{report_folder}/{html_report_file_name}', for_ltex_purposes)
-    lines = output.split("\n")
-    i = 0
-    nr_of_total_warnings = 0
-    while i < len(lines):
-        step = 2
-        match = re.match(pattern, lines[i])
-        if match:
-            nr_of_total_warnings = nr_of_total_warnings + 1
-
-            while (i + step) < len(lines) and not re.match(pattern, lines[i + step]):
-                step = step + 1
-        else:
-            step = 1
-        i = i + step
-
-    return nr_of_total_warnings
+    with stage('count warnings', html_report_file_name):
+        output = extract_plain_text_from_html(f'{base_dir}/{report_folder}/{html_report_file_name}', for_ltex_purposes)
+        counter = NotificationCounter(pattern)
+        for line in output.split("\n"):
+            counter.feed(line)
+        return counter.count
+
+
+def capture_console_report(command, html_report_abs_path, pattern, for_ltex_purposes=False, output_lines=None,
+                           env=None):
+    """
+        Runs a chktex or ltex command (likely wrapped by `script` to keep the color coding), converts its console
+        output with ansi2html into a html report and counts the notifications while the output is streamed,
+        so the html report never has to be read and parsed again.
+
+        Args:
+            command (str): shell command whose console output is captured.
+            html_report_abs_path (str): abs. path of html report file to be written.
+            pattern (re.Pattern or str): regex pattern to match the first line of a notification.
+            for_ltex_purposes (bool): indicates it this method was called in the context of LTeX output processing
+                                      (an empty report gets a placeholder text)
+            output_lines (List(str)): if given, the console output is collected in addition (ANSI escape
+                                      sequences removed, universal newlines), so that the same tool run can be
+                                      parsed for the md-reports.
+            env (dict): environment of the command, None to inherit it.
+
+        Returns:
+            int: Number of notifications in the console output according to given pattern
+    """
+    with stage('console report (ansi2html)', os.path.basename(html_report_abs_path)):
+        counter = NotificationCounter(pattern)
+        with open(html_report_abs_path, 'wb') as html_file:
+            converter = subprocess.Popen(['ansi2html'], stdin=subprocess.PIPE, stdout=html_file)
+            tool = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, env=env)
+            for line in tool.stdout:
+                converter.stdin.write(line)
+                text = line.decode('utf-8', errors='replace')
+                counter.feed(text)
+                if output_lines is not None:
+                    output_lines.append(remove_ansi_escape_sequences(text.replace('\r\n', '\n').replace('\r', '\n')))
+            tool.wait()
+            converter.stdin.close()
+            converter.wait()
+        if converter.returncode != 0:
+            raise subprocess.CalledProcessError(converter.returncode, 'ansi2html')
+
+        # LTeX did not produce any output (and no error was thrown), the (small) report gets a placeholder text.
+        if for_ltex_purposes and not counter.has_text:
+            extract_plain_text_from_html(html_report_abs_path, for_ltex_purposes)
+    return counter.count
+
+
+def str_to_bool(value):
+    """
+    Performs type check if given value (given as str) is a bool
+    """
+    if value.lower() in {'false', 'f', '0', 'no', 'n'}:
+        return False
+    elif value.lower() in {'true', 't', '1', 'yes', 'y'}:
+        return True
+    elif value.lower() in {'none'}:
+        print(f'Oh no, bool-arguments is none!')
+        return True
+    raise argparse.ArgumentTypeError(f'Invalid boolean value: {value}')
+
+
+def add_common_arguments(parser):
+    """
+        Adds the arguments shared by lint_texs.py, spell-check_texs.py and the unified entry point
+        (python -m latex_validation_action).
+    """
+    parser.add_argument('-cf', '--changedfiles', help="Paths to changed tex files to be checked.")
+    parser.add_argument('--all', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: check all tex files of the active semester instead of --changedfiles "
+                             "(e.g. after a change of chktexrc or ltex_config.txt), with worker processes.")
+    parser.add_argument('-c', '--config', required=True, help="Config for CI/CD pipeline, likely .lecture-build-ci.json")
+    parser.add_argument('-wd', '--workdir', required=True, help="Working directory, likely repo root.")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="Number of chktex/ltex-cli-plus processes running concurrently, default 1 "
+                             "(number of cores for --all).")
+    parser.add_argument('--cache_dir', default=os.getenv('RESULT_CACHE_DIR'),
+                        help="Directory of the result cache (rel. to repo root), disabled if not set.")
+    parser.add_argument('--cache_max_mb', type=int, default=DEFAULT_MAX_CACHE_SIZE_MB,
+                        help="Maximum size of the result cache per tool.")
+    parser.add_argument('--baseline',
+                        help="Baseline file (JSON) of accepted notifications, e.g. of legacy semesters: only "
+                             "notifications not in it are reported, posted and counted (md-reports).")
+    parser.add_argument('--write_baseline', type=str_to_bool, nargs='?', const=True, default=False,
+                        help="Feature: regenerate the --baseline file from all current notifications (e.g. with "
+                             "--all) instead of filtering them.")
+
+
+def parse_common_arguments(parser, args=None):
+    """
+        Parses the arguments and checks the ones added by add_common_arguments.
+
+        Returns:
+            argparse.Namespace: parsed arguments, workdir as Path and jobs resolved.
+    """
+    args = parser.parse_args(args)
+    if not args.all and args.changedfiles is None:
+        parser.error('the following arguments are required: -cf/--changedfiles (or --all)')
+    if args.write_baseline and not args.baseline:
+        parser.error('--write_baseline requires --baseline')
+    args.workdir = Path(args.workdir)
+    args.jobs = args.jobs or ((os.cpu_count() or 1) if args.all else 1)
+    return args
+
+
+def select_tex_files(args, config_file):
+    """
+        Args:
+            args (argparse.Namespace): arguments parsed by parse_common_arguments.
+            config_file (Config): configuration of the lecture repo.
+
+        Returns:
+            List(str): rel. paths to all tex files of the active semester (--all)
+                       or to the changed tex files of the active semester.
+    """
+    if args.all:
+        filtered_paths = config_file.semester_tex_files()
+        log.info(f'All tex-files from {config_file.active_semester}: {filtered_paths}')
+        return filtered_paths
+
+    log.info(f'Added/Modified tex-file: {args.changedfiles}')
+
+    # Filter paths that contain the specific directory defined in config in their path
+    filtered_paths = [p for p in ast.literal_eval(args.changedfiles) if config_file.active_semester in p]
+    log.info(f'Changed tex-files from {config_file.active_semester}: {filtered_paths}')
+    return filtered_paths
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging as log
+import os
+import re
+
+# Matches \input{...} and \include{...}, e.g. \input{../../prelude}
+INPUT_PATTERN = re.compile(r'\\(?:input|include)\s*\{([^}]+)\}')
+COMMENT_PATTERN = re.compile(r'(?<!\\)%.*$')
+DEPENDENCY_INDEX_FORMAT_VERSION = '1'
+
+
+def resolve_tex_input(name, including_file_abs_path, base_dir):
+    """
+        Resolves the argument of \\input/\\include to an existing tex file.
+        Candidates are relative to the including file's directory and to the repo base directory
+        (chktex resolves relative to its working directory).
+
+        Returns:
+            str: abs. path of included tex file, None if it does not exist.
+    """
+    name = name.strip()
+    candidates = [name] if name.endswith('.tex') else [f'{name}.tex', name]
+    for directory in (os.path.dirname(including_file_abs_path), base_dir):
+        for candidate in candidates:
+            path = os.path.normpath(os.path.join(directory, candidate))
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def find_tex_inputs(tex_file_abs_path, base_dir):
+    """
+        Returns:
+            List(str): abs. paths of tex files directly included by the given tex file (comments are ignored).
+    """
+    with open(tex_file_abs_path, 'r', encoding='utf-8', errors='replace') as file:
+        return parse_tex_inputs(file.read(), tex_file_abs_path, base_dir)
+
+
+def parse_tex_inputs(content, tex_file_abs_path, base_dir):
+    """
+        Returns:
+            List(str): abs. paths of tex files included by the given content of a tex file.
+    """
+    return resolve_tex_inputs(parse_tex_input_names(content), tex_file_abs_path, base_dir)
+
+
+def parse_tex_input_names(content):
+    """
+        Returns:
+            List(str): arguments of \\input/\\include in the given content of a tex file (comments are ignored).
+    """
+    names = []
+    for line in content.split('\n'):
+        names.extend(INPUT_PATTERN.findall(COMMENT_PATTERN.sub('', line)))
+    return names
+
+
+def resolve_tex_inputs(names, tex_file_abs_path, base_dir):
+    inputs = []
+    for name in names:
+        path = resolve_tex_input(name, tex_file_abs_path, base_dir)
+        if path:
+            inputs.append(path)
+    return inputs
+
+
+def input_closure(tex_file_abs_path, base_dir):
+    """
+        Returns:
+            List(str): sorted abs. paths of the given tex file and all tex files it (transitively) includes.
+    """
+    return sorted(TexDependencyGraph(base_dir).closure(tex_file_abs_path))
+
+
+class TexDependencyGraph:
+    def __init__(self, base_dir):
+        """
+            Graph of \\input/\\include dependencies between tex files, files are scanned lazily (once).
+
+            Args:
+                base_dir (str): Path of repo base directory.
+        """
+        self.base_dir = base_dir
+        self.includes = {}
+        self.input_names = {}
+        self.digests = {}
+        self._closures = {}
+        self._persisted = {}
+
+    def abs_path(self, tex_file_path):
+        return os.path.normpath(os.path.join(self.base_dir, tex_file_path))
+
+    def direct_includes(self, tex_file_abs_path):
+        """
+            Returns:
+                List(str): abs. paths of tex files directly included by the given tex file.
+        """
+        if tex_file_abs_path not in self.includes:
+            if os.path.isfile(tex_file_abs_path):
+                with open(tex_file_abs_path, 'rb') as file:
+                    content = file.read()
+                digest = hashlib.sha256(content).hexdigest()
+                persisted = self._persisted.get(os.path.relpath(tex_file_abs_path, self.base_dir))
+                if persisted and persisted['digest'] == digest:
+                    names = persisted['inputs']
+                else:
+                    names = parse_tex_input_names(content.decode('utf-8', errors='replace'))
+                self.digests[tex_file_abs_path] = digest
+                self.input_names[tex_file_abs_path] = names
+                # Resolved on every run, as the result depends on which tex files exist
+                self.includes[tex_file_abs_path] = resolve_tex_inputs(names, tex_file_abs_path, self.base_dir)
+            else:
+                self.includes[tex_file_abs_path] = []
+        return self.includes[tex_file_abs_path]
+
+    def load(self, index_file_path):
+        """
+            Loads the \\input/\\include arguments scanned by an earlier run,
+            they are reused for unchanged tex files (same content).
+        """
+        try:
+            with open(index_file_path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return
+        if index.get('version') == DEPENDENCY_INDEX_FORMAT_VERSION:
+            self._persisted = index['files']
+
+    def save(self, index_file_path):
+        """
+            Persists the scanned \\input/\\include arguments with the content digest of the tex file
+            (paths rel. to the repo base directory).
+        """
+        files = {path: entry for path, entry in self._persisted.items() if os.path.isfile(self.abs_path(path))}
+        for path, names in self.input_names.items():
+            files[os.path.relpath(path, self.base_dir)] = {'digest': self.digests[path], 'inputs': names}
+        os.makedirs(os.path.dirname(index_file_path) or '.', exist_ok=True)
+        tmp_path = f'{index_file_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': DEPENDENCY_INDEX_FORMAT_VERSION, 'files': files}, file)
+        os.replace(tmp_path, index_file_path)
+
+    def closure(self, tex_file_abs_path):
+        """
+            Returns:
+                frozenset: abs. paths of the given tex file and all tex files it (transitively) includes.
+        """
+        tex_file_abs_path = os.path.normpath(tex_file_abs_path)
+        if tex_file_abs_path not in self._closures:
+            closure = set()
+            pending = [tex_file_abs_path]
+            while pending:
+                path = pending.pop()
+                if path in closure or not os.path.isfile(path):
+                    continue
+                closure.add(path)
+                pending.extend(self.direct_includes(path))
+            self._closures[tex_file_abs_path] = frozenset(closure)
+        return self._closures[tex_file_abs_path]
+
+    def roots(self, tex_file_paths):
+        """
+            Selects the smallest set of tex files (root documents) whose checks cover all given tex files:
+            a tex file included by another given tex file is checked as part of it.
+            Of tex files including each other (cycle), the first one is kept.
+
+            Args:
+                tex_file_paths (List(str)): rel. paths to tex files (e.g. changed files).
+
+            Returns:
+                List(str): rel. paths of root documents, in input order.
+        """
+        paths = list(dict.fromkeys(tex_file_paths))
+        abs_paths = {path: self.abs_path(path) for path in paths}
+        roots = []
+        for i, path in enumerate(paths):
+            covered = False
+            for j, other in enumerate(paths):
+                if other == path or abs_paths[path] not in self.closure(abs_paths[other]):
+                    continue
+                # Mutually including files: the earlier one covers the later one
+                if abs_paths[other] not in self.closure(abs_paths[path]) or j < i:
+                    covered = True
+                    break
+            if not covered:
+                roots.append(path)
+        return roots
+
+    def schedule(self, tex_file_paths):
+        """
+            Orders tex files for concurrent checking: largest closure (longest expected check) first,
+            so that small documents fill the gaps at the end.
+
+            Returns:
+                List(str): rel. paths of tex files, in order to be started.
+        """
+        return sorted(tex_file_paths, key=lambda path: len(self.closure(self.abs_path(path))), reverse=True)
+
+
+class ReverseDependencyIndex:
+    def __init__(self, dependency_graph: TexDependencyGraph, entry_documents):
+        """
+            Maps every tex file to the entry documents (exercise and lesson entry points) that
+            (transitively) include it, e.g. a shared prelude to all entry documents.
+
+            Args:
+                dependency_graph (TexDependencyGraph): \\input/\\include dependencies.
+                entry_documents (List(str)): rel. paths of entry documents (see Config.entry_documents).
+        """
+        self.graph = dependency_graph
+        self.entry_documents = [path for path in entry_documents if os.path.isfile(self.graph.abs_path(path))]
+        self.includers = {}
+        for entry_document in self.entry_documents:
+            for path in self.graph.closure(self.graph.abs_path(entry_document)):
+                self.includers.setdefault(path, []).append(entry_document)
+
+    def affected(self, tex_file_paths):
+        """
+            Determines the tex files to be checked for a set of changed tex files: changed includes are checked
+            via the entry documents including them, changed tex files not included by any entry document
+            are checked on their own.
+
+            Args:
+                tex_file_paths (List(str)): rel. paths to changed tex files.
+
+            Returns:
+                List(str): rel. paths of tex files to be checked, in order of the changed tex files.
+        """
+        affected = {}
+        for path in tex_file_paths:
+            for entry_document in self.includers.get(self.graph.abs_path(path), [path]):
+                affected[entry_document] = True
+        log.info(f'Tex files affected by {tex_file_paths}: {list(affected)}')
+        return list(affected)
@@ -0,0 +1,15 @@
+# pylint: disable=missing-module-docstring
+
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / 'scripts'
+
+
+def load_script(name: str) -> ModuleType:
+    """Imports a module of scripts/ (they import each other by their bare names)."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
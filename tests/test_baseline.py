@@ -0,0 +1,64 @@
+# pylint: disable=missing-module-docstring
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from tests.script_loader import load_script
+
+baseline = load_script('baseline')
+
+
+def lint_notification(line: int, code_line: str) -> SimpleNamespace:
+    """A LintNotification as parsed from chktex (file with leading '/')."""
+    return SimpleNamespace(file='/24SS/UE01/Aufgabe/Angabe.tex', type='Warning 24', line=line,
+                           message='Delete this space to maintain correct pagereferences.',
+                           code_snippet=f'{code_line}\n    ^')
+
+
+class TestBaseline(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_accepted_notifications_are_filtered_regardless_of_line_and_spacing(self) -> None:
+        accepted_notification = lint_notification(3, 'Text \\label{a}')
+        accepted = baseline.Baseline([baseline.lint_fingerprint(accepted_notification)])
+        moved = lint_notification(10, '    Text   \\label{a}')
+        new = lint_notification(11, 'Text \\label{b}')
+
+        self.assertEqual(accepted.new_notifications([moved, new], baseline.lint_fingerprint), [new])
+        self.assertEqual(accepted.nr_of_suppressed, 1)
+
+    def test_sections_are_regenerated_separately(self) -> None:
+        spelling = SimpleNamespace(file='24SS/UE01/Aufgabe/Angabe.tex', type='warning',
+                                   message="Möglicher Tippfehler gefunden. [MORFOLOGIK_RULE_DE_AT]",
+                                   code_snippet='Das Ergebniss wird ausgegeben.')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'baseline.json')
+            for tool, notification, fingerprint_of in (
+                    ('chktex', lint_notification(3, 'x'), baseline.lint_fingerprint),
+                    ('ltex', spelling, baseline.spelling_fingerprint)):
+                update = baseline.Baseline.load(path, tool, update=True)
+                self.assertEqual(update.new_notifications([notification], fingerprint_of),
+                                 [notification])
+                update.save(path, tool)
+
+            with open(path, 'r', encoding='utf-8') as file:
+                self.assertEqual(sorted(json.load(file)), ['chktex', 'ltex', 'version'])
+            loaded = baseline.Baseline.load(path, 'ltex')
+            self.assertEqual(loaded.new_notifications([spelling], baseline.spelling_fingerprint),
+                             [])
+
+    def test_missing_baseline_file_reports_everything(self) -> None:
+        with self.assertLogs(level='WARNING'):
+            missing = baseline.Baseline.load(os.path.join(tempfile.gettempdir(), 'missing.json'),
+                                             'chktex')
+
+        notification = lint_notification(1, 'x')
+        self.assertEqual(missing.new_notifications([notification], baseline.lint_fingerprint),
+                         [notification])
+
+
+if __name__ == "__main__":
+    unittest.main()
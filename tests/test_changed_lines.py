@@ -0,0 +1,89 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+from tests.script_loader import load_script
+
+changed_lines = load_script('changed_lines')
+
+
+class TestChangedLineIndex(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_context_ranges_are_merged(self) -> None:
+        index = changed_lines.ChangedLineIndex([20, 10, 12, 10])
+
+        self.assertEqual(len(index), 2)
+        self.assertEqual([line for line in range(0, 30) if line in index],
+                         list(range(8, 15)) + list(range(18, 23)))
+
+    def test_empty_index(self) -> None:
+        self.assertNotIn(1, changed_lines.ChangedLineIndex([]))
+
+
+class TestGitChangedLines(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.repo = self.temp_dir.name
+        self.git('init', '-q', '-b', 'main')
+        self.write('UE01/Angabe.tex', ''.join(f'line {nr}\n' for nr in range(1, 11)))
+        self.write('UE01/unchanged.tex', 'unchanged\n')
+        self.commit('base')
+        self.git('checkout', '-q', '-b', 'feature')
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def git(self, *args: str) -> None:
+        subprocess.run(['git', '-C', self.repo, '-c', 'user.name=test',
+                        '-c', 'user.email=test@example.com', *args],
+                       check=True, capture_output=True)
+
+    def write(self, path: str, content: str) -> None:
+        os.makedirs(os.path.dirname(os.path.join(self.repo, path)), exist_ok=True)
+        with open(os.path.join(self.repo, path), 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def commit(self, message: str) -> None:
+        self.git('add', '-A')
+        self.git('commit', '-q', '-m', message)
+
+    def test_added_lines_of_added_and_modified_files(self) -> None:
+        lines = [f'line {nr}\n' for nr in range(1, 11)]
+        lines[1] = 'changed 2\n'
+        del lines[4]
+        lines[7:7] = ['new a\n', 'new b\n']
+        self.write('UE01/Angabe.tex', ''.join(lines))
+        self.write('UE02/new file.tex', 'first\nsecond\n')
+        self.write('UE01/notes.txt', 'not of interest\n')
+        self.commit('change')
+        self.git('checkout', '-q', 'main')
+        self.write('UE03/later.tex', 'only on main\n')
+        self.commit('main moves on')
+        self.git('checkout', '-q', 'feature')
+
+        changed = changed_lines.git_changed_lines(
+            self.repo, ['UE01/Angabe.tex', 'UE01/unchanged.tex', 'UE02/new file.tex'], 'main')
+
+        self.assertEqual(changed, {'UE01/Angabe.tex': {2, 8, 9}, 'UE02/new file.tex': {1, 2}})
+
+    def test_deleted_lines_are_no_changed_lines(self) -> None:
+        self.write('UE01/Angabe.tex', ''.join(f'line {nr}\n' for nr in range(1, 10)))
+        self.commit('delete last line')
+
+        self.assertEqual(changed_lines.git_changed_lines(self.repo, ['UE01/Angabe.tex'], 'main'),
+                         {'UE01/Angabe.tex': set()})
+
+    def test_no_paths_no_diff(self) -> None:
+        self.assertEqual(changed_lines.git_changed_lines(self.repo, [], 'no-such-revision'), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+# pylint: disable=missing-module-docstring
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from tests.script_loader import load_script
+
+github_api = load_script('github_api')
+
+PULL_PATH = '/repos/owner/repo/pulls/7'
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    # pylint: disable=missing-class-docstring
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), FakeGitHubHandler)
+        self.lock = threading.Lock()
+        self.requests: list[tuple[str, str, Any]] = []
+        self.failures: dict[tuple[str, str], list[tuple[int, dict[str, str]]]]
+        self.failures = {}
+        self.comments = [{'id': i, 'path': 'a.tex' if i % 2 else 'b.tex'} for i in range(1, 6)]
+
+    def fail(self, method: str, path: str, status: int,
+             headers: dict[str, str] | None = None) -> None:
+        # pylint: disable=missing-function-docstring
+        self.failures.setdefault((method, path), []).append((status, headers or {}))
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    # pylint: disable=missing-class-docstring,missing-function-docstring,invalid-name
+
+    server: FakeGitHub
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self) -> None:
+        self._handle('GET')
+
+    def do_POST(self) -> None:
+        self._handle('POST')
+
+    def do_DELETE(self) -> None:
+        self._handle('DELETE')
+
+    def _handle(self, method: str) -> None:
+        path, _, query = self.path.partition('?')
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.server.lock:
+            self.server.requests.append((method, self.path, body))
+            failures = self.server.failures.get((method, path))
+            failure = failures.pop(0) if failures else None
+        if failure:
+            self._send(failure[0], {'message': 'failure'}, failure[1])
+        elif method == 'GET' and path == '/user':
+            self._send(200, {'login': 'latex-validation-bot'})
+        elif method == 'GET' and path == PULL_PATH:
+            self._send(200, {'head': {'sha': 'abc123'}})
+        elif method == 'GET' and path == f'{PULL_PATH}/comments':
+            page = 2 if 'page=2' in query else 1
+            headers = {}
+            if page == 1:
+                next_url = f'http://127.0.0.1:{self.server.server_port}{path}?page=2'
+                headers['Link'] = f'<{next_url}>; rel="next"'
+            comments = self.server.comments
+            self._send(200, comments[:3] if page == 1 else comments[3:], headers)
+        elif method == 'POST' and path in (f'{PULL_PATH}/reviews', f'{PULL_PATH}/comments'):
+            self._send(200, {'id': 1})
+        elif method == 'DELETE' and path.startswith('/repos/owner/repo/pulls/comments/'):
+            self.send_response(204)
+            self.end_headers()
+        else:
+            self._send(404, {'message': 'Not Found'})
+
+    def _send(self, status: int, content: Any, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(content).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestPullRequestClient(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.server = FakeGitHub()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        api_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.client = github_api.PullRequestClient('token', 'owner/repo', 7, api_url=api_url,
+                                                   backoff_seconds=0)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def requests_to(self, method: str, path: str) -> list[Any]:
+        return [body for m, p, body in self.server.requests
+                if m == method and p.partition('?')[0] == path]
+
+    def test_create_review_posts_all_comments_at_once(self) -> None:
+        comments = [{'path': 'a.tex', 'line': line, 'body': f'comment {line}'}
+                    for line in range(1, 4)]
+
+        self.assertEqual(self.client.create_review(comments), 3)
+
+        reviews = self.requests_to('POST', f'{PULL_PATH}/reviews')
+        self.assertEqual(len(reviews), 1)
+        self.assertEqual(reviews[0]['commit_id'], 'abc123')
+        self.assertEqual(reviews[0]['event'], 'COMMENT')
+        self.assertEqual([c['line'] for c in reviews[0]['comments']], [1, 2, 3])
+
+    def test_rejected_review_falls_back_to_single_comments(self) -> None:
+        self.server.fail('POST', f'{PULL_PATH}/reviews', 422)
+        self.server.fail('POST', f'{PULL_PATH}/comments', 422)
+        comments = [{'path': 'a.tex', 'line': line, 'body': 'comment'} for line in range(1, 3)]
+
+        self.assertEqual(self.client.create_review(comments), 1)
+        self.assertEqual(len(self.requests_to('POST', f'{PULL_PATH}/comments')), 2)
+
+    def test_rate_limits_and_server_errors_are_retried(self) -> None:
+        self.server.fail('GET', PULL_PATH, 429, {'Retry-After': '0'})
+        self.server.fail('GET', PULL_PATH, 403, {'Retry-After': '0'})
+        self.server.fail('GET', PULL_PATH, 502)
+
+        self.assertEqual(self.client.head_sha(), 'abc123')
+        self.assertEqual(len(self.requests_to('GET', PULL_PATH)), 4)
+
+    def test_server_error_of_review_is_not_retried(self) -> None:
+        self.server.fail('POST', f'{PULL_PATH}/reviews', 502)
+        comments = [{'path': 'a.tex', 'line': 1, 'body': 'comment'}]
+
+        with self.assertRaises(github_api.GitHubApiError) as context:
+            self.client.create_review(comments)
+        self.assertEqual(context.exception.status_code, 502)
+        self.assertEqual(len(self.requests_to('POST', f'{PULL_PATH}/reviews')), 1)
+
+    def test_rate_limited_review_is_retried(self) -> None:
+        self.server.fail('POST', f'{PULL_PATH}/reviews', 429, {'Retry-After': '0'})
+        comments = [{'path': 'a.tex', 'line': 1, 'body': 'comment'}]
+
+        self.assertEqual(self.client.create_review(comments), 1)
+        self.assertEqual(len(self.requests_to('POST', f'{PULL_PATH}/reviews')), 2)
+
+    def test_forbidden_without_rate_limit_is_not_retried(self) -> None:
+        self.server.fail('GET', PULL_PATH, 403)
+
+        with self.assertRaises(github_api.GitHubApiError) as context:
+            self.client.head_sha()
+        self.assertEqual(context.exception.status_code, 403)
+        self.assertEqual(len(self.requests_to('GET', PULL_PATH)), 1)
+
+    def test_login_of_the_token_is_none_if_it_may_not_be_read(self) -> None:
+        self.assertEqual(self.client.authenticated_login(), 'latex-validation-bot')
+
+        # GITHUB_TOKEN of a workflow
+        self.server.fail('GET', '/user', 403)
+        with self.assertLogs(level='INFO'):
+            self.assertIsNone(self.client.authenticated_login())
+
+    def test_review_comments_are_paginated_and_deleted(self) -> None:
+        comment_ids = [c['id'] for c in self.client.get_review_comments() if c['path'] == 'a.tex']
+        self.assertEqual(comment_ids, [1, 3, 5])
+
+        self.server.fail('DELETE', '/repos/owner/repo/pulls/comments/3', 404)
+        self.assertEqual(self.client.delete_review_comments(comment_ids), 2)
+        deleted = sorted(p for m, p, _ in self.server.requests if m == 'DELETE')
+        self.assertEqual(deleted, [f'/repos/owner/repo/pulls/comments/{i}' for i in comment_ids])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import re
+import shutil
+import stat
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+from tests.script_loader import load_script
+from tests.workspace_test_case import WorkspaceTestCase, write
+
+baseline = load_script('baseline')
+lint_texs = load_script('lint_texs')
+summary_md_file = load_script('summary_md_file')
+tex_dependencies = load_script('tex_dependencies')
+
+EXERCISE_DIR = '24SS/UE01/Aufgabe'
+
+# Console output of chktex 1.7.9 for /ws/24SS/UE01/Aufgabe/Angabe.tex (repo in /ws), with a user
+# regex warning whose message spans two lines (!n in chktexrc) and a warning without position.
+# In a TTY (-v2, as captured for the html report, carriage returns removed) ...
+CHKTEX_TTY_OUTPUT = (
+    'chktex: WARNING -- Could not find global resource file.\n'
+    'ChkTeX v1.7.9 - Copyright 1995-96 Jens T. Berger Thielemann.\n'
+    'Compiled with POSIX extended regex support.\n'
+    '/ws/24SS/UE01/Aufgabe/Angabe.tex, Warning 37, 3, You should avoid spaces after parenthesis.\n'
+    'See ( a)  \n'
+    '     ^\n'
+    '/ws/24SS/UE01/Aufgabe/Angabe.tex, Warning 44, 4, User Regex: Always use \\nmid\n'
+    'see the guidelines.\n'
+    'So $a \\not| b$  \n'
+    '      ^^^^^\n'
+    '/ws/24SS/UE01/Aufgabe/Angabe.tex, Warning 37, 5, You should avoid spaces after parenthesis.\n'
+    '{End ( b)  \n'
+    '      ^\n'
+    "/ws/24SS/UE01/Aufgabe/Angabe.tex, Warning 15, 5, No match found for `{'.\n"
+    '{End ( b)  \n'
+    '^\n'
+    '/ws/24SS/UE01/Aufgabe/Angabe.tex, Warning 17, 6, '
+    "Number of `{' doesn't match the number of `}'!\n"
+    '\n'
+    '\n'
+    'No errors printed; 5 warnings printed; 2 user suppressed warnings; '
+    'No line suppressed warnings.\n'
+    'See the manual for how to suppress some or all of these warnings/errors.\n'
+    'The manual is available at https://www.nongnu.org/chktex/ChkTeX.pdf\n')
+# ... and piped (records of CHKTEX_RECORD_OUTPUT_FORMAT, statistics on stderr)
+CHKTEX_RECORDS = '\n'.join('\x1f'.join(fields) for fields in (
+    ('/ws/24SS/UE01/Aufgabe/Angabe.tex', 'Warning', '37', '3', '6',
+     'You should avoid spaces after parenthesis.', 'See ( a)  ', '     ^'),
+    ('/ws/24SS/UE01/Aufgabe/Angabe.tex', 'Warning', '44', '4', '7',
+     'User Regex: Always use \\nmid\nsee the guidelines.', 'So $a \\not| b$  ', '      ^^^^^'),
+    ('/ws/24SS/UE01/Aufgabe/Angabe.tex', 'Warning', '37', '5', '7',
+     'You should avoid spaces after parenthesis.', '{End ( b)  ', '      ^'),
+    ('/ws/24SS/UE01/Aufgabe/Angabe.tex', 'Warning', '15', '5', '1',
+     "No match found for `{'.", '{End ( b)  ', '^'),
+    ('/ws/24SS/UE01/Aufgabe/Angabe.tex', 'Warning', '17', '6', '1',
+     "Number of `{' doesn't match the number of `}'!", '', ''))) + '\n'
+
+
+def parse_chktex_output_by_regex(output: str, base_dir: str) -> list[SimpleNamespace]:
+    """The parser of the console output of chktex before CHKTEX_RECORD_OUTPUT_FORMAT was used."""
+    notifications = []
+    lines = output.split("\n")
+
+    i = 0
+    while i < len(lines):
+        first_line = lines[i]
+        second_line = lines[i + 1] if i + 1 < len(lines) else ""
+        third_line = lines[i + 2] if i + 2 < len(lines) else ""
+        step = 3
+
+        match = re.match(lint_texs.CHKTEX_NOTIFICATION_PATTERN, first_line)
+        if match:
+            message = match.group(5)
+            # A message may span across multiple lines
+            while (i + step) < len(lines) and \
+                    not re.match(lint_texs.CHKTEX_NOTIFICATION_PATTERN, lines[i + step]):
+                message = f'{message}\n{lines[i + step]}'
+                step = step + 1
+
+            notifications.append(SimpleNamespace(
+                file=os.path.abspath(match.group(1).removeprefix(base_dir)),
+                type=f'{match.group(2)} {match.group(3)}', line=int(match.group(4)),
+                message=message, code_snippet=f'{second_line}\n{third_line}'))
+        else:
+            step = 1
+        i = i + step
+
+    return notifications
+
+
+class ChktexTestCase(WorkspaceTestCase):
+    """Workspace with an exercise and an action directory with chktex (as set up by action.yml)."""
+    # pylint: disable=missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        chktex_path = self.copy_to_action_dir(lint_texs.CHKTEX_EXEC_REL_PATH)
+        chktex_path.chmod(chktex_path.stat().st_mode | stat.S_IXUSR)
+        self.copy_to_action_dir(lint_texs.CHKTEX_CONFIG_FILE_REL_PATH)
+
+        write(self.workspace / EXERCISE_DIR / 'Angabe.tex',
+              '\\documentclass{article}\n\\input{../../prelude}\n\\begin{document}\n'
+              'See ( a)\n\\input{sub}\n\\end{document}\n')
+        write(self.workspace / EXERCISE_DIR / 'sub.tex', 'Sub text ( b)\n')
+        write(self.workspace / '24SS/prelude.tex', '\\usepackage{x}\n')
+        write(self.workspace / '24SS/UE02/Aufgabe/Angabe.tex',
+              '\\documentclass{article}\n\\begin{document}\nSee ( c)\n\\end{document}\n')
+
+    def lint(self, path: str, hide_prelude: bool = False) -> Any:
+        with mock.patch('builtins.print'):
+            return lint_texs.use_chktex(path, False, True, hide_prelude=hide_prelude)
+
+    def lint_summary(self, paths: list[str], jobs: int, use_processes: bool = False) -> bytes:
+        summary_file = summary_md_file.SummaryMdFile('lint_summary.md', len(paths))
+        run = lint_texs.LintRun(False, True, summary_file)
+        graph = tex_dependencies.TexDependencyGraph(str(self.workspace))
+        with mock.patch('builtins.print'):
+            lint_texs.lint_files(paths, run, jobs, graph, use_processes)
+        summary_file.add_details_summary_end()
+        return (self.workspace / 'lint_summary.md').read_bytes()
+
+
+class TestUseChktex(ChktexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_hidden_prelude_keeps_sibling_inputs(self) -> None:
+        result = self.lint(f'{EXERCISE_DIR}/Angabe.tex', hide_prelude=True)
+
+        self.assertEqual(sorted(os.path.basename(file) for file in result.files),
+                         ['Angabe.tex', 'sub.tex'])
+        self.assertIn(f'/{EXERCISE_DIR}/sub.tex',
+                      [notification.file for notification in result.notifications])
+        self.assertEqual(sorted(os.listdir(self.workspace / EXERCISE_DIR)),
+                         ['Angabe.tex', 'sub.tex'])
+
+    def test_baseline_is_independent_of_the_checkout_directory(self) -> None:
+        path = f'{EXERCISE_DIR}/Angabe.tex'
+        accepted = baseline.Baseline(update=True)
+        accepted.new_notifications(self.lint(path).notifications, baseline.lint_fingerprint)
+
+        # Another checkout of the repo, e.g. locally instead of in CI (base dir with trailing '/')
+        other_workspace = self.workspace.with_name('other checkout')
+        shutil.copytree(self.workspace, other_workspace)
+        with mock.patch.dict(os.environ, {'GITHUB_WORKSPACE': f'{other_workspace}/'}):
+            notifications = self.lint(path).notifications
+
+        self.assertEqual(len(notifications), 2)
+        self.assertEqual(baseline.Baseline(accepted.recorded).new_notifications(
+            notifications, baseline.lint_fingerprint), [])
+
+
+class TestLintFiles(ChktexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_worker_processes_started_from_a_pipeline_thread_report_like_a_serial_run(self) -> None:
+        paths = [f'{EXERCISE_DIR}/Angabe.tex', '24SS/UE02/Aufgabe/Angabe.tex']
+        serial = self.lint_summary(paths, 1)
+
+        # latex_validation_action runs the pipelines in threads
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            parallel = executor.submit(self.lint_summary, paths, 2, True).result()
+
+        self.assertEqual(parallel, serial)
+        self.assertIn(b'24SS/UE02/Aufgabe/Angabe.tex', serial)
+
+    def test_timings_of_worker_processes_are_added_to_the_timer(self) -> None:
+        paths = [f'{EXERCISE_DIR}/Angabe.tex', '24SS/UE02/Aufgabe/Angabe.tex']
+        with mock.patch.dict(os.environ, {'STAGE_TIMING': 'true'}), \
+                mock.patch.multiple(lint_texs.TIMER, enabled=True, records=[]):
+            self.lint_summary(paths, 2, True)
+            records = list(lint_texs.TIMER.records)
+
+        self.assertEqual(
+            sorted(record['file'] for record in records if record['stage'] == 'chktex'), paths)
+
+    def test_concurrent_chktex_runs_report_byte_identical_to_a_serial_run(self) -> None:
+        # Larger exercises are scheduled first, the report keeps the input order
+        for nr in range(3, 8):
+            write(self.workspace / f'24SS/UE0{nr}/Aufgabe/Angabe.tex',
+                  '\\documentclass{article}\n\\begin{document}\n'
+                  + ''.join(f'Text {line} ( {nr})\n' for line in range(nr * 3))
+                  + '\\end{document}\n')
+        paths = [f'{EXERCISE_DIR}/sub.tex', f'{EXERCISE_DIR}/Angabe.tex',
+                 *(f'24SS/UE0{nr}/Aufgabe/Angabe.tex' for nr in range(2, 8))]
+        serial = self.lint_summary(paths, 1)
+
+        for jobs in (2, 4, 8):
+            with self.subTest(jobs=jobs):
+                self.assertEqual(self.lint_summary(paths, jobs), serial)
+        self.assertEqual(serial.count(b'\n## Path: '), 7)
+
+
+class TestParseChktex(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_tty_output_and_records_are_parsed_alike(self) -> None:
+        from_tty, tty_files = lint_texs.parse_chktex_output(CHKTEX_TTY_OUTPUT, '/ws')
+        from_records, record_files = lint_texs.parse_chktex_records(CHKTEX_RECORDS, '/ws')
+
+        self.assertEqual([vars(n) for n in from_tty], [vars(n) for n in from_records])
+        self.assertEqual(tty_files, {'/24SS/UE01/Aufgabe/Angabe.tex'})
+        self.assertEqual(record_files, tty_files)
+        self.assertEqual([(n.type, n.line) for n in from_records],
+                         [('Warning 37', 3), ('Warning 44', 4), ('Warning 37', 5),
+                          ('Warning 15', 5), ('Warning 17', 6)])
+
+    def test_multi_line_message(self) -> None:
+        for notifications, _ in (lint_texs.parse_chktex_output(CHKTEX_TTY_OUTPUT, '/ws'),
+                                 lint_texs.parse_chktex_records(CHKTEX_RECORDS, '/ws')):
+            self.assertEqual(notifications[1].message,
+                             'User Regex: Always use \\nmid\nsee the guidelines.')
+            self.assertEqual(notifications[1].code_snippet, 'So $a \\not| b$  \n      ^^^^^')
+
+    def test_notifications_equal_those_of_the_regex_parser(self) -> None:
+        old = parse_chktex_output_by_regex(CHKTEX_TTY_OUTPUT, '/ws')
+        notifications, _ = lint_texs.parse_chktex_records(CHKTEX_RECORDS, '/ws')
+
+        self.assertEqual(len(notifications), len(old))
+        for notification, old_notification in zip(notifications, old):
+            with self.subTest(notification=notification):
+                self.assertEqual((notification.file, notification.type, notification.line),
+                                 (old_notification.file, old_notification.type,
+                                  old_notification.line))
+                if '\n' in notification.message:
+                    # The regex parser took the second line of the message as code line
+                    self.assertTrue(old_notification.message.startswith(
+                        notification.message.split('\n', maxsplit=1)[0]))
+                    continue
+                self.assertEqual(notification.code_snippet, old_notification.code_snippet)
+                # The regex parser added chktex's statistics to the message of the last notification
+                self.assertEqual(notification.message, old_notification.message.split('\n')[0])
+
+    def test_split_lines_are_parsed_like_the_whole_output(self) -> None:
+        files: set[str] = set()
+        lines = lint_texs.split_lines(CHKTEX_TTY_OUTPUT[i:i + 7]
+                                      for i in range(0, len(CHKTEX_TTY_OUTPUT), 7))
+        notifications = list(lint_texs.iter_chktex_output(lines, '/ws', files))
+        parsed, _ = lint_texs.parse_chktex_output(CHKTEX_TTY_OUTPUT, '/ws')
+
+        self.assertEqual([vars(n) for n in notifications], [vars(n) for n in parsed])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# pylint: disable=missing-module-docstring
+
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.script_loader import load_script
+
+ltex_limiter = load_script('ltex_limiter')
+
+
+class TestLtexLimiter(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring,protected-access
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def test_slots_are_shared_between_limiters(self) -> None:
+        limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=2, heap_mb=512)
+        other_limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=2, heap_mb=512)
+
+        with mock.patch.object(ltex_limiter, 'memory_available_mb', return_value=None), \
+                limiter.slot() as env, other_limiter.slot():
+            self.assertIn('-Xmx512m', env['JAVA_OPTS'])
+            self.assertIsNone(other_limiter._try_acquire())
+        lock = other_limiter._try_acquire()
+        self.assertIsNotNone(lock)
+        lock.release()
+
+    def test_further_slots_wait_for_available_memory(self) -> None:
+        limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=4, heap_mb=512)
+        other_limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=4, heap_mb=512)
+
+        low_memory_mb = limiter.jvm_mb - 1
+        with mock.patch.object(ltex_limiter, 'memory_available_mb', return_value=low_memory_mb), \
+                limiter.slot():
+            self.assertIsNone(other_limiter._try_acquire())
+
+    def test_thread_holding_a_slot_reenters_it(self) -> None:
+        limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=1)
+
+        with limiter.slot(), limiter.slot('-XX:SharedArchiveFile=ltex.jsa') as env:
+            self.assertIn('-XX:SharedArchiveFile=ltex.jsa', env['JAVA_OPTS'])
+
+    def test_heap_is_capped_after_the_java_opts_of_the_environment(self) -> None:
+        limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=1, heap_mb=512)
+        cds_opts = '-XX:SharedArchiveFile=ltex.jsa -Xlog:cds*=off'
+
+        with mock.patch.dict('os.environ', {'JAVA_OPTS': '-Xmx4g -Dfile.encoding=UTF-8'}):
+            env = limiter.java_env(cds_opts)
+        with mock.patch.dict('os.environ', clear=True):
+            env_without_java_opts = limiter.java_env()
+
+        # The last -Xmx wins, i.e. the cap
+        self.assertEqual(env['JAVA_OPTS'], f'-Xmx4g -Dfile.encoding=UTF-8 -Xmx512m {cds_opts}')
+        self.assertEqual(env_without_java_opts['JAVA_OPTS'], '-Xmx512m')
+
+    def test_jvm_size_is_raised_to_the_largest_rss_of_a_finished_jvm(self) -> None:
+        limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, max_processes=1, heap_mb=512)
+        jvm_mb = 512 + ltex_limiter.JVM_OVERHEAD_MB
+
+        for ru_maxrss_mb, expected_jvm_mb in ((jvm_mb - 100, jvm_mb), (jvm_mb + 100, jvm_mb + 100),
+                                              (jvm_mb, jvm_mb + 100)):
+            with self.subTest(ru_maxrss_mb=ru_maxrss_mb), \
+                    mock.patch.object(ltex_limiter.resource, 'getrusage',
+                                      return_value=mock.Mock(ru_maxrss=ru_maxrss_mb * 1024)):
+                with limiter.slot():
+                    pass
+
+                self.assertEqual(limiter.jvm_mb, expected_jvm_mb)
+
+    def test_number_of_slots_is_derived_from_cores_and_available_memory(self) -> None:
+        jvm_mb = 512 + ltex_limiter.JVM_OVERHEAD_MB
+        for available_mb, expected_max_processes in ((3 * jvm_mb + 10, 3), (100, 1), (None, 8),
+                                                     (100 * jvm_mb, 8)):
+            with self.subTest(available_mb=available_mb), \
+                    mock.patch.object(ltex_limiter, 'memory_available_mb',
+                                      return_value=available_mb), \
+                    mock.patch.object(ltex_limiter.os, 'cpu_count', return_value=8):
+                limiter = ltex_limiter.LtexLimiter(self.temp_dir.name, heap_mb=512)
+
+                self.assertEqual(limiter.max_processes, expected_max_processes)
+
+    def test_memory_available_is_read_from_meminfo(self) -> None:
+        meminfo = 'MemTotal:        8048576 kB\nMemFree:          512000 kB\n' \
+                  'MemAvailable:    2097152 kB\n'
+
+        with mock.patch('builtins.open', mock.mock_open(read_data=meminfo)):
+            self.assertEqual(ltex_limiter.memory_available_mb(), 2048)
+        with mock.patch('builtins.open', side_effect=FileNotFoundError):
+            self.assertIsNone(ltex_limiter.memory_available_mb())
+
+
+if __name__ == "__main__":
+    unittest.main()
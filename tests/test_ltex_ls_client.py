@@ -0,0 +1,154 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from tests.script_loader import load_script
+
+ltex_ls_client = load_script('ltex_ls_client')
+
+# Stand-in for ltex-ls-plus: answers with Content-Length framed messages, written in fragments
+# (partial reads) and several messages per write. Received methods are logged to FAKE_LSP_LOG.
+FAKE_SERVER = '''
+import json
+import os
+import sys
+import time
+
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+
+
+def log(method):
+    with open(os.environ['FAKE_LSP_LOG'], 'a', encoding='utf-8') as file:
+        file.write(f'{method}\\n')
+
+
+def read_message():
+    content_length = None
+    while True:
+        header = stdin.readline()
+        if not header:
+            sys.exit(1)
+        if not header.strip():
+            break
+        name, _, value = header.decode('ascii').partition(':')
+        if name.lower() == 'content-length':
+            content_length = int(value)
+    return json.loads(stdin.read(content_length))
+
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return f'Content-Length: {len(body)}\\r\\n\\r\\n'.encode('ascii') + body
+
+
+def write(data, fragments=1):
+    size = -(-len(data) // fragments)
+    for start in range(0, len(data), size):
+        stdout.write(data[start:start + size])
+        stdout.flush()
+        time.sleep(0.01)
+
+
+while True:
+    message = read_message()
+    method = message.get('method')
+    log(method or f'response {message["id"]}')
+    if method == 'initialize':
+        # Header and body split across several writes
+        write(frame({'jsonrpc': '2.0', 'id': message['id'], 'result': {'capabilities': {}}}), fragments=7)
+    elif method == 'textDocument/didOpen':
+        document = message['params']['textDocument']
+        if 'CRASH' in document['text']:
+            sys.exit(3)
+        if 'HANG' in document['text']:
+            continue
+        write(frame({'jsonrpc': '2.0', 'id': 'config', 'method': 'workspace/configuration',
+                     'params': {'items': [{'section': 'ltex'}]}}))
+        settings = read_message()['result'][0]
+        log('response config')
+        diagnostic = {'range': {'start': {'line': 0, 'character': 4}, 'end': {'line': 0, 'character': 13}},
+                      'severity': 3, 'message': f"'Ergebniss': {settings['language']}"}
+        # Two messages in one write
+        write(frame({'jsonrpc': '2.0', 'method': 'window/logMessage', 'params': {'message': 'checking'}})
+              + frame({'jsonrpc': '2.0', 'method': 'textDocument/publishDiagnostics',
+                       'params': {'uri': document['uri'], 'diagnostics': [diagnostic]}}))
+    elif method == 'textDocument/codeAction':
+        write(frame({'jsonrpc': '2.0', 'id': message['id'], 'result': [
+            {'title': 'Ergebnis', 'kind': 'quickfix.ltex.acceptSuggestions'},
+            {'title': "Add 'Ergebniss' to dictionary", 'kind': 'quickfix.ltex.addToDictionary'}]}))
+    elif method == 'shutdown':
+        write(frame({'jsonrpc': '2.0', 'id': message['id'], 'result': None}))
+    elif method == 'exit':
+        sys.exit(0)
+'''
+
+
+class TestLtexLanguageServer(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        server_path = Path(temp_dir.name, 'ltex-ls-plus')
+        server_path.write_text(f'#!{sys.executable}\n{FAKE_SERVER}', encoding='utf-8')
+        server_path.chmod(server_path.stat().st_mode | stat.S_IXUSR)
+        self.log_path = Path(temp_dir.name, 'methods.log')
+        self.tex_file_abs_path = str(Path(temp_dir.name, 'Angabe.tex'))
+        self.server = ltex_ls_client.LtexLanguageServer(str(server_path), {'language': 'de-AT'},
+                                                        check_timeout=5)
+        with mock.patch.dict(os.environ, {'FAKE_LSP_LOG': str(self.log_path)}):
+            self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def check(self, text: str) -> Any:
+        Path(self.tex_file_abs_path).write_text(text, encoding='utf-8')
+        return self.server.check_file(self.tex_file_abs_path)
+
+    def methods(self) -> list[str]:
+        return self.log_path.read_text(encoding='utf-8').splitlines()
+
+    def test_framed_messages_are_read_across_partial_and_combined_writes(self) -> None:
+        diagnostics = self.check('Das Ergebniss\n')
+        self.server.stop()
+
+        self.assertEqual(len(diagnostics), 1)
+        self.assertEqual(diagnostics[0]['message'], "'Ergebniss': de-AT")
+        self.assertEqual(diagnostics[0]['suggestions'], ['Ergebnis'])
+        self.assertEqual(self.methods(), ['initialize', 'initialized', 'textDocument/didOpen',
+                                          'response config', 'textDocument/codeAction',
+                                          'textDocument/didClose', 'shutdown', 'exit'])
+
+    def test_missing_diagnostics_time_out(self) -> None:
+        self.server.check_timeout = 0.2
+
+        with self.assertRaisesRegex(ltex_ls_client.LtexServerError, 'No diagnostics'):
+            self.check('HANG\n')
+
+        # The server is still usable
+        self.server.check_timeout = 5
+        self.assertEqual(len(self.check('Das Ergebniss\n')), 1)
+
+    def test_terminated_server_is_reported(self) -> None:
+        with self.assertRaisesRegex(ltex_ls_client.LtexServerError, 'terminated unexpectedly'):
+            self.check('CRASH\n')
+
+    def test_stop_shuts_the_server_down(self) -> None:
+        process = self.server.process
+
+        self.server.stop()
+
+        self.assertEqual(process.wait(timeout=5), 0)
+        self.assertEqual(self.methods()[-2:], ['shutdown', 'exit'])
+        self.assertIsNone(self.server.process)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# pylint: disable=missing-module-docstring
+
+import contextlib
+import io
+import sys
+import unittest
+from unittest import mock
+
+from latex_validation_action.__main__ import main
+
+
+class TestMain(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_changed_files_are_required_unless_all(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit):
+            main(['--spell_check', 'false', '--config', 'cfg.json', '--workdir', '.'])
+
+        self.assertIn('-cf/--changedfiles (or --all)', stderr.getvalue())
+
+    def test_only_selected_pipelines_are_imported(self) -> None:
+        with mock.patch.dict(sys.modules), contextlib.redirect_stderr(io.StringIO()):
+            # Imported by other tests
+            sys.modules.pop('spell-check_texs', None)
+            with self.assertRaises(SystemExit):
+                main(['--spell_check', 'false', '--lint_summary', 'maybe', '--all',
+                      '--config', 'cfg.json', '--workdir', '.'])
+
+            self.assertIn('lint_texs', sys.modules)
+            self.assertNotIn('spell-check_texs', sys.modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import tempfile
+import unittest
+from typing import Any
+
+from tests.script_loader import load_script
+
+paragraph_cache = load_script('paragraph_cache')
+result_cache = load_script('result_cache')
+source_overlay = load_script('source_overlay')
+
+
+class TestParagraphCache(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+        config_file_path = self.write('ltex_config.txt', '{}')
+        self.cache = paragraph_cache.ParagraphCache(result_cache.ResultCache(
+            os.path.join(self.tmp_dir.name, 'cache'), 'ltex-paragraphs', 'test', config_file_path))
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def paragraphs(self, content: str) -> Any:
+        return self.cache.paragraphs(source_overlay.SourceOverlay(self.write('a.tex', content)))
+
+    def test_cached_notifications_are_reanchored(self) -> None:
+        paragraphs = self.paragraphs('One.\n\nTwo\nlines.\n')
+        _, missed = self.cache.lookup(paragraphs, 'a.tex')
+        record = {'file': 'a.tex', 'line': 4, 'column': 1, 'message': 'm'}
+        self.assertEqual(self.cache.store(missed, [record, {**record, 'line': 2}]), [record])
+
+        paragraphs = self.paragraphs('New.\nMore.\n\nTwo\nlines.\n\nOne!\n')
+        records, missed = self.cache.lookup(paragraphs, 'b.tex')
+
+        self.assertEqual(records, [{**record, 'file': 'b.tex', 'line': 5}])
+        self.assertEqual([(p.first_line, p.last_line) for p in missed], [(1, 2), (7, 7)])
+
+    def test_environment_is_part_of_the_key(self) -> None:
+        paragraphs = self.paragraphs('Text\n\n\\begin{verbatim}\n\nText\n\\end{verbatim}\n')
+        keys = [paragraph.key for paragraph in paragraphs]
+
+        self.assertNotEqual(keys[0], keys[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
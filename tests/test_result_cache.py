@@ -0,0 +1,133 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from tests.script_loader import load_script
+
+result_cache = load_script('result_cache')
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    """Repo with an exercise including a sub file, which includes the prelude."""
+    # pylint: disable=missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.repo = Path(temp_dir.name, 'repo')
+        self.config_path = Path(temp_dir.name, 'chktexrc.in')
+        self.config_path.write_text('CmdLine { -v0 }\n', encoding='utf-8')
+        self.write('24SS/UE01/Aufgabe/Angabe.tex', '\\input{sub}\nText\n')
+        self.write('24SS/UE01/Aufgabe/sub.tex', '\\input{../../prelude}\nSub\n')
+        self.write('24SS/prelude.tex', '\\usepackage{x}\n')
+        self.write('24SS/UE02/Aufgabe/Angabe.tex', 'Other\n')
+        self.cache = self.create_cache()
+
+    def write(self, path: str, content: str) -> None:
+        (self.repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (self.repo / path).write_text(content, encoding='utf-8')
+
+    def create_cache(self, tool_version: str = '1.7.9') -> object:
+        return result_cache.ResultCache(str(self.repo / '.cache'), 'chktex', tool_version,
+                                        str(self.config_path))
+
+
+class TestKeyFor(ResultCacheTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def key(self, path: str = '24SS/UE01/Aufgabe/Angabe.tex', variant: str = '') -> str:
+        return self.cache.key_for(str(self.repo / path), str(self.repo), variant)  # type: ignore
+
+    def test_key_changes_with_the_content_of_included_files(self) -> None:
+        key = self.key()
+        self.assertEqual(self.key(), key)
+
+        self.write('24SS/UE02/Aufgabe/Angabe.tex', 'Other, changed\n')
+        self.assertEqual(self.key(), key)
+
+        # Nested include (Angabe.tex -> sub.tex -> prelude.tex)
+        self.write('24SS/prelude.tex', '\\usepackage{y}\n')
+        changed_prelude_key = self.key()
+        self.assertNotEqual(changed_prelude_key, key)
+
+        self.write('24SS/UE01/Aufgabe/sub.tex', '\\input{../../prelude}\nSub, changed\n')
+        self.assertNotIn(self.key(), (key, changed_prelude_key))
+
+    def test_key_is_independent_of_the_workspace_root(self) -> None:
+        # Another checkout of the repo, e.g. on another runner
+        other_repo = self.repo.with_name('other checkout')
+        shutil.copytree(self.repo, other_repo)
+        path = '24SS/UE01/Aufgabe/Angabe.tex'
+
+        other_key = self.cache.key_for(str(other_repo / path), str(other_repo))  # type: ignore
+
+        self.assertEqual(other_key, self.key(path))
+
+    def test_key_changes_with_variant_tool_version_and_config(self) -> None:
+        key = self.key()
+
+        self.assertNotEqual(self.key(variant='paragraphs:[(1, 2)]'), key)
+        self.cache = self.create_cache('1.7.8')
+        self.assertNotEqual(self.key(), key)
+        self.config_path.write_text('CmdLine { -v1 }\n', encoding='utf-8')
+        self.cache = self.create_cache()
+        self.assertNotEqual(self.key(), key)
+
+
+class TestEvict(ResultCacheTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def put(self, key: str, size: int, mtime: int) -> None:
+        """Stores an entry of about size bytes, last used at mtime."""
+        self.cache.put(key, 'x' * (size - 2))  # type: ignore
+        entry_path = self.cache._entry_path(key)  # type: ignore # pylint: disable=protected-access
+        os.utime(entry_path, (mtime, mtime))
+
+    def remaining(self) -> list[str]:
+        return sorted(file_name.removesuffix('.json')
+                      for _, _, file_names in os.walk(self.cache.directory)  # type: ignore
+                      for file_name in file_names)
+
+    def test_least_recently_used_entries_are_evicted_first(self) -> None:
+        for key, mtime in (('aa-new', 400), ('bb-old', 100), ('cc-mid', 300), ('dd-older', 200)):
+            self.put(key, 100, mtime)
+        self.cache.max_size = 250  # type: ignore
+
+        self.cache.evict()  # type: ignore
+
+        self.assertEqual(self.remaining(), ['aa-new', 'cc-mid'])
+
+    def test_used_entries_are_kept(self) -> None:
+        self.put('aa-first', 100, 100)
+        self.put('bb-second', 100, 200)
+        self.cache.max_size = 150  # type: ignore
+
+        self.assertEqual(self.cache.get('aa-first'), 'x' * 98)  # type: ignore
+        self.cache.evict()  # type: ignore
+
+        self.assertEqual(self.remaining(), ['aa-first'])
+
+    def test_eviction_stops_as_soon_as_the_entries_fit(self) -> None:
+        # Same last use: the smaller entry goes first
+        self.put('aa-large', 300, 100)
+        self.put('bb-small', 50, 100)
+        self.put('cc-recent', 100, 200)
+        self.cache.max_size = 400  # type: ignore
+
+        self.cache.evict()  # type: ignore
+
+        self.assertEqual(self.remaining(), ['aa-large', 'cc-recent'])
+
+        self.cache.max_size = 100  # type: ignore
+        self.cache.evict()  # type: ignore
+
+        self.assertEqual(self.remaining(), ['cc-recent'])
+
+
+if __name__ == "__main__":
+    unittest.main()
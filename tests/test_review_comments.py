@@ -0,0 +1,66 @@
+# pylint: disable=missing-module-docstring
+
+import unittest
+from typing import Any
+
+from tests.script_loader import load_script
+
+review_comments = load_script('review_comments')
+
+
+def new_comment(fingerprint: str, line: int = 1) -> dict[str, Any]:
+    # pylint: disable=missing-function-docstring
+    return {'path': 'a.tex', 'line': line, 'body': 'text', 'fingerprint': fingerprint}
+
+
+def existing_comment(comment_id: int, fingerprint: str | None, line: int | None = 1,
+                     path: str = 'a.tex', login: str = 'github-actions[bot]') -> dict[str, Any]:
+    # pylint: disable=missing-function-docstring
+    body = review_comments.comment_body('text', fingerprint) if fingerprint else 'text'
+    return {'id': comment_id, 'path': path, 'line': line, 'body': body,
+            'user': {'login': login, 'type': 'User' if login == 'reviewer' else 'Bot'}}
+
+
+class TestReconcileReviewComments(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_only_new_comments_are_created_and_resolved_ones_deleted(self) -> None:
+        existing = [existing_comment(1, 'aa'), existing_comment(2, 'bb'), existing_comment(3, 'bb')]
+        new = [new_comment('aa'), new_comment('bb'), new_comment('cc', 2)]
+
+        to_create, to_delete, nr_kept = review_comments.reconcile_review_comments(
+            existing, new, ['a.tex'])
+
+        self.assertEqual(to_create, [new_comment('cc', 2)])
+        self.assertEqual(to_delete, [3])
+        self.assertEqual(nr_kept, 2)
+
+    def test_outdated_legacy_and_foreign_comments(self) -> None:
+        legacy_body = "'Ergebniss': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]" \
+                      "\n^^^^^^^^^\nSuggestion: Ergebnis"
+        existing = [existing_comment(1, 'aa', line=None),
+                    {**existing_comment(2, None), 'body': legacy_body},
+                    existing_comment(3, None, login='reviewer'),
+                    existing_comment(4, 'bb', path='other.tex'),
+                    {**existing_comment(5, None, login='coverage-bot[bot]'), 'body': 'Not covered'},
+                    existing_comment(6, None)]
+
+        for own_login, expected_to_delete in ((None, [1, 2]), ('github-actions[bot]', [1, 2, 6])):
+            with self.subTest(own_login=own_login):
+                to_create, to_delete, nr_kept = review_comments.reconcile_review_comments(
+                    existing, [new_comment('aa')], ['a.tex'], own_login)
+
+                self.assertEqual(to_create, [new_comment('aa')])
+                self.assertEqual(to_delete, expected_to_delete)
+                self.assertEqual(nr_kept, 0)
+
+    def test_foreign_bot_comment_in_old_report_format_only_is_deleted(self) -> None:
+        foreign = {**existing_comment(1, None, login='other-bot[bot]'), 'body': 'Typo? [SPELLING]'}
+        legacy = {**existing_comment(2, None, login='other-bot[bot]'),
+                  'body': "'Satz': Typo? [SPELLING]\nSuggestion: Satz"}
+
+        self.assertFalse(review_comments.is_legacy_comment(foreign, 'github-actions[bot]'))
+        self.assertTrue(review_comments.is_legacy_comment(legacy, 'github-actions[bot]'))
+
+if __name__ == "__main__":
+    unittest.main()
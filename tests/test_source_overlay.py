@@ -0,0 +1,73 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import tempfile
+import unittest
+
+from tests.script_loader import load_script
+
+source_overlay = load_script('source_overlay')
+
+TEX = '\\documentclass{article}\n\\input{../../prelude}\n\\begin{document}\nText\n\\end{document}\n'
+
+
+class TestSourceOverlay(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.tex_file_path = os.path.join(self.tmp_dir.name, 'Angabe.tex')
+        with open(self.tex_file_path, 'w', encoding='utf-8') as file:
+            file.write(TEX)
+
+    def test_prelude_is_hidden_in_memory_only(self) -> None:
+        overlay = source_overlay.SourceOverlay(self.tex_file_path)
+
+        self.assertEqual(overlay.comment_out_inputs('prelude'), 1)
+        with overlay.materialize() as path:
+            self.assertNotEqual(path, self.tex_file_path)
+            with open(path, 'r', encoding='utf-8') as file:
+                self.assertIn('%\\input{../../prelude}\n', file.read())
+
+        self.assertFalse(os.path.exists(path))
+        with open(self.tex_file_path, 'r', encoding='utf-8') as file:
+            self.assertEqual(file.read(), TEX)
+
+    def test_copy_is_written_outside_the_directory_of_the_tex_file(self) -> None:
+        overlay = source_overlay.SourceOverlay(self.tex_file_path)
+        overlay.comment_out_inputs('prelude')
+
+        with overlay.materialize() as path:
+            self.assertNotEqual(os.path.dirname(path), self.tmp_dir.name)
+            self.assertEqual(os.path.basename(path), 'Angabe.tex')
+            self.assertEqual(os.listdir(self.tmp_dir.name), ['Angabe.tex'])
+
+    def test_line_numbers_are_mapped_back(self) -> None:
+        overlay = source_overlay.SourceOverlay(self.tex_file_path)
+        overlay.replace_line(1, [])
+        overlay.replace_line(0, ['\\documentclass{article}\n', '\\usepackage{x}\n'])
+
+        self.assertEqual([overlay.original_line(line) for line in range(1, 6)], [1, 1, 3, 4, 5])
+
+    def test_only_selected_paragraphs_and_latex_context_are_kept(self) -> None:
+        with open(self.tex_file_path, 'w', encoding='utf-8') as file:
+            file.write('\\documentclass{article}\n\\begin{document}\nOne.\n\nTwo\nlines.\n\n'
+                       '\\begin{itemize}\n\\item Three\n\\end{itemize}\n\\end{document}\n')
+        overlay = source_overlay.SourceOverlay(self.tex_file_path)
+
+        self.assertEqual(overlay.restrict_to_paragraphs({6}), [(5, 6)])
+        self.assertEqual(overlay.text,
+                         '\\documentclass{article}\n\\begin{document}\n\n\nTwo\nlines.\n\n'
+                         '\\begin{itemize}\n\n\\end{itemize}\n\\end{document}\n')
+
+    def test_unmodified_file_is_not_copied(self) -> None:
+        overlay = source_overlay.SourceOverlay(self.tex_file_path)
+
+        self.assertEqual(overlay.comment_out_inputs('other'), 0)
+        with overlay.materialize() as path:
+            self.assertEqual(path, self.tex_file_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+# pylint: disable=missing-module-docstring
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from tests.script_loader import load_script
+from tests.workspace_test_case import REPO_DIR, WorkspaceTestCase, write
+
+# The lock dir of the LTeX limiter is created on import (below GITHUB_ACTION_PATH)
+with mock.patch.dict(os.environ, {'GITHUB_ACTION_PATH': tempfile.gettempdir()}):
+    spell_check_texs = load_script('spell-check_texs')
+ltex_limiter = load_script('ltex_limiter')
+
+FAKE_LTEX_PATH = REPO_DIR / 'benchmarks' / 'fake_tools' / 'ltex-cli-plus'
+EXERCISE_DIR = '24SS/UE01/Aufgabe'
+
+# Console output of ltex-cli-plus 18.5.1 (de-AT) per tex file, '{}' is the abs. path of the tex file
+RECORDED_LTEX_OUTPUT = {
+    '24SS/UE1/Angabe.tex': [
+        "{}:3:5: info: 'Ergebniss': Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]",
+        'Das Ergebniss wird ausgegeben.',
+        '    ^^^^^^^^^',
+        'Suggestion: Ergebnis',
+        'Suggestion: Ergebnisse',
+        "{}:7:12: warning: 'dass': Möglicherweise fehlt ein Komma. "
+        "[KOMMA_ZWISCHEN_HAUPT_UND_NEBENSATZ]",
+        'Achten Sie dass die Eingabe geprüft wird.',
+        '           ^^^^',
+        'Suggestion: , dass'],
+    '24SS/UE1/Angabe_en.tex': [],
+    '24SS/UE10/Angabe.tex': [
+        "{}:1:1: warning: 'die': Dieser Satz fängt nicht mit einem großgeschriebenen Wort an. "
+        "[UPPERCASE_SENTENCE_START]",
+        'die Methode liest die Werte ein.',
+        '^^^',
+        'Suggestion: Die'],
+    '24SS/UE10/Angabe_en.tex': [
+        "{}:2:9: info: '  ': Zwei aufeinanderfolgende Leerzeichen. [WHITESPACE_RULE]",
+        'This is  an exercise.',
+        '        ^^',
+        'Suggestion:  '],
+}
+
+
+class LtexTestCase(WorkspaceTestCase):
+    """
+    Workspace with an exercise and an action directory, ltex-cli-plus is the stand-in of the
+    benchmarks reporting a notification for every non-blank line.
+    """
+    # pylint: disable=missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.copy_to_action_dir(spell_check_texs.CONFIG_FILE_REL_PATH)
+        self.patch_env({'LTEX_PLUS_DIR': str(FAKE_LTEX_PATH), 'FAKE_TOOL_DENSITY': '1',
+                        'FAKE_TOOL_LATENCY': '0'})
+        patcher = mock.patch.object(spell_check_texs, 'LIMITER',
+                                    ltex_limiter.LtexLimiter(str(self.action_dir), 1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        write(self.workspace / EXERCISE_DIR / 'Angabe.tex',
+              '\\documentclass{article}\n\\begin{document}\nDas ist ein Satz.\n'
+              '\\input{sub}\n\\end{document}\n')
+        write(self.workspace / EXERCISE_DIR / 'sub.tex', 'Ein eingebundener Satz.\n')
+
+
+class TestSpellCheckAndReport(LtexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_included_tex_files_are_spell_checked_on_their_own(self) -> None:
+        paths = [f'{EXERCISE_DIR}/Angabe.tex', f'{EXERCISE_DIR}/sub.tex']
+
+        spell_check_run = spell_check_texs.spell_check_and_report(
+            [spell_check_texs.choices['make_report_for_pr_comment_opt']], paths)
+
+        report = (self.workspace / 'spell_check_report.md').read_text(encoding='utf-8')
+        self.assertIn(f'{EXERCISE_DIR}/sub.tex', report)
+        self.assertIn('Ein eingebundener Satz.', report)
+        self.assertEqual(spell_check_run.nr_of_total_warnings, 6)
+
+    def test_notifications_in_diff_are_commented_and_the_others_reported(self) -> None:
+        paths = [f'{EXERCISE_DIR}/Angabe.tex', f'{EXERCISE_DIR}/sub.tex']
+        write(self.workspace / paths[0], ''.join(f'Satz {nr}.\n' for nr in range(1, 10)))
+        # Line 5 of Angabe.tex is added (lines 3 to 7 count as in diff), sub.tex is unchanged
+        changes = [{'type': 'UnchangedLine', 'lineBefore': 4, 'lineAfter': 4},
+                   {'type': 'AddedLine', 'lineAfter': 5}]
+        diff_path = self.workspace / 'diff.json'
+        diff_path.write_text(json.dumps({'type': 'diff', 'files': [
+            {'path': paths[0], 'chunks': [{'changes': changes}]}]}), encoding='utf-8')
+        client = mock.Mock(**{'get_review_comments.return_value': [],
+                              'delete_review_comments.return_value': 0})
+
+        with mock.patch.object(load_script('github_api').PullRequestClient, 'from_env',
+                               return_value=client), mock.patch('builtins.print'):
+            spell_check_texs.spell_check_and_report(
+                [spell_check_texs.choices['comment_in_code_and_make_report_opt']], paths,
+                str(diff_path))
+
+        comments = client.create_review.call_args.args[0]
+        self.assertEqual([(comment['path'], comment['line']) for comment in comments],
+                         [(paths[0], line) for line in range(3, 8)])
+        report = (self.workspace / 'spell_check_remaining_report.md').read_text(encoding='utf-8')
+        for nr in range(1, 10):
+            with self.subTest(line=nr):
+                if 3 <= nr <= 7:
+                    self.assertNotIn(f'Satz {nr}.', report)
+                else:
+                    self.assertIn(f'Satz {nr}.', report)
+        # Unchanged tex files are neither commented nor reported
+        self.assertNotIn('sub.tex', report)
+
+
+class TestSpellCheckFiles(LtexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def spell_check(self, jobs: int) -> list[tuple[str, list[dict[str, Any]]]]:
+        files = [(f'{EXERCISE_DIR}/Angabe.tex', None), (f'{EXERCISE_DIR}/sub.tex', None)]
+        with mock.patch('builtins.print'):
+            results = list(spell_check_texs.spell_check_files(files, jobs=jobs))
+        return [(path, [vars(notification) for notification in notifications])
+                for path, _, notifications in results]
+
+    def test_worker_processes_started_from_a_pipeline_thread_check_like_serial(self) -> None:
+        serial = self.spell_check(1)
+
+        # latex_validation_action runs the pipelines in threads
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            parallel = executor.submit(self.spell_check, 2).result()
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual([len(notifications) for _, notifications in serial], [5, 1])
+
+    def test_timings_of_worker_processes_are_added_to_the_timer(self) -> None:
+        with mock.patch.dict(os.environ, {'STAGE_TIMING': 'true'}), \
+                mock.patch.multiple(spell_check_texs.TIMER, enabled=True, records=[]):
+            self.spell_check(2)
+            records = list(spell_check_texs.TIMER.records)
+
+        self.assertEqual(
+            [record['file'] for record in records if record['stage'] == 'ltex-cli-plus'],
+            [f'{EXERCISE_DIR}/Angabe.tex', f'{EXERCISE_DIR}/sub.tex'])
+
+
+class TestUseLtexBatch(LtexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def run_ltex_cli(self, command: str, files: str | None = None) -> Iterator[str]:
+        """Replays the recorded output of the tex files given to ltex-cli-plus."""
+        del files
+        for tex_file_abs_path in command.split()[2:]:
+            path = os.path.relpath(tex_file_abs_path, self.workspace)
+            for line in RECORDED_LTEX_OUTPUT[path]:
+                yield line.format(tex_file_abs_path)
+        yield ''
+
+    def test_batch_output_is_separated_like_single_file_runs(self) -> None:
+        paths = list(RECORDED_LTEX_OUTPUT)
+        with mock.patch.object(spell_check_texs, 'run_ltex_cli', self.run_ltex_cli), \
+                mock.patch('builtins.print'):
+            single = {path: spell_check_texs.use_ltex_batch([path])[path] for path in paths}
+            for batch in (paths, paths[::-1], paths[1:]):
+                with self.subTest(batch=batch):
+                    batched = spell_check_texs.use_ltex_batch(batch)
+
+                    self.assertEqual(list(batched), batch)
+                    for path in batch:
+                        self.assertEqual([vars(n) for n in batched[path]],
+                                         [vars(n) for n in single[path]])
+
+        self.assertEqual([len(single[path]) for path in paths], [2, 0, 1, 1])
+        self.assertEqual(single['24SS/UE1/Angabe.tex'][0].suggestions,
+                         '\n^^^^^^^^^\nSuggestion: Ergebnis\nSuggestion: Ergebnisse')
+
+class TestLtexCliJavaOpts(LtexTestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_class_data_sharing_archive_is_used_if_recorded(self) -> None:
+        ltex_dir = self.workspace / 'ltex-ls-plus-18.5.1'
+        archive_path = ltex_dir / spell_check_texs.LTEX_CDS_ARCHIVE_NAME
+        limiter = ltex_limiter.LtexLimiter(str(self.workspace), 1, heap_mb=512)
+
+        with mock.patch.dict(os.environ, {'LTEX_PLUS_DIR': str(ltex_dir / 'bin' / 'ltex-cli-plus'),
+                                          'JAVA_OPTS': '-Xmx4g'}):
+            self.assertEqual(spell_check_texs.ltex_cli_java_opts(), '')
+            write(archive_path, '')
+            java_opts = spell_check_texs.ltex_cli_java_opts()
+            with limiter.slot(java_opts) as env:
+                self.assertEqual(env['JAVA_OPTS'], f'-Xmx4g -Xmx512m {java_opts}')
+
+        self.assertEqual(java_opts, f'-XX:SharedArchiveFile={archive_path} -Xlog:cds*=off')
+
+
+class TestChangedLinesOf(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.repo = tempfile.mkdtemp(prefix='latex-validation-test-')
+        self.addCleanup(shutil.rmtree, self.repo)
+        self.git('init', '-q', '-b', 'feature')
+        write(Path(self.repo, 'UE01/Angabe.tex'), 'first\nchanged\n')
+        self.git('add', '-A')
+        self.git('commit', '-q', '-m', 'change')
+        # Like a shallow checkout: the base branch shares no history with HEAD
+        self.git('checkout', '-q', '--orphan', 'main')
+        self.git('commit', '-q', '--allow-empty', '-m', 'base')
+        self.git('checkout', '-q', 'feature')
+
+    def git(self, *args: str) -> None:
+        subprocess.run(['git', '-C', self.repo, '-c', 'user.name=test',
+                        '-c', 'user.email=test@example.com', *args],
+                       check=True, capture_output=True)
+
+    def test_diff_json_is_used_without_merge_base(self) -> None:
+        diff_path = os.path.join(self.repo, 'diff.json')
+        changes = [{'type': 'UnchangedLine', 'lineBefore': 1, 'lineAfter': 1},
+                   {'type': 'AddedLine', 'lineAfter': 2}]
+        with open(diff_path, 'w', encoding='utf-8') as file:
+            json.dump({'type': 'diff', 'files': [{'path': 'UE01/Angabe.tex',
+                                                  'chunks': [{'changes': changes}]}]}, file)
+
+        with self.assertLogs(level='WARNING'):
+            changed = spell_check_texs.changed_lines_of(self.repo, ['UE01/Angabe.tex'], diff_path,
+                                                        'main')
+
+        self.assertEqual(list(changed), ['UE01/Angabe.tex'])
+        self.assertTrue(spell_check_texs.line_is_in_diff(2, changed['UE01/Angabe.tex']))
+        self.assertFalse(spell_check_texs.line_is_in_diff(5, changed['UE01/Angabe.tex']))
+        with self.assertRaises(TypeError):
+            spell_check_texs.line_is_in_diff(2, [2])
+
+    def test_git_error_without_diff_json(self) -> None:
+        with self.assertLogs(level='ERROR'), self.assertRaises(subprocess.CalledProcessError):
+            spell_check_texs.changed_lines_of(self.repo, ['UE01/Angabe.tex'], None, 'main')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# pylint: disable=missing-module-docstring
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.script_loader import load_script
+
+stage_timer = load_script('stage_timer')
+
+
+class TestStageTimer(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_stages_are_recorded_per_file_and_summarized(self) -> None:
+        timer = stage_timer.StageTimer()
+        for path in ('a.tex', 'b.tex'):
+            with timer.stage('chktex', path):
+                subprocess.run([sys.executable, '-c', 'sum(range(100000))'], check=True)
+
+        [summary] = timer.summary()
+        self.assertEqual((summary['stage'], summary['count']), ('chktex', 2))
+        self.assertEqual([record['file'] for record in timer.records], ['a.tex', 'b.tex'])
+        self.assertGreater(summary['child_cpu_s'], 0)
+        self.assertGreater(summary['child_peak_rss_kb'], 0)
+
+    def test_report_is_written_as_json_and_step_summary(self) -> None:
+        timer = stage_timer.StageTimer()
+        with timer.stage('total'):
+            pass
+        with tempfile.TemporaryDirectory() as base_dir:
+            step_summary_path = os.path.join(base_dir, 'step_summary.md')
+            with mock.patch.dict(os.environ, {'GITHUB_STEP_SUMMARY': step_summary_path}):
+                timer.write_report('lint', base_dir)
+
+            with open(os.path.join(base_dir, 'lint_timings.json'), 'r', encoding='utf-8') as file:
+                self.assertEqual(json.load(file)['stages'][0]['stage'], 'total')
+            with open(step_summary_path, 'r', encoding='utf-8') as file:
+                self.assertIn('| total | 1 |', file.read())
+
+    def test_records_of_another_timer_are_added(self) -> None:
+        worker_timer = stage_timer.StageTimer()
+        with worker_timer.stage('chktex', 'a.tex'):
+            pass
+        timer = stage_timer.StageTimer()
+        with timer.stage('dependency index'):
+            pass
+
+        timer.add_records(worker_timer.pop_records())
+
+        self.assertEqual(worker_timer.records, [])
+        self.assertEqual([(record['stage'], record['file']) for record in timer.records],
+                         [('dependency index', None), ('chktex', 'a.tex')])
+
+    def test_disabled_timer_records_nothing(self) -> None:
+        timer = stage_timer.StageTimer(enabled=False)
+        with timer.stage('total'):
+            pass
+
+        self.assertEqual(timer.records, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
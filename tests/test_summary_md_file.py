@@ -0,0 +1,125 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from tests.script_loader import load_script
+
+summary_md_file = load_script('summary_md_file')
+
+LINT_NOTIFICATIONS = [
+    SimpleNamespace(file='/24SS/UE01/Aufgabe/Angabe.tex', type='Warning 37', line=4,
+                    message='You should avoid spaces after parenthesis.',
+                    code_snippet='See ( a)\n     ^'),
+    SimpleNamespace(file='/24SS/UE01/Aufgabe/sub.tex', type='Message 3', line=1,
+                    message="You should enclose the previous parenthesis with `{}'.",
+                    code_snippet='Größe (x)^2\n          ^'),
+]
+SPELLING_NOTIFICATION = SimpleNamespace(
+    file='24SS/UE01/Aufgabe/Angabe.tex', type='info', line=3,
+    message="'Ergebniss': Möglicher Tippfehler gefunden. [GERMAN_SPELLER_RULE]",
+    code_snippet='Das Ergebniss wird ausgegeben.',
+    suggestions='\n    ^^^^^^^^^\nSuggestion: Ergebnis')
+
+# Written by SummaryMdFile before the report parts were queued (one locked append per part)
+EXPECTED_LINT_SUMMARY = """# Summary: Lint check with chktex
+Total files analized: 2
+<details>
+<summary>Click to expand full report</summary>
+
+
+## Path: 24SS/UE01/Aufgabe/Angabe.tex
+0 errors printed, 1 warnings printed, 1 messages printed
+
+### Path: /24SS/UE01/Aufgabe/Angabe.tex
+* **Type:** Warning 37
+* **Line:** 4
+* **Message:** You should avoid spaces after parenthesis.
+* **Context:**
+```
+See ( a)
+     ^
+```
+
+### Path: /24SS/UE01/Aufgabe/sub.tex
+* **Type:** Message 3
+* **Line:** 1
+* **Message:** You should enclose the previous parenthesis with `{}'.
+* **Context:**
+```
+Größe (x)^2
+          ^
+```
+
+## Path: 24SS/UE02/Aufgabe/Angabe.tex
+0 errors printed, 0 warnings printed, 0 messages printed
+
+</details>"""
+EXPECTED_SPELL_CHECK_REMAINING_REPORT = (
+    '# Additional summary of other warnings: Spelling check with LTex\n'
+    """Total files analized: 1
+## Path: 24SS/UE01/Aufgabe/Angabe.tex
+0 errors printed, 0 warnings printed, 1 messages printed
+
+### Path: 24SS/UE01/Aufgabe/Angabe.tex
+* **Type:** info
+* **Line:** 3
+* **Message:** 'Ergebniss': Möglicher Tippfehler gefunden. [GERMAN_SPELLER_RULE]
+* **Context:**
+```
+Das Ergebniss wird ausgegeben.
+
+    ^^^^^^^^^
+Suggestion: Ergebnis
+```
+
+</details>""")
+
+
+class TestSummaryMdFile(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.workspace = temp_dir.name
+        for patcher in (mock.patch.dict(os.environ, {'GITHUB_WORKSPACE': self.workspace}),
+                        mock.patch('builtins.print')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def read(self, file_name: str) -> bytes:
+        with open(os.path.join(self.workspace, file_name), 'rb') as file:
+            return file.read()
+
+    def test_lint_summary_equals_the_unqueued_report(self) -> None:
+        summary_file = summary_md_file.SummaryMdFile('lint_summary.md', 2)
+        summary_file.add_overview_line('24SS/UE01/Aufgabe/Angabe.tex', 0, 1, 1)
+        for notification in LINT_NOTIFICATIONS:
+            summary_file.add_notification_entry(notification)
+        summary_file.add_overview_line('24SS/UE02/Aufgabe/Angabe.tex', 0, 0, 0)
+
+        # Nothing but the header is written before the end of the report
+        self.assertNotIn(b'## Path', self.read('lint_summary.md'))
+        summary_file.add_details_summary_end()
+
+        self.assertEqual(self.read('lint_summary.md'), EXPECTED_LINT_SUMMARY.encode())
+
+    def test_spell_check_report_equals_the_unqueued_report(self) -> None:
+        summary_file = summary_md_file.SummaryMdFile('spell_check_remaining_report.md', 1,
+                                                     make_content_expandable=False,
+                                                     is_complementary_to_code_comments=True)
+        summary_file.add_overview_line('24SS/UE01/Aufgabe/Angabe.tex', 0, 0, 1)
+        summary_file.add_notification_entry(SPELLING_NOTIFICATION)
+        summary_file.add_details_summary_end()
+
+        self.assertEqual(self.read('spell_check_remaining_report.md'),
+                         EXPECTED_SPELL_CHECK_REMAINING_REPORT.encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
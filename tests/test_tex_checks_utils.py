@@ -0,0 +1,139 @@
+# pylint: disable=missing-module-docstring
+
+import html
+import importlib.util
+import os
+import re
+import tempfile
+import unittest
+from collections.abc import Iterator
+from unittest import mock
+
+from tests.script_loader import load_script
+
+tex_checks_utils = load_script('tex_checks_utils')
+lint_texs = load_script('lint_texs')
+# The lock dir of the LTeX limiter is created on import (below GITHUB_ACTION_PATH)
+with mock.patch.dict(os.environ, {'GITHUB_ACTION_PATH': tempfile.gettempdir()}):
+    spell_check_texs = load_script('spell-check_texs')
+
+# Console output of chktex 1.7.9 (run by `script`) for two tex files, with a user regex warning
+# whose message spans two lines (!n in chktexrc) and the statistics after each file
+CHKTEX_CONSOLE_OUTPUT = (
+    'chktex: WARNING -- Could not find global resource file.\r\n'
+    'ChkTeX v1.7.9 - Copyright 1995-96 Jens T. Berger Thielemann.\r\n'
+    'Compiled with POSIX extended regex support.\r\n'
+    'cx/b.tex, Warning 37, 3, You should avoid spaces after parenthesis.\r\n'
+    '$a \\not| b$ ( a)  \r\n'
+    '             ^\r\n'
+    'cx/b.tex, Warning 44, 3, User Regex: Always use \\nmid\r\n'
+    'see the guidelines.\r\n'
+    '$a \\not| b$ ( a)  \r\n'
+    '   ^^^^^\r\n'
+    'No errors printed; 2 warnings printed; 2 user suppressed warnings; '
+    'No line suppressed warnings.\r\n'
+    'See the manual for how to suppress some or all of these warnings/errors.\r\n'
+    'The manual is available at https://www.nongnu.org/chktex/ChkTeX.pdf\r\n'
+    'cx/a.tex, Warning 37, 3, You should avoid spaces after parenthesis.\r\n'
+    'See ( a)  \r\n'
+    '     ^\r\n'
+    'cx/a.tex, Warning 37, 4, You should avoid spaces after parenthesis.\r\n'
+    'foo ( b)  \r\n'
+    '     ^\r\n'
+    'No errors printed; 2 warnings printed; No user suppressed warnings; '
+    'No line suppressed warnings.\r\n')
+# Console output of ltex-cli-plus in a terminal (colored file position and type)
+LTEX_CONSOLE_OUTPUT = (
+    "\x1b[1m/ws/UE1/Angabe.tex:3:5: \x1b[0m\x1b[1;36minfo:\x1b[0m 'Ergebniss': "
+    'Möglicher Tippfehler gefunden. [AUSTRIAN_GERMAN_SPELLER_RULE]\n'
+    'Das Ergebniss wird ausgegeben.\n'
+    '    \x1b[1;36m^^^^^^^^^\x1b[0m\n'
+    'Suggestion: Ergebnis\n'
+    "\x1b[1m/ws/UE1/Angabe.tex:7:12: \x1b[0m\x1b[1;33mwarning:\x1b[0m 'dass': "
+    'Möglicherweise fehlt ein Komma. [KOMMA_ZWISCHEN_HAUPT_UND_NEBENSATZ]\n'
+    'Achten Sie dass die Eingabe geprüft wird.\n'
+    '           \x1b[1;33m^^^^\x1b[0m\n'
+    'Suggestion: , dass\n')
+
+
+def html_report(console_output: str) -> str:
+    """Converts console output like ansi2html, color codes become spans."""
+    def span(match: re.Match[str]) -> str:
+        return '</span>' if match.group() == '\x1b[0m' else f'<span class="{match.group()[2:-1]}">'
+    content = tex_checks_utils.ANSI_ESCAPE_PATTERN.sub(span, html.escape(console_output))
+    return f'<!DOCTYPE html>\n<html><body><pre>{content}</pre></body></html>\n'
+
+
+def count_in_html_text(text: str, pattern: re.Pattern[str]) -> int:
+    """Counts the notifications in the text of a html report as before the NotificationCounter."""
+    lines = text.split("\n")
+    i = 0
+    nr_of_total_warnings = 0
+    while i < len(lines):
+        step = 2
+        match = re.match(pattern, lines[i])
+        if match:
+            nr_of_total_warnings = nr_of_total_warnings + 1
+
+            while (i + step) < len(lines) and not re.match(pattern, lines[i + step]):
+                step = step + 1
+        else:
+            step = 1
+        i = i + step
+
+    return nr_of_total_warnings
+
+
+class TestSplitLines(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def test_lines_equal_split_of_whole_output(self) -> None:
+        for chunks in ([], [''], ['a\n', 'b\n'], ['a\n', 'b'], ['a\nb\n', '\n', 'c'], ['a', 'b\n']):
+            with self.subTest(chunks=chunks):
+                self.assertEqual(list(tex_checks_utils.split_lines(chunks)),
+                                 ''.join(chunks).split('\n'))
+
+    def test_lines_are_yielded_before_the_stream_ends(self) -> None:
+        read = []
+
+        def stream() -> Iterator[str]:
+            for chunk in ('first\n', 'second\n'):
+                read.append(chunk)
+                yield chunk
+
+        lines = tex_checks_utils.split_lines(stream())
+
+        self.assertEqual(next(lines), 'first')
+        self.assertEqual(read, ['first\n'])
+
+
+@unittest.skipUnless(importlib.util.find_spec('bs4'), 'bs4 (BeautifulSoup) is not installed')
+class TestNotificationCounter(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def count_in_html_report(self, console_output: str, pattern: re.Pattern[str]) -> int:
+        with tempfile.TemporaryDirectory() as report_folder:
+            with open(os.path.join(report_folder, 'report.html'), 'w', encoding='utf-8') as file:
+                file.write(html_report(console_output))
+            text = tex_checks_utils.extract_plain_text_from_html(
+                os.path.join(report_folder, 'report.html'))
+        return count_in_html_text(text, pattern)
+
+    def count_streamed(self, console_output: str, pattern: re.Pattern[str]) -> int:
+        counter = tex_checks_utils.NotificationCounter(pattern)
+        for line in console_output.splitlines(keepends=True):
+            counter.feed(line)
+        return int(counter.count)
+
+    def test_count_equals_the_count_in_the_html_report(self) -> None:
+        for console_output, pattern, expected in (
+                (CHKTEX_CONSOLE_OUTPUT, lint_texs.CHKTEX_NOTIFICATION_PATTERN, 4),
+                (LTEX_CONSOLE_OUTPUT, spell_check_texs.LTEX_NOTIFICATION_PATTERN, 2),
+                ('', lint_texs.CHKTEX_NOTIFICATION_PATTERN, 0)):
+            with self.subTest(pattern=pattern.pattern):
+                self.assertEqual(self.count_streamed(console_output, pattern), expected)
+                self.assertEqual(self.count_in_html_report(console_output, pattern), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
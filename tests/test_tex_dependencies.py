@@ -0,0 +1,98 @@
+# pylint: disable=missing-module-docstring
+
+import json
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+from tests.script_loader import load_script
+
+config = load_script('config')
+tex_dependencies = load_script('tex_dependencies')
+
+
+class TestTexDependencyGraph(unittest.TestCase):
+    # pylint: disable=missing-class-docstring,missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.base_dir = self.temp_dir.name
+        self.write('24SS/prelude.tex', 'prelude')
+        self.write('24SS/UE01/Aufgabe/Angabe.tex',
+                   '\\input{../../prelude}\n\\input{part}\n% \\input{commented}\n')
+        self.write('24SS/UE01/Aufgabe/part.tex', 'part')
+        self.write('24SS/UE01/Aufgabe/other_part.tex', 'other part')
+        self.write('24SS/UE02/Aufgabe/a.tex', '\\include{b}')
+        self.write('24SS/UE02/Aufgabe/b.tex', '\\input{a.tex}')
+        self.graph = tex_dependencies.TexDependencyGraph(self.base_dir)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def write(self, path: str, content: str) -> None:
+        abs_path = os.path.join(self.base_dir, path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        with open(abs_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def test_closure_resolves_relative_inputs(self) -> None:
+        closure = self.graph.closure(os.path.join(self.base_dir, '24SS/UE01/Aufgabe/Angabe.tex'))
+
+        self.assertEqual(sorted(os.path.relpath(p, self.base_dir) for p in closure),
+                         ['24SS/UE01/Aufgabe/Angabe.tex', '24SS/UE01/Aufgabe/part.tex',
+                          '24SS/prelude.tex'])
+
+    def test_roots_cover_included_files(self) -> None:
+        paths = ['24SS/UE01/Aufgabe/part.tex', '24SS/UE01/Aufgabe/other_part.tex',
+                 '24SS/UE01/Aufgabe/Angabe.tex', '24SS/UE01/Aufgabe/Angabe.tex',
+                 '24SS/UE02/Aufgabe/b.tex', '24SS/UE02/Aufgabe/a.tex']
+
+        self.assertEqual(self.graph.roots(paths),
+                         ['24SS/UE01/Aufgabe/other_part.tex', '24SS/UE01/Aufgabe/Angabe.tex',
+                          '24SS/UE02/Aufgabe/b.tex'])
+
+    def test_schedule_starts_largest_documents_first(self) -> None:
+        paths = ['24SS/UE01/Aufgabe/part.tex', '24SS/UE01/Aufgabe/Angabe.tex']
+
+        self.assertEqual(self.graph.schedule(paths), list(reversed(paths)))
+
+
+    def test_changed_includes_affect_their_entry_documents(self) -> None:
+        index = tex_dependencies.ReverseDependencyIndex(
+            self.graph, ['24SS/UE01/Aufgabe/Angabe.tex', '24SS/UE01/Unterricht/Lernziele.tex'])
+
+        self.assertEqual(index.affected(['24SS/prelude.tex', '24SS/UE02/Aufgabe/a.tex',
+                                         '24SS/UE01/Aufgabe/part.tex']),
+                         ['24SS/UE01/Aufgabe/Angabe.tex', '24SS/UE02/Aufgabe/a.tex'])
+
+    def test_persisted_inputs_are_reused_for_unchanged_files(self) -> None:
+        index_file_path = os.path.join(self.base_dir, 'cache', 'tex_dependencies.json')
+        self.graph.closure(self.graph.abs_path('24SS/UE01/Aufgabe/Angabe.tex'))
+        self.graph.save(index_file_path)
+        self.write('24SS/UE01/Aufgabe/part.tex', '\\input{other_part}')
+
+        graph = tex_dependencies.TexDependencyGraph(self.base_dir)
+        graph.load(index_file_path)
+        closure = graph.closure(graph.abs_path('24SS/UE01/Aufgabe/Angabe.tex'))
+
+        self.assertIn(graph.abs_path('24SS/UE01/Aufgabe/other_part.tex'), closure)
+
+    def test_semester_scan_covers_all_documents_of_active_semester(self) -> None:
+        self.write('23WS/UE01/Aufgabe/Angabe.tex', 'old semester')
+        self.write('cfg.json', json.dumps({'activeSemester': '24SS', 'exercises': ['UE01', 'UE02'],
+                                           'entryPoints': {'exercise': 'Angabe.tex',
+                                                           'lesson': 'Lernziele.tex'}}))
+        semester = config.Config(Namespace(config=os.path.join(self.base_dir, 'cfg.json'),
+                                           workdir=Path(self.base_dir)))
+
+        self.assertEqual(self.graph.roots(semester.semester_tex_files()),
+                         ['24SS/UE01/Aufgabe/Angabe.tex', '24SS/UE01/Aufgabe/other_part.tex',
+                          '24SS/UE02/Aufgabe/a.tex'])
+
+
+if __name__ == "__main__":
+    unittest.main()
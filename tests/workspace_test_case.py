@@ -0,0 +1,49 @@
+# pylint: disable=missing-module-docstring
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tests.script_loader import SCRIPTS_DIR
+
+REPO_DIR = SCRIPTS_DIR.parent
+
+
+def write(path: Path, content: str) -> None:
+    """Writes a (tex) file, creating its directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+
+
+class WorkspaceTestCase(unittest.TestCase):
+    """
+    Temporary workspace (GITHUB_WORKSPACE) and action directory (GITHUB_ACTION_PATH), files of this
+    repo are copied into the action directory like action.yml does.
+    """
+    # pylint: disable=missing-function-docstring
+
+    def setUp(self) -> None:
+        super().setUp()
+        work_dir = Path(tempfile.mkdtemp(prefix='latex-validation-test-'))
+        self.addCleanup(shutil.rmtree, work_dir)
+        self.workspace = work_dir / 'workspace'
+        self.action_dir = work_dir / 'action'
+        self.action_dir.mkdir()
+        self.patch_env({'GITHUB_WORKSPACE': str(self.workspace),
+                        'GITHUB_ACTION_PATH': str(self.action_dir)})
+
+    def patch_env(self, env: dict[str, str]) -> None:
+        """Sets env-variables until the end of the test."""
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def copy_to_action_dir(self, rel_path: str) -> Path:
+        """Copies a file of this repo to the same rel. path in the action directory."""
+        path = self.action_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(REPO_DIR / rel_path, path)
+        return path